@@ -3,7 +3,7 @@ import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # 使用非交互式后端
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
+from scipy.integrate import odeint, solve_ivp
 import io
 import base64
 import json
@@ -11,13 +11,25 @@ import os
 import re
 import random
 from scipy.optimize import fsolve
+from scipy import sparse
+from scipy.sparse.linalg import eigs, ArpackNoConvergence
+from scipy.spatial import cKDTree
 import sympy as sp
 from sympy import symbols, lambdify, diff
+from sympy.codegen.rewriting import create_expand_pow_optimization
 import warnings
 warnings.filterwarnings('ignore')
 from matplotlib.font_manager import FontProperties, fontManager
 import urllib.request
 import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import threading
+import math
+import itertools
+from collections import namedtuple, OrderedDict
 
 # 智能字体检测和下载配置
 def setup_chinese_font():
@@ -92,6 +104,249 @@ def setup_plot_style():
     plt.rcParams['font.sans-serif'] = AVAILABLE_FONTS
     plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
 
+# 零等值线提取辅助函数（marching squares）
+def _zero_crossing_cases(f00, f01, f11, f10):
+    """
+    向量化的 marching squares 情形表
+    输入为每个单元四个角点的值（左下、右下、右上、左上），
+    返回零等值线线段所在的单元索引及其连接的两条局部边（0=下, 1=右, 2=上, 3=左）
+    """
+    corners = np.stack([f00, f01, f11, f10]) > 0
+    crossed = np.stack([
+        corners[0] != corners[1],  # 下边
+        corners[1] != corners[2],  # 右边
+        corners[3] != corners[2],  # 上边
+        corners[0] != corners[3]   # 左边
+    ])
+    n_crossed = crossed.sum(axis=0)
+
+    # 普通情形：恰有两条边被穿越，直接相连
+    simple = np.nonzero(n_crossed == 2)[0]
+    edge_order = np.argsort(~crossed[:, simple], axis=0, kind='stable')
+
+    # 鞍点情形：四条边都被穿越，用单元中心值消除歧义
+    saddle = np.nonzero(n_crossed == 4)[0]
+    center_positive = (f00[saddle] + f01[saddle] + f11[saddle] + f10[saddle]) > 0
+    joins_diagonal = center_positive == corners[0, saddle]
+    # 中心与左下角同号：等值线绕开右下角和左上角；否则绕开左下角和右上角
+    first_a = np.where(joins_diagonal, 0, 3)
+    first_b = np.where(joins_diagonal, 1, 0)
+    second_a = np.where(joins_diagonal, 2, 1)
+    second_b = np.where(joins_diagonal, 3, 2)
+
+    cells = np.concatenate([simple, saddle, saddle])
+    edge_a = np.concatenate([edge_order[0], first_a, second_a])
+    edge_b = np.concatenate([edge_order[1], first_b, second_b])
+    return cells, edge_a, edge_b
+
+
+def _cell_zero_segments(cx, cy, f):
+    """
+    对任意一组四边形单元提取零等值线线段（用于非均匀的自适应网格）
+    cx, cy, f 形状均为 (4, n)，角点顺序为左下、右下、右上、左上；返回 (m, 4) 的 [x1, y1, x2, y2]
+    """
+    cells, edge_a, edge_b = _zero_crossing_cases(f[0], f[1], f[2], f[3])
+    edge_start = np.array([0, 1, 3, 0])
+    edge_end = np.array([1, 2, 2, 3])
+
+    def crossing(local_edge):
+        a, b = edge_start[local_edge], edge_end[local_edge]
+        fa, fb = f[a, cells], f[b, cells]
+        t = fa / (fa - fb)
+        return (cx[a, cells] + t * (cx[b, cells] - cx[a, cells]),
+                cy[a, cells] + t * (cy[b, cells] - cy[a, cells]))
+
+    xa, ya = crossing(edge_a)
+    xb, yb = crossing(edge_b)
+    return np.stack([xa, ya, xb, yb], axis=1)
+
+
+def _extract_zero_contours(x, y, F):
+    """
+    在规则网格上提取 F = 0 的等值线，返回折线列表 [[[x, y], ...], ...]
+    交点按所在网格边编号，相邻单元共享同一条边，从而可以把线段串联成折线
+    """
+    ny, nx = F.shape
+    if nx < 2 or ny < 2:
+        return []
+
+    cells, edge_a, edge_b = _zero_crossing_cases(
+        F[:-1, :-1].ravel(), F[:-1, 1:].ravel(), F[1:, 1:].ravel(), F[1:, :-1].ravel()
+    )
+    if cells.size == 0:
+        return []
+
+    ci, cj = np.divmod(cells, nx - 1)
+    n_horizontal = ny * (nx - 1)
+
+    def edge_ids(local_edge):
+        return np.select(
+            [local_edge == 0, local_edge == 1, local_edge == 2],
+            [ci * (nx - 1) + cj,
+             n_horizontal + ci * nx + cj + 1,
+             (ci + 1) * (nx - 1) + cj],
+            default=n_horizontal + ci * nx + cj
+        )
+
+    ids_a = edge_ids(edge_a)
+    ids_b = edge_ids(edge_b)
+
+    # 计算每条被穿越的网格边上的线性插值交点
+    unique_ids = np.unique(np.concatenate([ids_a, ids_b]))
+    is_horizontal = unique_ids < n_horizontal
+    hi, hj = np.divmod(unique_ids[is_horizontal], nx - 1)
+    vi, vj = np.divmod(unique_ids[~is_horizontal] - n_horizontal, nx)
+
+    points = np.empty((unique_ids.size, 2))
+    fa, fb = F[hi, hj], F[hi, hj + 1]
+    t = fa / (fa - fb)
+    points[is_horizontal, 0] = x[hj] + t * (x[hj + 1] - x[hj])
+    points[is_horizontal, 1] = y[hi]
+    fa, fb = F[vi, vj], F[vi + 1, vj]
+    t = fa / (fa - fb)
+    points[~is_horizontal, 0] = x[vj]
+    points[~is_horizontal, 1] = y[vi] + t * (y[vi + 1] - y[vi])
+    coords = dict(zip(unique_ids.tolist(), np.round(points, 6).tolist()))
+
+    # 串联线段：每条边最多属于两个单元，因此每个交点最多有两个邻居
+    neighbours = {}
+    for a, b in zip(ids_a.tolist(), ids_b.tolist()):
+        neighbours.setdefault(a, []).append(b)
+        neighbours.setdefault(b, []).append(a)
+
+    polylines = []
+    visited = set()
+    # 先从端点（边界上的交点）出发得到开放折线，再处理剩余的闭合曲线
+    starts = [node for node, adj in neighbours.items() if len(adj) == 1]
+    starts += [node for node, adj in neighbours.items() if len(adj) != 1]
+    for start in starts:
+        if start in visited:
+            continue
+        path = [start]
+        visited.add(start)
+        current = start
+        while True:
+            next_nodes = [n for n in neighbours[current] if n not in visited]
+            if not next_nodes:
+                break
+            current = next_nodes[0]
+            visited.add(current)
+            path.append(current)
+        if len(path) > 2 and start in neighbours[path[-1]]:
+            path.append(start)  # 闭合曲线
+        polylines.append([coords[node] for node in path])
+
+    return polylines
+
+
+_expand_small_powers = create_expand_pow_optimization(4)
+
+
+# 含参数非线性向量场编译结果的 LRU 缓存：键为符号表达式，滑块改变参数值时无需重新编译
+_NONLINEAR_KERNEL_CACHE = OrderedDict()
+_NONLINEAR_KERNEL_CACHE_SIZE = 64
+_NONLINEAR_KERNEL_CACHE_LOCK = threading.Lock()
+
+
+def _compile_nonlinear_kernel(dx_dt_expr, dy_dt_expr, variables, params):
+    """把 dx/dt、dy/dt 编译为以 (x, y, *参数) 为自变量的数值函数，并给出雅可比矩阵和对参数的导数"""
+    key = (sp.srepr(dx_dt_expr), sp.srepr(dy_dt_expr), tuple(str(p) for p in params))
+    with _NONLINEAR_KERNEL_CACHE_LOCK:
+        if key in _NONLINEAR_KERNEL_CACHE:
+            _NONLINEAR_KERNEL_CACHE.move_to_end(key)
+            return _NONLINEAR_KERNEL_CACHE[key]
+
+    x, y = variables
+    args = (x, y) + tuple(params)
+    jacobian = (diff(dx_dt_expr, x), diff(dx_dt_expr, y), diff(dy_dt_expr, x), diff(dy_dt_expr, y))
+    param_gradient = [(diff(dx_dt_expr, p), diff(dy_dt_expr, p)) for p in params]
+    kernel = {
+        # 小整数次幂展开为连乘（numpy 的 power 对 x**3 等远慢于乘法），向量场在集合积分中被反复调用
+        'dx_dt': lambdify(args, _expand_small_powers(dx_dt_expr), 'numpy'),
+        'dy_dt': lambdify(args, _expand_small_powers(dy_dt_expr), 'numpy'),
+        'jacobian': lambdify(args, jacobian, 'numpy'),
+        'param_gradient': lambdify(args, param_gradient, 'numpy')
+    }
+    with _NONLINEAR_KERNEL_CACHE_LOCK:
+        _NONLINEAR_KERNEL_CACHE[key] = kernel
+        while len(_NONLINEAR_KERNEL_CACHE) > _NONLINEAR_KERNEL_CACHE_SIZE:
+            _NONLINEAR_KERNEL_CACHE.popitem(last=False)
+    return kernel
+
+
+# 进程池分块计算辅助函数：每个进程只维护一个共享的有界进程池，大小由服务端决定（MAX_POOL_WORKERS 或 CPU 核数），
+# 客户端传入的 workers 只会被截断到该上限，不会为每个请求新建进程池
+_POOL_MAX_WORKERS = max(1, int(os.environ.get('MAX_POOL_WORKERS', os.cpu_count() or 1)))
+_PROCESS_POOL = None
+_PROCESS_POOL_LOCK = threading.Lock()
+
+
+def _clamp_workers(workers):
+    """把请求的进程数截断到 [1, _POOL_MAX_WORKERS]；未指定时使用上限"""
+    if workers is None:
+        return _POOL_MAX_WORKERS
+    return max(1, min(int(workers), _POOL_MAX_WORKERS))
+
+
+def _shared_process_pool():
+    """惰性创建（fork 之后，在工作进程内）并复用进程池"""
+    global _PROCESS_POOL
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is None:
+            _PROCESS_POOL = ProcessPoolExecutor(max_workers=_POOL_MAX_WORKERS)
+        return _PROCESS_POOL
+
+
+def _discard_process_pool(pool):
+    """进程池损坏（子进程被杀死等）时丢弃，下次调用重新创建"""
+    global _PROCESS_POOL
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is pool:
+            _PROCESS_POOL = None
+    pool.shutdown(wait=False)
+
+
+def _run_chunked(worker, tasks, workers=None):
+    """
+    在共享进程池中并行执行分块任务；任务很少或只允许单进程时串行执行。
+    进程池损坏时丢弃并退化为串行；任务本身抛出的异常取消其余任务后原样抛出
+    """
+    workers = min(_clamp_workers(workers), len(tasks))
+    if workers > 1:
+        pool = _shared_process_pool()
+        pending = {}
+        try:
+            # 同时在途的任务不超过 workers 个，其余请求仍可共享进程池
+            results = [None] * len(tasks)
+            queue = iter(enumerate(tasks))
+            for index, task in itertools.islice(queue, workers):
+                pending[pool.submit(worker, task)] = index
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+                    for index, task in itertools.islice(queue, 1):
+                        pending[pool.submit(worker, task)] = index
+            return results
+        except BrokenProcessPool:
+            _discard_process_pool(pool)
+        finally:
+            # 出错时取消尚未开始的任务，避免占用共享进程池
+            for future in pending:
+                future.cancel()
+    return [worker(task) for task in tasks]
+
+
+def _basin_chunk_worker(task):
+    system, points, settings = task
+    return system._integrate_basin_chunk(points, **settings)
+
+
+def _parameter_plane_chunk_worker(task):
+    system, x_values, y_values, settings = task
+    return system._parameter_plane_chunk(x_values, y_values, **settings)
+
+
 app = Flask(__name__)
 app.config['TEMPLATES_AUTO_RELOAD'] = True
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
@@ -453,31 +708,52 @@ class DynamicalSystem:
 class NonlinearSystem:
     """非线性动力系统分析器"""
 
-    def __init__(self, dx_dt_str, dy_dt_str):
+    def __init__(self, dx_dt_str, dy_dt_str, parameters=None):
         self.dx_dt_str = dx_dt_str
         self.dy_dt_str = dy_dt_str
 
-        # 创建符号变量
+        # 创建符号变量（状态变量和声明的参数）
         self.x, self.y = symbols('x y')
-
-        # 解析方程字符串
-        self.dx_dt_expr = self._parse_equation(dx_dt_str)
-        self.dy_dt_expr = self._parse_equation(dy_dt_str)
+        self.parameters = {str(name): float(value) for name, value in (parameters or {}).items()}
+        if {'x', 'y'} & set(self.parameters):
+            raise ValueError('参数名不能为 x 或 y')
+        self.param_symbols = tuple(sp.Symbol(name) for name in self.parameters)
+
+        # 解析方程字符串：保留含参数的表达式，并代入当前参数值得到数值表达式
+        self.dx_dt_param_expr = self._parse_equation(dx_dt_str)
+        self.dy_dt_param_expr = self._parse_equation(dy_dt_str)
+        substitutions = dict(zip(self.param_symbols, self.parameters.values()))
+        self.dx_dt_expr = self.dx_dt_param_expr.subs(substitutions)
+        self.dy_dt_expr = self.dy_dt_param_expr.subs(substitutions)
 
         # 创建数值计算函数
-        self.dx_dt_func = lambdify((self.x, self.y), self.dx_dt_expr, 'numpy')
-        self.dy_dt_func = lambdify((self.x, self.y), self.dy_dt_expr, 'numpy')
-
-        # 预计算雅可比矩阵及其数值函数，用于快速分类
-        df_dx = diff(self.dx_dt_expr, self.x)
-        df_dy = diff(self.dx_dt_expr, self.y)
-        dg_dx = diff(self.dy_dt_expr, self.x)
-        dg_dy = diff(self.dy_dt_expr, self.y)
-        self._jacobian_func = lambdify((self.x, self.y), (df_dx, df_dy, dg_dx, dg_dy), 'numpy')
+        self._compile_functions()
 
         # 查找平衡点
         self.equilibrium_points = self._find_equilibrium_points()
 
+    def _compile_functions(self):
+        """绑定数值函数（向量场和雅可比矩阵）；含参数的编译结果按表达式缓存，改变参数值无需重新编译"""
+        self._kernel = _compile_nonlinear_kernel(
+            self.dx_dt_param_expr, self.dy_dt_param_expr, (self.x, self.y), self.param_symbols
+        )
+        values = tuple(self.parameters.values())
+        kernel = self._kernel
+        self.dx_dt_func = lambda X, Y: kernel['dx_dt'](X, Y, *values)
+        self.dy_dt_func = lambda X, Y: kernel['dy_dt'](X, Y, *values)
+        self._jacobian_func = lambda X, Y: kernel['jacobian'](X, Y, *values)
+
+    def __getstate__(self):
+        # lambdify 生成的函数无法pickle，传给进程池时只保留符号表达式，在子进程中重新编译
+        state = self.__dict__.copy()
+        for key in ('dx_dt_func', 'dy_dt_func', '_jacobian_func', '_kernel'):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile_functions()
+
     def _parse_equation(self, eq_str):
         """解析方程字符串为sympy表达式"""
         eq_str = eq_str.replace('^', '**')
@@ -496,6 +772,7 @@ class NonlinearSystem:
                 'exp': exp, 'log': log, 'sqrt': sqrt,
                 'abs': sp.Abs, 'pi': pi, 'e': E
             }
+            local_dict.update(zip(self.parameters, self.param_symbols))
             return sp.sympify(eq_str, locals=local_dict)
         except Exception as exc:
             raise ValueError(f"无法解析方程: {eq_str}. 错误: {exc}")
@@ -512,6 +789,8 @@ class NonlinearSystem:
         except Exception:
             vectorized = np.vectorize(lambda a, b: self._safe_eval_scalar(func, a, b), otypes=[float])
             values = np.asarray(vectorized(X, Y), dtype=np.float64)
+        # 常数表达式（如 dx/dt = 1）只返回标量，需要广播到网格形状
+        values = np.broadcast_to(values, np.shape(X)).astype(np.float64)
         return np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
 
     def _find_equilibrium_points(self):
@@ -698,6 +977,719 @@ class NonlinearSystem:
 
         return img_base64
 
+    def generate_phase_portrait_data(self, x_range=(-5, 5), y_range=(-5, 5), grid_size=20, encoding='base64'):
+        """
+        相图的数据模式：返回 float32 向量场网格、零等值线折线和已分类的平衡点，
+        由前端用 Canvas / Plotly 绘制，平移缩放时只需请求新的数据窗口
+        """
+        x = np.linspace(x_range[0], x_range[1], grid_size)
+        y = np.linspace(y_range[0], y_range[1], grid_size)
+        X, Y = np.meshgrid(x, y)
+
+        U = self._evaluate_field_on_grid(self.dx_dt_func, X, Y)
+        V = self._evaluate_field_on_grid(self.dy_dt_func, X, Y)
+        speed = np.hypot(U, V)
+
+        nullclines = {
+            'dx_dt': _extract_zero_contours(x, y, U) if np.nanmax(np.abs(U)) > 1e-9 else [],
+            'dy_dt': _extract_zero_contours(x, y, V) if np.nanmax(np.abs(V)) > 1e-9 else []
+        }
+
+        equilibria = []
+        for point in self.equilibrium_points:
+            x_eq, y_eq = point
+            equilibria.append({
+                'point': [float(x_eq), float(y_eq)],
+                'type': self.classify_equilibrium(point),
+                'in_view': bool(x_range[0] <= x_eq <= x_range[1] and y_range[0] <= y_eq <= y_range[1])
+            })
+
+        return {
+            'x': x.tolist(),
+            'y': y.tolist(),
+            'u': encode_array(U, np.float32, encoding),
+            'v': encode_array(V, np.float32, encoding),
+            'speed_range': [float(speed.min()), float(speed.max())],
+            'nullclines': nullclines,
+            'equilibria': equilibria
+        }
+
+    def adaptive_sample_field(self, x_range=(-5, 5), y_range=(-5, 5), base_size=9, max_depth=5,
+                              eval_budget=20000, variation_tol=0.35, encoding='base64'):
+        """
+        自适应四叉树采样向量场
+        从粗网格出发，只细分 U 或 V 变号、或场方向变化剧烈的单元；角点按最细层的整数格点缓存，
+        相邻单元共享的角点只求值一次，总求值次数（含基础网格）不超过 eval_budget；
+        基础网格每边 2..257 个点，max_depth 截断到格点编号 iy·n + ix 不会溢出 int64 的深度
+        """
+        base_size = min(max(int(base_size), 2), 257)
+        eval_budget = int(eval_budget)
+        if base_size ** 2 > eval_budget:
+            raise ValueError(f'基础网格 {base_size}×{base_size} 超过求值预算 eval_budget={eval_budget}')
+        # ((base_size - 1)·2^max_depth + 1)² < 2^63
+        max_depth = max(int(max_depth), 0)
+        while ((base_size - 1) * 2 ** max_depth + 1) ** 2 >= 2 ** 63:
+            max_depth -= 1
+        scale = 2 ** max_depth
+        n_lattice = (base_size - 1) * scale + 1
+        hx = (x_range[1] - x_range[0]) / (n_lattice - 1)
+        hy = (y_range[1] - y_range[0]) / (n_lattice - 1)
+
+        # 角点缓存：格点编号 -> 样本下标
+        sample_index = {}
+        sample_keys = []
+        sample_values = []
+
+        def evaluate(keys):
+            new_keys = [k for k in dict.fromkeys(keys.tolist()) if k not in sample_index]
+            if new_keys:
+                new_keys = np.array(new_keys, dtype=np.int64)
+                iy, ix = np.divmod(new_keys, n_lattice)
+                X = x_range[0] + ix * hx
+                Y = y_range[0] + iy * hy
+                U = self._evaluate_field_on_grid(self.dx_dt_func, X, Y)
+                V = self._evaluate_field_on_grid(self.dy_dt_func, X, Y)
+                for k in new_keys.tolist():
+                    sample_index[k] = len(sample_keys)
+                    sample_keys.append(k)
+                sample_values.append(np.stack([U, V], axis=1))
+            values = np.concatenate(sample_values) if sample_values else np.zeros((0, 2))
+            return values[[sample_index[k] for k in keys.tolist()]]
+
+        def corner_keys(ix, iy, size):
+            return np.stack([
+                iy * n_lattice + ix,
+                iy * n_lattice + ix + size,
+                (iy + size) * n_lattice + ix + size,
+                (iy + size) * n_lattice + ix
+            ])
+
+        base = np.arange(base_size - 1) * scale
+        cell_ix, cell_iy = [a.ravel() for a in np.meshgrid(base, base)]
+        size = scale
+        leaves = []
+
+        for depth in range(max_depth + 1):
+            keys = corner_keys(cell_ix, cell_iy, size)
+            values = evaluate(keys.ravel()).reshape(4, -1, 2)
+            U, V = values[..., 0], values[..., 1]
+
+            u_sign = (U > 0).any(axis=0) != (U > 0).all(axis=0)
+            v_sign = (V > 0).any(axis=0) != (V > 0).all(axis=0)
+            speed = np.hypot(U, V)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                direction = values / np.where(speed > 1e-12, speed, 1.0)[..., None]
+            variation = np.max(np.linalg.norm(direction[:, None] - direction[None, :], axis=-1), axis=(0, 1))
+
+            priority = np.where(u_sign & v_sign, 3, np.where(u_sign | v_sign, 2, 0))
+            priority = np.where((priority == 0) & (variation > variation_tol), 1, priority)
+            refine = (priority > 0) if depth < max_depth else np.zeros(cell_ix.size, dtype=bool)
+
+            candidates = np.nonzero(refine)[0]
+            if candidates.size:
+                # 按优先级排序：先平衡点括区，再零等值线，最后是变化剧烈的单元
+                candidates = candidates[np.lexsort((-variation[candidates], -priority[candidates]))]
+                half = size // 2
+                cx, cy = cell_ix[candidates], cell_iy[candidates]
+                new_keys = np.stack([
+                    (cy + half) * n_lattice + cx + half,
+                    cy * n_lattice + cx + half,
+                    (cy + size) * n_lattice + cx + half,
+                    (cy + half) * n_lattice + cx,
+                    (cy + half) * n_lattice + cx + size
+                ], axis=1)
+                flat = new_keys.ravel()
+                unseen = np.array([k not in sample_index for k in flat.tolist()], dtype=bool)
+                _, first = np.unique(flat, return_index=True)
+                is_first = np.zeros(flat.size, dtype=bool)
+                is_first[first] = True
+                cost = np.cumsum((unseen & is_first).reshape(-1, 5).sum(axis=1))
+                allowed = int(np.searchsorted(cost, eval_budget - len(sample_keys), side='right'))
+                refine[:] = False
+                refine[candidates[:allowed]] = True
+
+            done = ~refine
+            leaves.append((cell_ix[done], cell_iy[done], np.full(done.sum(), size), np.full(done.sum(), depth)))
+
+            if not refine.any():
+                break
+            half = size // 2
+            rx, ry = cell_ix[refine], cell_iy[refine]
+            cell_ix = np.concatenate([rx, rx + half, rx, rx + half])
+            cell_iy = np.concatenate([ry, ry, ry + half, ry + half])
+            size = half
+
+        leaf_ix = np.concatenate([leaf[0] for leaf in leaves])
+        leaf_iy = np.concatenate([leaf[1] for leaf in leaves])
+        leaf_size = np.concatenate([leaf[2] for leaf in leaves])
+        leaf_depth = np.concatenate([leaf[3] for leaf in leaves])
+
+        keys = corner_keys(leaf_ix, leaf_iy, leaf_size)
+        values = evaluate(keys.ravel()).reshape(4, -1, 2)
+        corner_iy, corner_ix = np.divmod(keys, n_lattice)
+        cx = x_range[0] + corner_ix * hx
+        cy = y_range[0] + corner_iy * hy
+
+        # 平衡点括区：U 和 V 同时变号的叶单元，用 fsolve 从单元中心精化
+        U, V = values[..., 0], values[..., 1]
+        bracket = (((U > 0).any(axis=0) != (U > 0).all(axis=0)) &
+                   ((V > 0).any(axis=0) != (V > 0).all(axis=0)))
+        brackets = np.stack([cx[0, bracket], cy[0, bracket], cx[2, bracket], cy[2, bracket]], axis=1)
+
+        def equations(state):
+            return [self._safe_eval_scalar(self.dx_dt_func, *state),
+                    self._safe_eval_scalar(self.dy_dt_func, *state)]
+
+        equilibria = []
+        for x0, y0, x1, y1 in brackets:
+            pad_x, pad_y = (x1 - x0) * 0.5, (y1 - y0) * 0.5
+            try:
+                sol, _, ier, _ = fsolve(equations, [(x0 + x1) / 2, (y0 + y1) / 2], full_output=True)
+            except Exception:
+                continue
+            if ier != 1 or not (x0 - pad_x <= sol[0] <= x1 + pad_x and y0 - pad_y <= sol[1] <= y1 + pad_y):
+                continue
+            if any(abs(ep['point'][0] - sol[0]) < 1e-6 and abs(ep['point'][1] - sol[1]) < 1e-6 for ep in equilibria):
+                continue
+            point = (float(sol[0]), float(sol[1]))
+            equilibria.append({'point': list(point), 'type': self.classify_equilibrium(point)})
+
+        samples = np.concatenate(sample_values) if sample_values else np.zeros((0, 2))
+        sample_iy, sample_ix = np.divmod(np.array(sample_keys, dtype=np.int64), n_lattice)
+        sample_points = np.stack([x_range[0] + sample_ix * hx, y_range[0] + sample_iy * hy], axis=1)
+        depth_reached = int(leaf_depth.max()) if leaf_depth.size else 0
+        uniform_size = (base_size - 1) * 2 ** depth_reached + 1
+
+        return {
+            'samples': {
+                'points': encode_array(sample_points, np.float32, encoding),
+                'values': encode_array(samples, np.float32, encoding)
+            },
+            'cells': {
+                'bounds': encode_array(np.stack([cx[0], cy[0], cx[2], cy[2]], axis=1), np.float32, encoding),
+                'depth': encode_array(leaf_depth, np.uint8, encoding)
+            },
+            'nullclines': {
+                'dx_dt': np.round(_cell_zero_segments(cx, cy, values[..., 0]), 6).tolist(),
+                'dy_dt': np.round(_cell_zero_segments(cx, cy, values[..., 1]), 6).tolist()
+            },
+            'equilibrium_brackets': brackets.tolist(),
+            'equilibria': equilibria,
+            'evaluations': len(sample_keys),
+            'max_depth_reached': depth_reached,
+            'uniform_evaluations': uniform_size ** 2
+        }
+
+    def find_limit_cycles(self, search_radius=5.0, seed_offset=1e-2, max_returns=60, t_max=200.0,
+                          time_budget=3.0, tol=1e-8, bound=1e3):
+        """
+        Poincaré 打靶法检测平面系统的极限环
+        在焦点/节点右侧放置水平截面，事件检测得到返回映射 P(s)，再用割线法求解 P(s) = s；
+        不稳定焦点正向积分逼近稳定环，稳定焦点反向积分逼近不稳定环。所有打靶结果按截面位置缓存复用。
+        time_budget 同时作为积分内的终止事件，刚性系统的单次打靶也会在期限处中止
+        """
+        start_time = time.perf_counter()
+        deadline_at = start_time + time_budget
+        shot_cache = {}
+        shots = 0
+
+        def out_of_time():
+            return time.perf_counter() - start_time > time_budget
+
+        def shoot(eq_index, s, reverse):
+            """从截面上 s 处出发，返回下一次同向穿越截面的位置和所用时间"""
+            nonlocal shots
+            key = (eq_index, reverse, round(s, 12))
+            if key in shot_cache:
+                return shot_cache[key]
+
+            x_e, y_e = self.equilibrium_points[eq_index]
+            sign = -1.0 if reverse else 1.0
+
+            def rhs(t, state):
+                return [sign * self._safe_eval_scalar(self.dx_dt_func, state[0], state[1]),
+                        sign * self._safe_eval_scalar(self.dy_dt_func, state[0], state[1])]
+
+            direction = np.sign(rhs(0, [x_e + s, y_e])[1])
+            if direction == 0:
+                shot_cache[key] = None
+                return None
+
+            def crossing(t, state):
+                return state[1] - y_e
+            crossing.terminal = True
+            crossing.direction = direction
+
+            def escape(t, state):
+                return bound - max(abs(state[0]), abs(state[1]))
+            escape.terminal = True
+
+            expired_at = []
+
+            def deadline(t, state):
+                # 首次发现超时时锁定当时的积分时刻，使事件值只依赖 t，事件求根时符号保持一致
+                if not expired_at and time.perf_counter() > deadline_at:
+                    expired_at.append(t)
+                return 1.0 if not expired_at or t < expired_at[0] else -1.0
+            deadline.terminal = True
+
+            state = np.array([x_e + s, y_e])
+            elapsed = 0.0
+            result = None
+            while elapsed < t_max:
+                if out_of_time():
+                    # 超时中止的打靶不写入缓存
+                    return None
+                shots += 1
+                # 先离开截面一小段，避免在起点处立即触发事件
+                speed = max(np.hypot(*rhs(0, state)), 1e-12)
+                h = 1e-6 * (1 + abs(state[0] - x_e)) / speed
+                state = solve_ivp(rhs, (0, h), state, rtol=1e-10, atol=1e-12).y[:, -1]
+                elapsed += h
+                sol = solve_ivp(rhs, (0, t_max - elapsed), state, events=[crossing, escape, deadline],
+                                rtol=1e-9, atol=1e-11)
+                if sol.t_events[2].size:
+                    return None
+                if sol.status != 1 or sol.t_events[1].size:
+                    break
+                elapsed += sol.t_events[0][0]
+                state = sol.y_events[0][0]
+                if state[0] > x_e:
+                    result = (float(state[0] - x_e), float(elapsed))
+                    break
+
+            shot_cache[key] = result
+            return result
+
+        def secant(eq_index, reverse, s0, s1, p0, p1):
+            """割线法求解 g(s) = P(s) - s = 0"""
+            g0, g1 = p0 - s0, p1 - s1
+            for _ in range(30):
+                if out_of_time() or g1 == g0:
+                    return None
+                s2 = s1 - g1 * (s1 - s0) / (g1 - g0)
+                if not (0 < s2 < bound):
+                    return None
+                shot = shoot(eq_index, s2, reverse)
+                if shot is None:
+                    return None
+                s0, g0 = s1, g1
+                s1, g1 = s2, shot[0] - s2
+                if abs(g1) < tol * (1 + s1):
+                    return s1, shot[1]
+            return None
+
+        candidates = []
+        for index, point in enumerate(self.equilibrium_points):
+            eq_type = self.classify_equilibrium(point)
+            if eq_type in ('不稳定焦点', '不稳定节点'):
+                candidates.append((index, seed_offset, False))
+            elif eq_type in ('稳定焦点', '稳定节点'):
+                candidates.append((index, seed_offset, True))
+            if '焦点' in eq_type or '节点' in eq_type:
+                # 从外侧出发：正向逼近外层稳定环，反向逼近外层不稳定环
+                candidates.append((index, search_radius, False))
+                candidates.append((index, search_radius, True))
+
+        limit_cycles = []
+        for eq_index, s, reverse in candidates:
+            if out_of_time():
+                break
+
+            # 迭代返回映射，得到收敛序列 s_k -> s_{k+1}
+            samples = [s]
+            periods = []
+            for _ in range(max_returns):
+                if out_of_time():
+                    break
+                shot = shoot(eq_index, samples[-1], reverse)
+                if shot is None:
+                    break
+                samples.append(shot[0])
+                periods.append(shot[1])
+                if abs(samples[-1] - samples[-2]) < 1e-3 * (1 + samples[-1]):
+                    break
+            if len(samples) < 3 or samples[-1] < seed_offset * 0.5:
+                continue
+
+            solution = secant(eq_index, reverse, samples[-3], samples[-2], samples[-2], samples[-1])
+            if solution is None:
+                continue
+            s_star, period = solution
+
+            x_e, y_e = self.equilibrium_points[eq_index]
+            start = (x_e + s_star, y_e)
+            if any(min(np.hypot(np.array(lc['orbit']['x']) - start[0],
+                                np.array(lc['orbit']['y']) - start[1])) < 1e-3 * (1 + s_star)
+                   for lc in limit_cycles):
+                continue
+
+            # 沿环积分一周（与打靶同向，保证不稳定环也不会漂离），由散度积分得到非平凡 Floquet 乘子
+            sign = -1.0 if reverse else 1.0
+            t_eval = np.linspace(0, period, 400)
+            orbit = solve_ivp(lambda t, st: sign * self.vector_field(st), (0, period), start,
+                              t_eval=t_eval, rtol=1e-9, atol=1e-11).y
+            jacobians = [self._jacobian_func(px, py) for px, py in orbit.T]
+            trace = np.array([float(jac[0]) + float(jac[3]) for jac in jacobians])
+            floquet_exponent = float(np.trapz(trace, t_eval) / period)
+            multiplier = float(np.exp(floquet_exponent * period))
+            if multiplier < 1 - 1e-6:
+                stability = '稳定极限环'
+            elif multiplier > 1 + 1e-6:
+                stability = '不稳定极限环'
+            else:
+                stability = '临界极限环'
+
+            limit_cycles.append({
+                'equilibrium': [float(x_e), float(y_e)],
+                'section_point': [float(start[0]), float(start[1])],
+                'period': float(period),
+                'amplitude': {
+                    'x': float((orbit[0].max() - orbit[0].min()) / 2),
+                    'y': float((orbit[1].max() - orbit[1].min()) / 2)
+                },
+                'floquet_multiplier': multiplier,
+                'floquet_exponent': floquet_exponent,
+                'stability': stability,
+                'orbit': {'x': orbit[0].tolist(), 'y': orbit[1].tolist()}
+            })
+
+        return {
+            'limit_cycles': limit_cycles,
+            'shots': shots,
+            'elapsed': time.perf_counter() - start_time,
+            'budget_exhausted': out_of_time()
+        }
+
+    # 吸引域标签：非负整数为平衡点下标
+    BASIN_DIVERGED = -1
+    BASIN_PERIODIC = -2
+    BASIN_UNDETERMINED = -3
+
+    def _basin_field(self, st):
+        """对 (2, N) 状态批量求向量场；NaN/inf 原样保留，由发散判据处理"""
+        with np.errstate(all='ignore'):
+            try:
+                fx = np.asarray(self.dx_dt_func(st[0], st[1]), dtype=np.float64)
+                fy = np.asarray(self.dy_dt_func(st[0], st[1]), dtype=np.float64)
+            except Exception:
+                fx = self._evaluate_field_on_grid(self.dx_dt_func, st[0], st[1])
+                fy = self._evaluate_field_on_grid(self.dy_dt_func, st[0], st[1])
+        # 常数表达式（如 dx/dt = 1）只返回标量
+        if fx.shape != st[0].shape:
+            fx = np.broadcast_to(fx, st[0].shape)
+        if fy.shape != st[1].shape:
+            fy = np.broadcast_to(fy, st[1].shape)
+        return np.stack([fx, fy])
+
+    def _integrate_basin_chunk(self, points, attractors, capture_radius, dt, n_steps, bound,
+                               anchor_steps, return_tol, deadline=None):
+        """
+        向量化 RK4 积分一组初始点，每个点一旦被判定即提前终止：
+        进入某个稳定平衡点的捕获半径 -> 平衡点下标；越界或数值溢出 -> -1；
+        离开锚点（每 anchor_steps 步重置一次）超过捕获半径后又回到其 return_tol 以内 -> -2（周期轨道/极限环）；
+        积分结束或超过 deadline（time.time() 时间戳）仍未判定 -> -3
+        返回标签和判定时间
+        """
+        n = len(points)
+        labels = np.full(n, self.BASIN_UNDETERMINED, dtype=np.int8)
+        times = np.full(n, np.nan, dtype=np.float32)
+        if n == 0:
+            return labels, times
+
+        attractor_points = np.array([self.equilibrium_points[i] for i in attractors], dtype=float).reshape(-1, 2)
+        attractor_labels = np.asarray(attractors, dtype=np.int8)
+        capture_sq = capture_radius ** 2
+        active = np.arange(n)
+        state = np.array(points, dtype=float).T.copy()
+        previous = state
+        anchor = state.copy()
+        excursion = np.zeros(n)
+
+        for step in range(n_steps + 1):
+            with np.errstate(all='ignore'):
+                diverged = ~np.isfinite(state).all(axis=0) | (np.abs(state).max(axis=0) > bound)
+            settled = diverged
+            labels[active[diverged]] = self.BASIN_DIVERGED
+
+            if attractor_points.size:
+                distance_sq = ((state[0][:, None] - attractor_points[:, 0]) ** 2
+                               + (state[1][:, None] - attractor_points[:, 1]) ** 2)
+                nearest = np.argmin(distance_sq, axis=1)
+                captured = (distance_sq[np.arange(active.size), nearest] < capture_sq) & ~diverged
+                labels[active[captured]] = attractor_labels[nearest[captured]]
+                times[active[captured]] = step * dt
+                settled = settled | captured
+
+            if step > 0:
+                # 锚点到本步线段的距离（线段内插，避免步长粒度漏判），需先离开锚点足够远
+                segment = state - previous
+                offset = anchor - previous
+                with np.errstate(all='ignore'):
+                    u = np.clip((offset * segment).sum(axis=0) / (segment * segment).sum(axis=0), 0.0, 1.0)
+                gap = np.hypot(offset[0] - u * segment[0], offset[1] - u * segment[1])
+                periodic = (excursion > capture_radius) & (gap < return_tol) & ~settled
+                np.maximum(excursion, np.hypot(state[0] - anchor[0], state[1] - anchor[1]), out=excursion)
+                labels[active[periodic]] = self.BASIN_PERIODIC
+                times[active[periodic]] = step * dt
+                settled = settled | periodic
+
+            if settled.any():
+                keep = ~settled
+                active, state, anchor, excursion = active[keep], state[:, keep], anchor[:, keep], excursion[keep]
+            if active.size == 0 or step == n_steps or (deadline is not None and time.time() > deadline):
+                break
+            if step % anchor_steps == 0:
+                anchor = state.copy()
+                excursion[:] = 0.0
+
+            previous = state
+            with np.errstate(all='ignore'):
+                k1 = self._basin_field(state)
+                k2 = self._basin_field(state + 0.5 * dt * k1)
+                k3 = self._basin_field(state + 0.5 * dt * k2)
+                k4 = self._basin_field(state + dt * k3)
+                state = state + dt / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+        return labels, times
+
+    def compute_basin_map(self, x_range=(-5, 5), y_range=(-5, 5), resolution=256, t_max=50.0, dt=0.05,
+                          capture_radius=None, chunk_size=16384, workers=None, time_budget=None):
+        """
+        计算吸引域：把初始点网格交错分块，在共享进程池中做向量化集合积分，
+        每个点按其最终到达的稳定平衡点（来自 _find_equilibrium_points）标记，或标记为发散/周期轨道/未判定；
+        周期轨道由回归锚点检测，周期需短于 t_max / 4；给出 time_budget（秒）时到时未判定的点标记为 -3
+        """
+        nx, ny = (resolution, resolution) if np.isscalar(resolution) else resolution
+        x = np.linspace(x_range[0], x_range[1], int(nx))
+        y = np.linspace(y_range[0], y_range[1], int(ny))
+        X, Y = np.meshgrid(x, y)
+        points = np.stack([X.ravel(), Y.ravel()], axis=1)
+
+        equilibria = []
+        attractors = []
+        for index, point in enumerate(self.equilibrium_points):
+            eq_type = self.classify_equilibrium(point)
+            equilibria.append({'label': index, 'point': [float(point[0]), float(point[1])], 'type': eq_type})
+            if eq_type in ('稳定节点', '稳定焦点'):
+                attractors.append(index)
+
+        if capture_radius is None:
+            extent = max(x_range[1] - x_range[0], y_range[1] - y_range[0])
+            capture_radius = 0.05 * extent
+            if len(self.equilibrium_points) > 1:
+                eq = np.array(self.equilibrium_points, dtype=float)
+                gaps = np.hypot(eq[:, None, 0] - eq[None, :, 0], eq[:, None, 1] - eq[None, :, 1])
+                capture_radius = min(capture_radius, 0.25 * gaps[gaps > 0].min())
+        bound = 100.0 * max(abs(v) for v in (*x_range, *y_range, 1.0))
+        n_steps = int(np.ceil(t_max / dt))
+
+        settings = {
+            'attractors': attractors,
+            'capture_radius': float(capture_radius),
+            'dt': float(dt),
+            'n_steps': n_steps,
+            'bound': bound,
+            'anchor_steps': max(1, n_steps // 4),
+            'return_tol': 0.01 * float(capture_radius),
+            'deadline': None if time_budget is None else time.time() + float(time_budget)
+        }
+        # 交错分块：预算耗尽时未判定的点均匀散布在栅格上，而不是集中在末尾几行
+        n_chunks = max(1, int(np.ceil(len(points) / chunk_size)))
+        order = np.concatenate([np.arange(k, len(points), n_chunks) for k in range(n_chunks)])
+        chunks = np.array_split(points[order], n_chunks)
+        results = _run_chunked(_basin_chunk_worker, [(self, chunk, settings) for chunk in chunks], workers)
+
+        labels = np.empty(len(points), dtype=np.int8)
+        times = np.empty(len(points), dtype=np.float32)
+        labels[order] = np.concatenate([r[0] for r in results])
+        times[order] = np.concatenate([r[1] for r in results])
+        labels = labels.reshape(Y.shape)
+        times = times.reshape(Y.shape)
+        values, counts = np.unique(labels, return_counts=True)
+
+        return {
+            'x_range': list(x_range),
+            'y_range': list(y_range),
+            'labels': labels,
+            'convergence_time': times,
+            'equilibria': equilibria,
+            'legend': {
+                str(self.BASIN_DIVERGED): '发散',
+                str(self.BASIN_PERIODIC): '周期轨道/极限环',
+                str(self.BASIN_UNDETERMINED): '未收敛（未判定）'
+            },
+            'label_counts': {str(int(v)): int(c) for v, c in zip(values, counts)},
+            'capture_radius': float(capture_radius),
+            'budget_exhausted': settings['deadline'] is not None and time.time() > settings['deadline']
+        }
+
+    def continue_equilibria(self, param_name, param_range, step=0.01, max_points=2000, tol=1e-10):
+        """
+        伪弧长延拓平衡点分支
+        从当前参数值下的平衡点出发，沿 (x, y, 参数) 空间中的解曲线双向追踪，
+        复用一次性编译的向量场、雅可比和参数导数；由雅可比行列式变号检测折叠点，迹变号且行列式为正检测 Hopf 点
+        """
+        if param_name not in self.parameters:
+            raise ValueError(f'未声明的参数: {param_name}')
+        p_index = list(self.parameters).index(param_name)
+        base_values = list(self.parameters.values())
+        p_min, p_max = float(min(param_range)), float(max(param_range))
+        width = p_max - p_min
+        kernel = self._kernel
+
+        def evaluate(u):
+            values = list(base_values)
+            values[p_index] = u[2]
+            F = np.array([kernel['dx_dt'](u[0], u[1], *values), kernel['dy_dt'](u[0], u[1], *values)], dtype=float)
+            fx, fy, gx, gy = [float(v) for v in kernel['jacobian'](u[0], u[1], *values)]
+            fp, gp = [float(v) for v in kernel['param_gradient'](u[0], u[1], *values)[p_index]]
+            return F, np.array([[fx, fy, fp], [gx, gy, gp]])
+
+        def tangent(J, previous=None, direction=1.0):
+            t = np.cross(J[0], J[1])
+            norm = np.linalg.norm(t)
+            if norm < 1e-14:
+                return None
+            t /= norm
+            if previous is not None:
+                return t if np.dot(t, previous) >= 0 else -t
+            return t if t[2] * direction >= 0 else -t
+
+        def trace_branch(u0, direction):
+            F, J = evaluate(u0)
+            t = tangent(J, direction=direction)
+            points = [u0]
+            if t is None:
+                return points
+            ds = step * width
+            ds_min, ds_max = 1e-6 * width, 2 * step * width
+            u = u0
+            while len(points) < max_points:
+                predicted = u + ds * t
+                corrected = predicted.copy()
+                converged = False
+                for _ in range(8):
+                    F, J = evaluate(corrected)
+                    residual = np.append(F, np.dot(t, corrected - predicted))
+                    if not np.all(np.isfinite(residual)):
+                        break
+                    try:
+                        delta = np.linalg.solve(np.vstack([J, t]), -residual)
+                    except np.linalg.LinAlgError:
+                        break
+                    corrected = corrected + delta
+                    if np.linalg.norm(delta) < tol * (1 + np.linalg.norm(corrected)):
+                        converged = True
+                        break
+                if not converged:
+                    ds *= 0.5
+                    if ds < ds_min:
+                        break
+                    continue
+
+                u = corrected
+                points.append(u)
+                if not p_min <= u[2] <= p_max or np.max(np.abs(u[:2])) > 1e3:
+                    break
+                if len(points) > 10 and np.linalg.norm(u - u0) < 0.5 * ds:
+                    break  # 闭合分支
+                _, J = evaluate(u)
+                t_new = tangent(J, previous=t)
+                if t_new is None:
+                    break
+                t = t_new
+                ds = min(ds * 1.3, ds_max)
+            return points
+
+        def distance_to_branch(u, branch):
+            if len(branch) < 2:
+                return np.linalg.norm(branch[0] - u)
+            a, b = branch[:-1], branch[1:]
+            ab = b - a
+            w = np.clip(np.einsum('ij,ij->i', u - a, ab) / np.maximum(np.einsum('ij,ij->i', ab, ab), 1e-300), 0, 1)
+            return np.min(np.linalg.norm(a + w[:, None] * ab - u, axis=1))
+
+        def refine(u_guess, condition):
+            """在 F = 0 上求解附加的检测条件（行列式或迹为零），精确定位特殊点"""
+            def equations(u):
+                F, J = evaluate(u)
+                return [F[0], F[1], condition(J[:, :2])]
+            try:
+                u = fsolve(equations, u_guess)
+            except Exception:
+                return u_guess
+            accepted = (np.linalg.norm(equations(u)) < 1e-8 and
+                        np.linalg.norm(u - u_guess) < 10 * step * width)
+            return u if accepted else u_guess
+
+        p0 = self.parameters[param_name]
+        branches = []
+        for x_eq, y_eq in self.equilibrium_points:
+            u0 = np.array([x_eq, y_eq, p0], dtype=float)
+            if not np.all(np.isfinite(evaluate(u0)[0])) or np.linalg.norm(evaluate(u0)[0]) > 1e-6:
+                continue
+            if any(distance_to_branch(u0, branch) < 0.5 * step * width for branch in branches):
+                continue
+            backward = trace_branch(u0, -1.0)
+            forward = trace_branch(u0, 1.0)
+            branches.append(np.array(backward[::-1] + forward[1:]))
+
+        results = []
+        for branch in branches:
+            jacobians = [evaluate(u)[1] for u in branch]
+            eigenvalues = np.array([np.linalg.eigvals(J[:, :2]) for J in jacobians])
+            det = np.array([np.linalg.det(J[:, :2]) for J in jacobians])
+            trace = np.array([np.trace(J[:, :2]) for J in jacobians])
+
+            # 沿分支统一切向量方向，折叠点处切向量的参数分量变号
+            tangents = [tangent(jacobians[0], direction=1.0)]
+            for i in range(1, len(branch)):
+                tangents.append(tangent(jacobians[i], previous=tangents[-1]) if tangents[-1] is not None else None)
+
+            special_points = []
+            for i in range(len(branch) - 1):
+                if det[i] * det[i + 1] < 0:
+                    w = det[i] / (det[i] - det[i + 1])
+                    turning = (tangents[i] is not None and tangents[i + 1] is not None and
+                               tangents[i][2] * tangents[i + 1][2] < 0)
+                    kind = 'fold' if turning else 'branch_point'
+                elif trace[i] * trace[i + 1] < 0 and det[i] > 0 and det[i + 1] > 0:
+                    w = trace[i] / (trace[i] - trace[i + 1])
+                    kind = 'hopf'
+                else:
+                    continue
+                u = branch[i] + w * (branch[i + 1] - branch[i])
+                if kind == 'fold':
+                    u = refine(u, np.linalg.det)
+                elif kind == 'hopf':
+                    u = refine(u, np.trace)
+                special_points.append({
+                    'type': kind,
+                    'label': {'fold': '折叠点', 'hopf': 'Hopf 分岔点', 'branch_point': '分支点'}[kind],
+                    'parameter': float(u[2]),
+                    'x': float(u[0]),
+                    'y': float(u[1])
+                })
+
+            results.append({
+                'parameter': branch[:, 2].tolist(),
+                'x': branch[:, 0].tolist(),
+                'y': branch[:, 1].tolist(),
+                'stable': np.all(eigenvalues.real < 0, axis=1).tolist(),
+                'eigenvalues': {
+                    'real': eigenvalues.real.tolist(),
+                    'imag': eigenvalues.imag.tolist()
+                },
+                'special_points': special_points
+            })
+
+        return {
+            'param_name': param_name,
+            'param_range': [p_min, p_max],
+            'branches': results
+        }
+
     def compute_trajectory(self, initial_point, t_span=(0, 20), num_points=1000):
         """计算轨迹"""
         t = np.linspace(t_span[0], t_span[1], num_points)
@@ -1013,29 +2005,310 @@ class TextToMatrixConverter:
         }
 
 
+# 离散映射内核注册表：映射名 -> (维度, 内核工厂)
+# 工厂在构造 DiscreteSystem 时以参数字典调用一次，返回参数已预先转换的 MapKernel；
+# step/derivative 接受任意形状的状态数组（二维映射最后一维为 (x, y)），参数可以是标量或可广播的数组，
+# 一维映射的 derivative 返回 f'(x)，二维映射返回形状 (..., 2, 2) 的 Jacobian；
+# fixed_points（可选）返回闭式固定点，形状 (k,) 或 (k, 2)，没有闭式解的映射为 None；
+# scalar_step（可选）是单条长轨道用的纯 Python 标量版本：一维为 float -> float，二维为 (x, y) -> (x', y')
+MapKernel = namedtuple('MapKernel', ['dimension', 'parameters', 'step', 'derivative', 'fixed_points', 'scalar_step'],
+                       defaults=(None, None))
+_DISCRETE_MAP_KERNELS = {}
+
+
+def _register_map_kernel(name, dimension):
+    """注册一个离散映射内核工厂"""
+    def decorator(factory):
+        _DISCRETE_MAP_KERNELS[name] = (dimension, factory)
+        return factory
+    return decorator
+
+
+def _as_parameter(value):
+    """参数预转换：标量转为 float，序列转为 float 数组"""
+    return float(value) if np.isscalar(value) else np.asarray(value, dtype=float)
+
+
+def _stack_jacobian(j11, j12, j21, j22, x):
+    """把四个可广播的偏导数组装为形状 x.shape[:-1] + (2, 2) 的 Jacobian"""
+    j11, j12, j21, j22, _ = np.broadcast_arrays(j11, j12, j21, j22, np.zeros(np.shape(x)[:-1]))
+    return np.stack([np.stack([j11, j12], axis=-1), np.stack([j21, j22], axis=-1)], axis=-2)
+
+
+@_register_map_kernel('logistic', 1)
+def _logistic_kernel(p):
+    r = _as_parameter(p['r'])
+    # r·x(1-x) = x  =>  x = 0 或 x = 1 - 1/r
+    step = lambda x: r * x * (1 - x)
+    return MapKernel(1, {'r': r}, step, lambda x: r * (1 - 2 * x),
+                     lambda: [0.0, 1 - 1 / r] if r != 0 else [0.0], step)
+
+
+@_register_map_kernel('tent', 1)
+def _tent_kernel(p):
+    mu = _as_parameter(p['mu'])
+    # 将x限制在有效区间(epsilon, 1-epsilon)内，避免边界处的数值不稳定性
+    epsilon = 1e-10
+
+    def step(x):
+        x = np.clip(x, epsilon, 1 - epsilon)
+        return np.clip(np.where(x <= 0.5, mu * x, mu * (1 - x)), 0.0, 1.0)
+
+    def derivative(x):
+        return mu * np.where(np.clip(x, epsilon, 1 - epsilon) <= 0.5, 1.0, -1.0)
+
+    def scalar_step(x):
+        x = epsilon if x < epsilon else (1 - epsilon if x > 1 - epsilon else x)
+        y = mu * x if x <= 0.5 else mu * (1 - x)
+        return 0.0 if y < 0.0 else (1.0 if y > 1.0 else y)
+
+    # 左支只有 x = 0；右支 mu(1-x) = x 在 mu > 1 时给出 x = mu/(1+mu)
+    return MapKernel(1, {'mu': mu}, step, derivative, lambda: [0.0, mu / (1 + mu)] if mu > 1 else [0.0],
+                     scalar_step)
+
+
+@_register_map_kernel('sine', 1)
+def _sine_kernel(p):
+    r = _as_parameter(p['r'])
+    return MapKernel(1, {'r': r}, lambda x: r * np.sin(np.pi * x), lambda x: np.pi * r * np.cos(np.pi * x),
+                     scalar_step=lambda x: r * math.sin(math.pi * x))
+
+
+@_register_map_kernel('linear_1d', 1)
+def _linear_1d_kernel(p):
+    # x_{n+1} = a*x_n + b
+    a, b = _as_parameter(p['a']), _as_parameter(p['b'])
+    # a = 1 时没有孤立的固定点
+    step = lambda x: a * x + b
+    return MapKernel(1, {'a': a, 'b': b}, step, lambda x: a * np.ones_like(x),
+                     lambda: [b / (1 - a)] if a != 1 else [], step)
+
+
+@_register_map_kernel('henon', 2)
+def _henon_kernel(p):
+    a, b = _as_parameter(p['a']), _as_parameter(p['b'])
+
+    def step(x):
+        x = np.asarray(x, dtype=float)
+        return np.stack([1 - a * x[..., 0]**2 + x[..., 1], b * x[..., 0]], axis=-1)
+
+    def jacobian(x):
+        x = np.asarray(x, dtype=float)
+        return _stack_jacobian(-2 * a * x[..., 0], 1.0, b, 0.0, x)
+
+    def fixed_points():
+        # y = b·x，a·x² + (1-b)·x - 1 = 0
+        if a == 0:
+            xs = [1 / (1 - b)] if b != 1 else []
+        else:
+            discriminant = (1 - b)**2 + 4 * a
+            if discriminant < 0:
+                return []
+            xs = [(-(1 - b) + sign * np.sqrt(discriminant)) / (2 * a) for sign in (-1, 1)]
+        return [[x, b * x] for x in xs]
+
+    return MapKernel(2, {'a': a, 'b': b}, step, jacobian, fixed_points,
+                     lambda s: (1 - a * s[0] * s[0] + s[1], b * s[0]))
+
+
+@_register_map_kernel('linear_2d', 2)
+def _linear_2d_kernel(p):
+    # 矩阵既可以整体给出（a: 2x2），也可以按元素给出（a11..a22，便于单独扫描某个元素）
+    entries = {}
+    if 'a' in p:
+        A = np.asarray(p['a'], dtype=float)
+        entries = {'a11': A[0, 0], 'a12': A[0, 1], 'a21': A[1, 0], 'a22': A[1, 1]}
+    entries.update({name: p[name] for name in ('a11', 'a12', 'a21', 'a22') if name in p})
+    a11, a12, a21, a22 = (_as_parameter(entries[name]) for name in ('a11', 'a12', 'a21', 'a22'))
+
+    def step(x):
+        x = np.asarray(x, dtype=float)
+        return np.stack([a11 * x[..., 0] + a12 * x[..., 1], a21 * x[..., 0] + a22 * x[..., 1]], axis=-1)
+
+    # 原点总是固定点（A - I 奇异时还有一整条固定点直线，不作为孤立固定点报告）
+    return MapKernel(2, {'a11': a11, 'a12': a12, 'a21': a21, 'a22': a22}, step,
+                     lambda x: _stack_jacobian(a11, a12, a21, a22, x), lambda: [[0.0, 0.0]],
+                     lambda s: (a11 * s[0] + a12 * s[1], a21 * s[0] + a22 * s[1]))
+
+
+@_register_map_kernel('rotation_2d', 2)
+def _rotation_2d_kernel(p):
+    # 旋转矩阵乘以缩放因子，cos/sin 只在绑定时计算一次
+    theta, r = _as_parameter(p['theta']), _as_parameter(p['r'])
+    c, s = r * np.cos(theta), r * np.sin(theta)
+
+    def step(x):
+        x = np.asarray(x, dtype=float)
+        return np.stack([c * x[..., 0] - s * x[..., 1], s * x[..., 0] + c * x[..., 1]], axis=-1)
+
+    return MapKernel(2, {'theta': theta, 'r': r}, step, lambda x: _stack_jacobian(c, -s, s, c, x),
+                     lambda: [[0.0, 0.0]], lambda v: (c * v[0] - s * v[1], s * v[0] + c * v[1]))
+
+
+def _identity_kernel(p, dimension):
+    """未注册的映射类型按恒等映射处理"""
+    parameters = dict(p)
+    if dimension == 1:
+        return MapKernel(1, parameters, lambda x: x, lambda x: np.ones_like(x, dtype=float), scalar_step=lambda x: x)
+    return MapKernel(dimension, parameters, lambda x: np.asarray(x, dtype=float),
+                     lambda x: _stack_jacobian(1.0, 0.0, 0.0, 1.0, x), scalar_step=tuple)
+
+
+# 由表达式定义的映射：表达式只解析一次，编译为数组原生的 numpy 函数和符号 Jacobian，
+# 按规范化表达式（sympy srepr）缓存；原始字符串到规范化键的对应关系也缓存，重复请求不再调用 sympy。
+# 两者都是有界 LRU（表达式由用户提交，不能无限增长）
+_MAP_EXPRESSION_CACHE = OrderedDict()
+_MAP_EXPRESSION_CACHE_SIZE = 64
+_MAP_EXPRESSION_KEYS = OrderedDict()
+_MAP_EXPRESSION_KEYS_SIZE = 256
+_MAP_EXPRESSION_CACHE_LOCK = threading.Lock()
+
+# 预置的表达式映射（变量 x，二维映射还有 y）
+DISCRETE_MAP_PRESETS = {
+    'ikeda': {
+        'expressions': ['1 + u*(x*cos(0.4 - 6/(1 + x^2 + y^2)) - y*sin(0.4 - 6/(1 + x^2 + y^2)))',
+                        'u*(x*sin(0.4 - 6/(1 + x^2 + y^2)) + y*cos(0.4 - 6/(1 + x^2 + y^2)))'],
+        'parameters': {'u': 0.9}
+    },
+    'standard': {
+        # Chirikov 标准映射，x 为角度、y 为动量，均取模 2π
+        'expressions': ['Mod(x + y + K*sin(x), 2*pi)', 'Mod(y + K*sin(x), 2*pi)'],
+        'parameters': {'K': 0.971635}
+    },
+    'gauss': {
+        'expressions': ['exp(-alpha*x^2) + beta'],
+        'parameters': {'alpha': 6.2, 'beta': -0.5}
+    }
+}
+
+
+def _parse_map_expression(expr_str, local_dict):
+    """解析映射表达式字符串为sympy表达式"""
+    expr_str = expr_str.replace('^', '**').replace('π', 'pi')
+
+    # 处理隐式乘法（例如 2x -> 2*x）
+    expr_str = re.sub(r'(\d)([xy])\b', r'\1*\2', expr_str)
+    expr_str = re.sub(r'\)([xy])\b', r')*\1', expr_str)
+
+    try:
+        return sp.sympify(expr_str, locals=local_dict)
+    except Exception as exc:
+        raise ValueError(f"无法解析映射表达式: {expr_str}. 错误: {exc}")
+
+
+def _compile_map_expressions(expressions, param_names):
+    """
+    编译映射表达式：返回 {'step': [各分量函数], 'scalar': [math 模块的标量版本], 'jacobian': [[∂f_i/∂x_j 函数]]}，
+    函数的自变量为 (x[, y], *参数)；Jacobian 中 Mod(a, m) 按 a 求导（取模处几乎处处导数为1）
+    """
+    raw_key = (tuple(expressions), tuple(param_names))
+    with _MAP_EXPRESSION_CACHE_LOCK:
+        key = _MAP_EXPRESSION_KEYS.get(raw_key)
+        if key is not None and key in _MAP_EXPRESSION_CACHE:
+            _MAP_EXPRESSION_KEYS.move_to_end(raw_key)
+            _MAP_EXPRESSION_CACHE.move_to_end(key)
+            return _MAP_EXPRESSION_CACHE[key]
+
+    variables = sp.symbols('x y')[:len(expressions)]
+    params = [sp.Symbol(name) for name in param_names]
+    local_dict = {
+        'x': sp.Symbol('x'), 'y': sp.Symbol('y'),
+        'sin': sp.sin, 'cos': sp.cos, 'tan': sp.tan, 'exp': sp.exp, 'log': sp.log,
+        'sqrt': sp.sqrt, 'abs': sp.Abs, 'Mod': sp.Mod, 'mod': sp.Mod, 'pi': sp.pi, 'e': sp.E
+    }
+    local_dict.update(zip(param_names, params))
+    exprs = [_parse_map_expression(e, local_dict) for e in expressions]
+
+    unknown = set().union(*(e.free_symbols for e in exprs)) - set(variables) - set(params)
+    if unknown:
+        raise ValueError(f"映射表达式中存在未声明的符号: {', '.join(sorted(map(str, unknown)))}")
+
+    key = (tuple(sp.srepr(e) for e in exprs), tuple(param_names))
+    with _MAP_EXPRESSION_CACHE_LOCK:
+        compiled = _MAP_EXPRESSION_CACHE.get(key)
+    if compiled is None:
+        args = tuple(variables) + tuple(params)
+        smooth = [e.replace(sp.Mod, lambda a, m: a) for e in exprs]
+        compiled = {
+            'step': [lambdify(args, e, 'numpy') for e in exprs],
+            'scalar': [lambdify(args, e, 'math') for e in exprs],
+            'jacobian': [[lambdify(args, diff(e, v), 'numpy') for v in variables] for e in smooth]
+        }
+
+    with _MAP_EXPRESSION_CACHE_LOCK:
+        _MAP_EXPRESSION_KEYS[raw_key] = key
+        _MAP_EXPRESSION_KEYS.move_to_end(raw_key)
+        compiled = _MAP_EXPRESSION_CACHE.setdefault(key, compiled)
+        _MAP_EXPRESSION_CACHE.move_to_end(key)
+        while len(_MAP_EXPRESSION_KEYS) > _MAP_EXPRESSION_KEYS_SIZE:
+            _MAP_EXPRESSION_KEYS.popitem(last=False)
+        while len(_MAP_EXPRESSION_CACHE) > _MAP_EXPRESSION_CACHE_SIZE:
+            _MAP_EXPRESSION_CACHE.popitem(last=False)
+    return compiled
+
+
+def _expression_map_kernel(expressions, p, param_names=None):
+    """把编译好的表达式映射绑定为 MapKernel（param_names 为声明的参数名，默认取参数字典的键）"""
+    names = tuple(param_names if param_names is not None else p)
+    compiled = _compile_map_expressions(tuple(expressions), names)
+    values = tuple(_as_parameter(p[name]) for name in names)
+
+    if len(expressions) == 1:
+        f, df, scalar = compiled['step'][0], compiled['jacobian'][0][0], compiled['scalar'][0]
+        # 常数表达式返回标量，加上 0·x 以保持状态数组的形状
+        return MapKernel(1, dict(zip(names, values)),
+                         lambda x: f(x, *values) + np.zeros_like(x),
+                         lambda x: df(x, *values) + np.zeros_like(x, dtype=float),
+                         scalar_step=lambda x: float(scalar(x, *values)))
+
+    def step(x):
+        x = np.asarray(x, dtype=float)
+        components = [f(x[..., 0], x[..., 1], *values) for f in compiled['step']]
+        return np.stack(np.broadcast_arrays(*components, x[..., 0])[:2], axis=-1)
+
+    def jacobian(x):
+        x = np.asarray(x, dtype=float)
+        return _stack_jacobian(*(d(x[..., 0], x[..., 1], *values) for row in compiled['jacobian'] for d in row), x)
+
+    fx, fy = compiled['scalar']
+    return MapKernel(2, dict(zip(names, values)), step, jacobian,
+                     scalar_step=lambda s: (float(fx(s[0], s[1], *values)), float(fy(s[0], s[1], *values))))
+
+
+for _name, _preset in DISCRETE_MAP_PRESETS.items():
+    _DISCRETE_MAP_KERNELS[_name] = (
+        len(_preset['expressions']),
+        lambda p, _preset=_preset: _expression_map_kernel(_preset['expressions'], p, list(_preset['parameters']))
+    )
+
+
+# Ulam 转移算子结果的 LRU 缓存：键为 (映射, 表达式, 参数, 网格设置)
+_ULAM_CACHE = OrderedDict()
+_ULAM_CACHE_SIZE = 16
+_ULAM_CACHE_LOCK = threading.Lock()
+
+
 class DiscreteSystem:
     """离散动力学系统分析器"""
 
-    def __init__(self, map_type='logistic', parameters=None, dimension=None):
+    def __init__(self, map_type='logistic', parameters=None, dimension=None, expressions=None):
         self.map_type = map_type
+        # 自定义映射：expressions 为1个（变量 x）或2个（变量 x、y）表达式字符串，参数在 parameters 中声明
+        self.expressions = list(expressions) if expressions else None
+        if map_type == 'custom' and (not self.expressions or len(self.expressions) not in (1, 2)):
+            raise ValueError('自定义映射需要1个或2个表达式')
         # 如果未指定dimension，自动识别
         if dimension is None:
-            dimension = self._get_dimension(map_type)
+            dimension = len(self.expressions) if map_type == 'custom' else self._get_dimension(map_type)
         self.dimension = dimension
         self.parameters = parameters or self._get_default_parameters(map_type)
+        # 构造时绑定一次映射内核，之后的迭代、求导都直接调用内核
+        self.kernel = self._bind_kernel(self.parameters)
 
     def _get_dimension(self, map_type):
         """根据映射类型自动识别维度"""
-        dimension_map = {
-            'logistic': 1,
-            'henon': 2,
-            'tent': 1,
-            'linear_2d': 2,
-            'linear_1d': 1,
-            'rotation_2d': 2,
-            'sine': 1
-        }
-        return dimension_map.get(map_type, 1)
+        entry = _DISCRETE_MAP_KERNELS.get(map_type)
+        return entry[0] if entry else 1
 
     def _get_default_parameters(self, map_type):
         """获取默认参数"""
@@ -1044,221 +2317,255 @@ class DiscreteSystem:
             'henon': {'a': 1.4, 'b': 0.3},
             'tent': {'mu': 2.0},
             'linear_2d': {'a': [[0.8, 0.2], [0.1, 0.9]]},
+            'linear_1d': {'a': 0.8, 'b': 0.1},
+            'rotation_2d': {'theta': 0.3, 'r': 0.95},
             'baker': {'stretch_factor': 2.0},
             'sine': {'r': 1.0}
         }
+        if map_type in DISCRETE_MAP_PRESETS:
+            return dict(DISCRETE_MAP_PRESETS[map_type]['parameters'])
         return defaults.get(map_type, {})
 
+    def _bind_kernel(self, parameters):
+        """按映射类型从注册表取内核工厂并绑定参数（自定义映射编译自身的表达式）"""
+        entry = _DISCRETE_MAP_KERNELS.get(self.map_type)
+        if self.map_type == 'custom':
+            return _expression_map_kernel(self.expressions, parameters)
+        if entry is None:
+            return _identity_kernel(parameters, self.dimension)
+        try:
+            return entry[1](parameters)
+        except KeyError as e:
+            raise ValueError(f'{self.map_type} 映射缺少参数 {e.args[0]}')
+
+    def __getstate__(self):
+        # 内核由闭包组成，不能 pickle；传到进程池子进程后按参数重新绑定
+        state = self.__dict__.copy()
+        state.pop('kernel', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.kernel = self._bind_kernel(self.parameters)
+
+    def sweep_kernel(self, param_name, param_values=None):
+        """
+        绑定一个参数被替换为数组的内核，用于对一组参数值同时迭代（每个参数值对应一条通道）
+        param_name 也可以是 {参数名: 数组} 字典，同时替换多个参数（如参数平面扫描）
+        """
+        sweeps = param_name if isinstance(param_name, dict) else {param_name: param_values}
+        parameters = dict(self.kernel.parameters)
+        for name, values in sweeps.items():
+            if name not in parameters:
+                raise ValueError(f'{self.map_type} 映射没有参数 {name}')
+            parameters[name] = np.asarray(values, dtype=float)
+        return self._bind_kernel(parameters)
+
     def map_function(self, x):
-        """应用映射函数"""
-        if self.map_type == 'logistic':
-            r = self.parameters['r']
-            return r * x * (1 - x)
-
-        elif self.map_type == 'henon':
-            a, b = self.parameters['a'], self.parameters['b']
-            x_new = 1 - a * x[0]**2 + x[1]
-            y_new = b * x[0]
-            return np.array([x_new, y_new])
-
-        elif self.map_type == 'tent':
-            mu = self.parameters['mu']
-            # 避免边界处的数值不稳定性
-            # 将x限制在有效区间(epsilon, 1-epsilon)内
-            epsilon = 1e-10
-            x = np.clip(x, epsilon, 1 - epsilon)
-
-            if x <= 0.5:
-                result = mu * x
-            else:
-                result = mu * (1 - x)
-
-            # 确保结果在有效范围内
-            return np.clip(result, 0.0, 1.0)
-
-        elif self.map_type == 'linear_2d':
-            A = np.array(self.parameters['a'])
-            return A @ x
-
-        elif self.map_type == 'linear_1d':
-            # x_{n+1} = a*x_n + b
-            a = self.parameters['a']
-            b = self.parameters['b']
-            return a * x + b
-
-        elif self.map_type == 'rotation_2d':
-            # 旋转矩阵乘以缩放因子
-            theta = self.parameters['theta']
-            r = self.parameters['r']
-            cos_theta = np.cos(theta)
-            sin_theta = np.sin(theta)
-            rotation_matrix = r * np.array([
-                [cos_theta, -sin_theta],
-                [sin_theta, cos_theta]
-            ])
-            return rotation_matrix @ x
+        """应用映射函数（接受单个状态或整组状态数组）"""
+        return self.kernel.step(x)
 
-        elif self.map_type == 'sine':
-            r = self.parameters['r']
-            return r * np.sin(np.pi * x)
+    def map_derivative(self, x):
+        """映射的解析导数：一维返回 f'(x)，二维返回 Jacobian 矩阵"""
+        return self.kernel.derivative(x)
 
-        else:
-            return x
+    def _scalar_step(self):
+        """单条轨道用的标量步进函数（内核没有提供时由数组版本包装）"""
+        if self.kernel.scalar_step is not None:
+            return self.kernel.scalar_step
+        if self.dimension == 1:
+            return lambda x: float(self.kernel.step(x))
+        return lambda s: tuple(self.kernel.step(np.asarray(s, dtype=float)))
+
+    def _advance(self, state, buffer, step=None):
+        """
+        从 state 出发迭代，把之后的状态依次写入预分配的 buffer（一维 (m,)，二维 (m, 2)）
+        发散在写满后向量化检测（|x| > 1e6 或非有限），轨道截断到第一个发散点（含）为止
+        返回 (写入的点数, 最后状态, 是否发散)
+        """
+        step = step or self._scalar_step()
+        n = len(buffer)
+        values = [None] * n
+        filled = n
+        try:
+            for i in range(n):
+                state = step(state)
+                values[i] = state
+        except (OverflowError, ValueError, ZeroDivisionError):
+            filled = i
+
+        with np.errstate(all='ignore'):
+            if self.dimension == 1:
+                buffer[:filled] = values[:filled]
+            else:
+                # 二维状态元组展平后一次性写入，比逐元组赋值快得多
+                buffer[:filled] = np.fromiter(
+                    itertools.chain.from_iterable(values[:filled]), dtype=float, count=2 * filled).reshape(filled, 2)
+            chunk = buffer[:filled]
+            magnitude = np.abs(chunk) if self.dimension == 1 else np.maximum(np.abs(chunk[:, 0]), np.abs(chunk[:, 1]))
+            bad = np.nonzero(~(magnitude <= 1e6))[0]
+        if len(bad):
+            return int(bad[0]) + 1, state, True
+        return filled, state, filled < n
+
+    def _initial_state(self, x0):
+        """把初始条件转换为标量步进使用的形式"""
+        if self.dimension == 1:
+            return float(np.ravel(x0)[0]) if not np.isscalar(x0) else float(x0)
+        return tuple(float(v) for v in np.ravel(x0)[:2])
+
+    def iterate_array(self, x0, n_steps):
+        """迭代计算轨迹，结果写入预分配的数组 (n_steps+1[, 2])，发散时截断"""
+        shape = (n_steps + 1,) if self.dimension == 1 else (n_steps + 1, 2)
+        orbit = np.empty(shape)
+        state = self._initial_state(x0)
+        orbit[0] = state
+        filled, _, _ = self._advance(state, orbit[1:])
+        return orbit[:filled + 1]
 
     def iterate(self, x0, n_steps):
         """迭代计算轨迹"""
-        trajectory = [x0]
-        x = x0
-
-        for i in range(n_steps):
-            try:
-                x = self.map_function(x)
-                trajectory.append(x)
-
-                # 检查发散
-                if np.any(np.abs(x) > 1e6):
-                    break
-
-            except (OverflowError, ValueError):
+        # 转换为列表，确保正确的JSON序列化（二维系统每个点为 [x, y]）
+        return self.iterate_array(x0, n_steps).tolist()
+
+    @staticmethod
+    def _convergence_index(orbit, window=30, threshold=1e-6, min_index=0):
+        """
+        向量化窗口检测：返回第一个 i >= min_index，使 orbit[i:i+window] 中相邻点的差值全部小于阈值；
+        没有则返回 None（二维轨道按各分量差值的最大值判断）
+        """
+        if len(orbit) <= window:
+            return None
+        steps = np.abs(np.diff(orbit, axis=0))
+        if steps.ndim == 2:
+            steps = steps.max(axis=1)
+        small = np.concatenate([[0], np.cumsum(steps < threshold)])
+        counts = small[window - 1:len(orbit) - 1] - small[:len(orbit) - window]
+        candidates = np.nonzero(counts[min_index:] == window - 1)[0]
+        return int(min_index + candidates[0]) if len(candidates) else None
+
+    def stream_orbit(self, x0, n_steps, decimation='stride', max_points=10000, transient=0,
+                     chunk_size=65536, window=30, threshold=1e-6):
+        """
+        超长轨道（10^7–10^8 步）的流式迭代：按块写入复用的缓冲区，只输出抽取或聚合后的结果，内存与步数无关
+        decimation='stride'：每 k 步取一个点；'minmax'：每 k 步为一个桶，输出桶内各分量的最小值和最大值
+        k 由 (n_steps - transient) / max_points 决定，暂态计入 n_steps（截断到不超过 n_steps）；
+        轨道收敛到不动点（连续 window 步变化都小于阈值）或发散时提前结束，converged_at 为暂态后进入该窗口的步数
+        """
+        if decimation not in ('stride', 'minmax'):
+            raise ValueError(f'不支持的抽取方式: {decimation}')
+        transient = max(0, min(int(transient), int(n_steps)))
+        kept_steps = max(n_steps - transient, 1)
+        bucket = max(1, int(np.ceil(kept_steps / max_points)))
+        chunk_size = bucket * max(1, chunk_size // bucket)
+        shape = (chunk_size,) if self.dimension == 1 else (chunk_size, 2)
+        buffer = np.empty(shape)
+        step = self._scalar_step()
+
+        state = self._initial_state(x0)
+        diverged = False
+        if transient:
+            done = 0
+            while done < transient and not diverged:
+                filled, state, diverged = self._advance(state, buffer[:min(chunk_size, transient - done)], step)
+                done += filled
+
+        outputs = {'points': []} if decimation == 'stride' else {'min': [], 'max': []}
+        computed = 0
+        converged_at = None
+        tail = None
+        while computed < kept_steps and not diverged:
+            filled, state, diverged = self._advance(state, buffer[:min(chunk_size, kept_steps - computed)], step)
+            chunk = buffer[:filled]
+            if decimation == 'stride':
+                outputs['points'].append(chunk[bucket - 1::bucket].copy())
+            else:
+                n_full = filled // bucket
+                groups = [chunk[:n_full * bucket].reshape((n_full, bucket) + chunk.shape[1:])]
+                if filled > n_full * bucket:
+                    groups.append(chunk[n_full * bucket:][None])
+                for group in groups:
+                    outputs['min'].append(group.min(axis=1))
+                    outputs['max'].append(group.max(axis=1))
+
+            # 收敛检测：在整块（拼上前一块的末尾，窗口可以跨块）中找第一个平稳窗口，window_data[j] 为第 offset + j + 1 步的状态
+            window_data = chunk if tail is None else np.concatenate([tail, chunk])
+            offset = computed - (0 if tail is None else len(tail))
+            index = self._convergence_index(window_data, window, threshold) if filled else None
+            if index is not None:
+                converged_at = offset + index + 1
+                computed += filled
                 break
-
-        # 转换为numpy数组后再转为列表，确保正确的JSON序列化
-        result = np.array(trajectory)
-
-        # 如果是2D系统，确保每个点都被正确转换
-        if self.dimension == 2:
-            return [point.tolist() if hasattr(point, 'tolist') else list(point) for point in result]
-        else:
-            return result.tolist() if hasattr(result, 'tolist') else list(result)
+            tail = chunk[-window:].copy()
+            computed += filled
+
+        result = {key: np.concatenate(value) if value else np.empty((0,) + shape[1:]) for key, value in outputs.items()}
+        result.update({
+            'decimation': decimation,
+            'bucket_size': bucket,
+            'transient': transient,
+            'steps': int(computed),
+            'diverged': bool(diverged),
+            'converged_at': converged_at,
+            'final_state': list(state) if self.dimension == 2 else state
+        })
+        return result
 
     def find_fixed_points(self, search_range=(-2, 2), n_points=100):
-        """寻找固定点"""
-        fixed_points = []
+        """
+        寻找搜索窗口内的固定点：有闭式解的映射（logistic、tent、Hénon、线性映射）直接取闭式解；
+        其余映射数值求解——一维在 n_points 个网格点上一次性计算 f(x) - x 并同时二分所有变号区间，
+        二维以窗口内 n_points×n_points（至多 64×64）网格点为种子做向量化 Newton 迭代
+        二维映射的窗口对 x、y 两个分量相同
+        """
+        lo, hi = search_range
+
+        if self.kernel.fixed_points is not None:
+            points = np.asarray(self.kernel.fixed_points(), dtype=float).reshape(-1, self.dimension)
+            points = points[np.all((points >= lo) & (points <= hi), axis=1)]
+            if self.dimension == 1:
+                return sorted(float(x) for x in points[:, 0])
+            return [point.tolist() for point in points[np.lexsort(points.T[::-1])]]
 
         if self.dimension == 1:
             # 一维情况：求解 f(x) = x
-            from scipy.optimize import fsolve, brentq
-
-            def fixed_point_eq(x):
-                try:
-                    return self.map_function(x) - x
-                except:
-                    return float('inf')
-
-            # 在搜索范围内寻找零点
-            search_points = np.linspace(search_range[0], search_range[1], n_points)
-
-            for i in range(len(search_points) - 1):
-                try:
-                    x1, x2 = search_points[i], search_points[i + 1]
-                    f1 = fixed_point_eq(x1)
-                    f2 = fixed_point_eq(x2)
-
-                    # 检查边界点是否为零点
-                    if abs(f1) < 1e-6:
-                        # x1 本身是零点
-                        is_new = True
-                        for fp in fixed_points:
-                            if abs(fp - x1) < 1e-6:
-                                is_new = False
-                                break
-                        if is_new:
-                            fixed_points.append(x1)
-
-                    # 检查区间内是否有零穿越（符号变化）
-                    if f1 * f2 < 0:
-                        # 区间内有零点
-                        root = brentq(fixed_point_eq, x1, x2)
-                        if abs(fixed_point_eq(root)) < 1e-6:
-                            # 验证是否已存在
-                            is_new = True
-                            for fp in fixed_points:
-                                if abs(fp - root) < 1e-6:
-                                    is_new = False
-                                    break
-                            if is_new:
-                                fixed_points.append(root)
-                except:
-                    continue
-
-            # 检查最后一个点是否为零点
-            try:
-                if len(search_points) > 0:
-                    last_point = search_points[-1]
-                    if abs(fixed_point_eq(last_point)) < 1e-6:
-                        is_new = True
-                        for fp in fixed_points:
-                            if abs(fp - last_point) < 1e-6:
-                                is_new = False
-                                break
-                        if is_new:
-                            fixed_points.append(last_point)
-            except:
-                pass
+            grid = np.linspace(lo, hi, n_points)
+            with np.errstate(all='ignore'):
+                g = self.kernel.step(grid) * np.ones_like(grid) - grid
+                roots = self._bisect_roots(lambda x: self.kernel.step(x) - x, grid, g)
+                roots = roots[np.abs(self.kernel.step(roots) - roots) < 1e-6]
+            candidates = np.sort(np.concatenate([grid[np.abs(g) < 1e-6], roots]))
+
+            # 按位置排序后去重
+            fixed_points = []
+            for candidate in candidates:
+                if not fixed_points or abs(candidate - fixed_points[-1]) >= 1e-6:
+                    fixed_points.append(float(candidate))
+            return fixed_points
 
         elif self.dimension == 2:
             # 二维情况：求解 f(x,y) = (x,y)
-            from scipy.optimize import fsolve
-
-            def fixed_point_eq_2d(state):
-                """计算 f(x,y) - (x,y)"""
-                try:
-                    result = self.map_function(state)
-                    return [result[0] - state[0], result[1] - state[1]]
-                except:
-                    return [float('inf'), float('inf')]
-
-            # 使用多个初始猜测来寻找固定点
-            initial_guesses = [
-                [0.0, 0.0],
-                [0.1, 0.1],
-                [-0.1, -0.1],
-                [0.5, 0.5],
-                [-0.5, -0.5],
-                [1.0, 0.0],
-                [0.0, 1.0],
-                [-1.0, 0.0],
-                [0.0, -1.0]
-            ]
-
-            for guess in initial_guesses:
-                try:
-                    solution = fsolve(fixed_point_eq_2d, guess)
-                    # 验证是否真的是固定点
-                    residual = fixed_point_eq_2d(solution)
-                    if np.sqrt(residual[0]**2 + residual[1]**2) < 1e-6:
-                        # 检查是否已存在
-                        is_new = True
-                        for fp in fixed_points:
-                            if np.sqrt((fp[0] - solution[0])**2 + (fp[1] - solution[1])**2) < 1e-6:
-                                is_new = False
-                                break
-                        if is_new:
-                            fixed_points.append(solution.tolist())
-                except:
-                    continue
-        else:
-            # 多维情况需要更复杂的算法
-            pass
-
-        return fixed_points
+            axis = np.linspace(lo, hi, min(n_points, 64))
+            X, Y = np.meshgrid(axis, axis)
+            seeds = np.stack([X.ravel(), Y.ravel()], axis=1)
+            orbit, M = self._newton_periodic_points(seeds, 1, bound=10 * max(hi - lo, np.abs(search_range).max()))
+            points = np.array([cycle_orbit[0] for cycle_orbit, _ in self._unique_cycles(orbit, M, 1e-6 * max(hi - lo, 1.0))])
+            if len(points) == 0:
+                return []
+            points = points[np.all((points >= lo) & (points <= hi), axis=1)]
+            return [point.tolist() for point in points[np.lexsort(points.T[::-1])]]
+
+        # 多维情况需要更复杂的算法
+        return []
 
     def analyze_stability(self, fixed_point):
         """分析固定点稳定性"""
         if self.dimension == 1:
             # 计算导数 f'(x*)
-            h = 1e-8
-            x = fixed_point
-
             try:
-                derivative = (self.map_function(x + h) - self.map_function(x - h)) / (2 * h)
+                derivative = float(self.map_derivative(fixed_point))
 
-                if abs(derivative) < 1:
-                    stability = "稳定"
-                elif abs(derivative) > 1:
-                    stability = "不稳定"
-                else:
-                    stability = "临界"
+                stability = self._stability_label(abs(derivative))
 
                 return {
                     'fixed_point': fixed_point,
@@ -1275,36 +2582,16 @@ class DiscreteSystem:
                 }
 
         elif self.dimension == 2:
-            # 计算Jacobian矩阵
-            h = 1e-8
-            x, y = fixed_point[0], fixed_point[1]
-
             try:
-                # 计算偏导数
-                f_x_plus_h = self.map_function([x + h, y])
-                f_x_minus_h = self.map_function([x - h, y])
-                f_y_plus_h = self.map_function([x, y + h])
-                f_y_minus_h = self.map_function([x, y - h])
-
-                # Jacobian矩阵
-                J = np.array([
-                    [(f_x_plus_h[0] - f_x_minus_h[0]) / (2 * h),  # df1/dx
-                     (f_y_plus_h[0] - f_y_minus_h[0]) / (2 * h)], # df1/dy
-                    [(f_x_plus_h[1] - f_x_minus_h[1]) / (2 * h),  # df2/dx
-                     (f_y_plus_h[1] - f_y_minus_h[1]) / (2 * h)]  # df2/dy
-                ])
+                # 解析Jacobian矩阵
+                J = self.map_derivative(fixed_point)
 
                 # 计算特征值
                 eigenvalues = np.linalg.eigvals(J)
                 max_eigenvalue = np.max(np.abs(eigenvalues))
 
                 # 判断稳定性
-                if max_eigenvalue < 1:
-                    stability = "稳定"
-                elif max_eigenvalue > 1:
-                    stability = "不稳定"
-                else:
-                    stability = "临界"
+                stability = self._stability_label(max_eigenvalue)
 
                 return {
                     'fixed_point': fixed_point,
@@ -1323,49 +2610,267 @@ class DiscreteSystem:
 
         return None
 
+    def analyze_fixed_points(self, search_range=(-2, 2), n_points=100):
+        """一次求出窗口内的全部固定点，并用一次向量化的导数/Jacobian 计算给出乘子和稳定性（格式同 analyze_stability）"""
+        fixed_points = self.find_fixed_points(search_range, n_points)
+        if not fixed_points:
+            return []
+        with np.errstate(all='ignore'):
+            derivatives = self.map_derivative(np.asarray(fixed_points, dtype=float))
+
+        results = []
+        for fixed_point, derivative in zip(fixed_points, derivatives):
+            if self.dimension == 1:
+                derivative = float(derivative)
+                results.append({
+                    'fixed_point': fixed_point,
+                    'derivative': derivative,
+                    'stability': self._stability_label(abs(derivative)),
+                    'multiplier': derivative
+                })
+            else:
+                eigenvalues = np.linalg.eigvals(derivative)
+                max_eigenvalue = float(np.max(np.abs(eigenvalues)))
+                results.append({
+                    'fixed_point': fixed_point,
+                    'jacobian': derivative.tolist(),
+                    'eigenvalues': eigenvalues.tolist(),
+                    'max_eigenvalue': max_eigenvalue,
+                    'stability': self._stability_label(max_eigenvalue)
+                })
+        return results
+
+    @staticmethod
+    def _stability_label(magnitude):
+        """按乘子（或最大特征值）的模判断稳定性"""
+        if magnitude < 1:
+            return "稳定"
+        elif magnitude > 1:
+            return "不稳定"
+        return "临界"
+
+    @staticmethod
+    def _bisect_roots(func, grid, g, tol=1e-15):
+        """
+        对网格上 g = func(grid) 的所有变号区间同时二分求根（等价于逐个区间调用 brentq，
+        但每一步只需一次数组调用），二分到区间宽度约为相对机器精度为止
+        """
+        finite = np.isfinite(g)
+        brackets = np.nonzero(finite[:-1] & finite[1:] & (g[:-1] * g[1:] < 0))[0]
+        lo, hi, g_lo = grid[brackets], grid[brackets + 1], g[brackets]
+        if len(brackets) == 0:
+            return lo
+        spacing = np.max(hi - lo)
+        steps = int(np.ceil(np.log2(spacing / (tol * max(1.0, np.max(np.abs(grid)))))))
+        for _ in range(max(steps, 0)):
+            mid = 0.5 * (lo + hi)
+            g_mid = func(mid)
+            right = np.sign(g_mid) == np.sign(g_lo)
+            lo, g_lo = np.where(right, mid, lo), np.where(right, g_mid, g_lo)
+            hi = np.where(right, hi, mid)
+        return 0.5 * (lo + hi)
+
     def detect_periodic_orbits(self, period_max=10, search_range=(-2, 2), n_search=50):
-        """检测周期轨道"""
+        """检测周期轨道，返回 {周期: [轨道点列表]}（n_search 为搜索网格点数的下限）"""
+        return self._group_by_period(self.find_periodic_orbits(period_max, search_range, min_grid=n_search))
+
+    @staticmethod
+    def _group_by_period(cycles):
+        """把周期轨道列表整理为 {周期: [轨道点列表]}"""
         periodic_orbits = {}
+        for cycle in cycles:
+            periodic_orbits.setdefault(cycle['period'], []).append(cycle['orbit'])
+        return periodic_orbits
 
-        if self.dimension == 1:
-            search_points = np.linspace(search_range[0], search_range[1], n_search)
+    @staticmethod
+    def _cycle_stability_key(cycle):
+        """排序键：乘子（二维为最大特征值）的模；超稳定轨道乘子为 0 排在最前，缺失时排在最后"""
+        value = cycle.get('multiplier')
+        if value is None:
+            value = cycle.get('max_eigenvalue')
+        return np.inf if value is None else abs(value)
+
+    @staticmethod
+    def _limit_orbits_per_period(cycles, max_orbits):
+        """
+        每个周期最多保留 max_orbits 条轨道（按乘子/最大特征值模从小到大，即最稳定的在前）
+        返回 (保留的轨道列表, {周期: 检测到的轨道总数})
+        """
+        by_period = {}
+        for cycle in cycles:
+            by_period.setdefault(cycle['period'], []).append(cycle)
+        kept = []
+        for period_cycles in by_period.values():
+            period_cycles.sort(key=DiscreteSystem._cycle_stability_key)
+            kept.extend(period_cycles[:max_orbits])
+        return kept, {period: len(period_cycles) for period, period_cycles in by_period.items()}
+
+    def find_periodic_orbits(self, period_max=10, search_range=(-2, 2), grid_size=None, min_grid=0, tol=1e-6):
+        """
+        一维映射的周期轨道：在细网格上向量化复合得到 fⁿ(x) - x，所有变号区间同时二分求根，
+        丢弃最小周期为 n 的真因子的根，把排序后的根归并成轨道，并给出乘子 ∏f'(x_k)
+        网格点数默认按 64·2^period_max 选取（单峰映射的 fⁿ 至多有 2^n 个单调段）
+        返回 [{'period', 'orbit', 'multiplier', 'stability'}]，轨道从最小的点开始按迭代顺序排列
+        """
+        if self.dimension == 2:
+            return self._find_periodic_orbits_2d(period_max, search_range)
+        if self.dimension != 1:
+            return []
 
-            for period in range(2, period_max + 1):
-                orbits = []
+        grid_size = max(grid_size or min(64 * 2 ** period_max, 2 ** 20), min_grid, 2)
+        grid = np.linspace(search_range[0], search_range[1], grid_size)
 
-                for x0 in search_points:
-                    try:
-                        # 迭代period次
-                        x = x0
-                        for _ in range(period):
-                            x = self.map_function(x)
-
-                        # 检查是否回到起点
-                        if abs(x - x0) < 1e-6:
-                            # 验证轨道
-                            orbit = []
-                            x_temp = x0
-                            for _ in range(period):
-                                orbit.append(x_temp)
-                                x_temp = self.map_function(x_temp)
-
-                            # 检查是否是新轨道
-                            is_new = True
-                            for existing_orbit in orbits:
-                                if any(abs(existing_orbit[0] - point) < 1e-6 for point in orbit):
-                                    is_new = False
-                                    break
-
-                            if is_new:
-                                orbits.append(orbit)
-
-                    except:
+        def iterate_n(x, n):
+            for _ in range(n):
+                x = self.kernel.step(x)
+            return x
+
+        cycles = []
+        y = grid
+        with np.errstate(all='ignore'):
+            for n in range(1, period_max + 1):
+                y = self.kernel.step(y) * np.ones_like(grid)
+                if n == 1:
+                    continue
+                g = y - grid
+                exact = np.isfinite(g) & (g == 0)
+                # 退化情况（如 f(x) = -x 时整段都是周期点）不存在孤立的周期轨道
+                if np.count_nonzero(exact) > grid_size // 10:
+                    continue
+
+                roots = np.sort(np.concatenate([
+                    grid[exact], self._bisect_roots(lambda x: iterate_n(x, n) - x, grid, g)
+                ]))
+                assigned = np.zeros(len(roots), dtype=bool)
+                divisors = [d for d in range(1, n) if n % d == 0]
+                for k, root in enumerate(roots):
+                    if assigned[k]:
                         continue
+                    orbit = [root]
+                    for _ in range(n - 1):
+                        orbit.append(float(self.kernel.step(orbit[-1])))
+                    orbit = np.array(orbit)
 
-                if orbits:
-                    periodic_orbits[period] = orbits
+                    # 同一轨道上的其他根不再单独处理
+                    position = np.searchsorted(roots, orbit)
+                    for neighbour in (np.clip(position - 1, 0, len(roots) - 1), np.clip(position, 0, len(roots) - 1)):
+                        assigned[neighbour[np.abs(roots[neighbour] - orbit) < tol]] = True
 
-        return periodic_orbits
+                    if abs(self.kernel.step(orbit[-1]) - root) >= tol:
+                        continue
+                    if any(abs(orbit[d] - root) < tol for d in divisors):
+                        continue
+
+                    orbit = np.roll(orbit, -int(np.argmin(orbit)))
+                    multiplier = float(np.prod(self.kernel.derivative(orbit)))
+                    cycles.append({
+                        'period': n,
+                        'orbit': orbit.tolist(),
+                        'multiplier': multiplier,
+                        'stability': self._stability_label(abs(multiplier))
+                    })
+
+        return cycles
+
+    def _cycle_jacobians(self, x, n):
+        """从一组状态 x (P, 2) 出发迭代 n 次，返回 (轨道 (n, P, 2), Fⁿ(x), 沿轨道连乘的 Jacobian DFⁿ (P, 2, 2))"""
+        M = np.broadcast_to(np.eye(2), x.shape[:-1] + (2, 2))
+        points = [x]
+        for _ in range(n):
+            M = np.matmul(self.kernel.derivative(points[-1]), M)
+            points.append(self.kernel.step(points[-1]))
+        return np.stack(points[:-1]), points[-1], M
+
+    def _newton_periodic_points(self, seeds, n, bound, max_newton=40, tol=1e-8):
+        """
+        对所有种子同时做 Fⁿ(x) - x 的 Newton 迭代（DFⁿ 由沿轨道的解析 Jacobian 连乘得到），
+        返回收敛且最小周期恰为 n 的根的 (轨道 (m, n, 2), DFⁿ (m, 2, 2))
+        """
+        scale = max(1.0, bound / 10)
+        x = seeds
+        with np.errstate(all='ignore'):
+            for _ in range(max_newton):
+                _, fx, M = self._cycle_jacobians(x, n)
+                # 批量求解 (DFⁿ - I) dx = -(Fⁿ(x) - x)
+                r0, r1 = fx[:, 0] - x[:, 0], fx[:, 1] - x[:, 1]
+                a, b, c, d = M[:, 0, 0] - 1, M[:, 0, 1], M[:, 1, 0], M[:, 1, 1] - 1
+                det = a * d - b * c
+                dx = np.stack([-(d * r0 - b * r1) / det, -(a * r1 - c * r0) / det], axis=1)
+                x = x + dx
+                keep = self._bounded_lanes(x) & (np.maximum(np.abs(x[:, 0]), np.abs(x[:, 1])) < bound)
+                x = x[keep]
+                if len(x) == 0 or np.max(np.abs(dx[keep])) < 1e-14:
+                    break
+            if len(x) == 0:
+                return np.empty((0, n, 2)), np.empty((0, 2, 2))
+
+            orbit, fx, M = self._cycle_jacobians(x, n)
+        converged = np.hypot(fx[:, 0] - x[:, 0], fx[:, 1] - x[:, 1]) < tol * scale
+        for d in range(1, n):
+            if n % d == 0:
+                converged &= np.hypot(*(orbit[d] - orbit[0]).T) > 1e-6 * scale
+        return orbit[:, converged].transpose(1, 0, 2), M[converged]
+
+    @staticmethod
+    def _unique_cycles(orbit, M, cell):
+        """
+        按轨道去重：代表点取 x 分量最小的点，对其量化坐标做空间哈希并检查相邻格子；
+        DFⁿ 有特征值1的（非孤立周期点，如有理旋转角的旋转映射）不报告
+        返回 [(从代表点开始的轨道 (n, 2), DFⁿ 的特征值)]
+        """
+        if len(orbit) == 0:
+            return []
+        start = np.argmin(orbit[:, :, 0], axis=1)
+        representative = orbit[np.arange(len(orbit)), start]
+        keys, first = np.unique(np.round(representative / cell).astype(np.int64), axis=0, return_index=True)
+        seen = set()
+        cycles = []
+        for key, lane in zip(map(tuple, keys), first):
+            if any((key[0] + i, key[1] + j) in seen for i in (-1, 0, 1) for j in (-1, 0, 1)):
+                continue
+            seen.add(key)
+            eigenvalues = np.linalg.eigvals(M[lane])
+            if np.min(np.abs(eigenvalues - 1)) < 1e-8:
+                continue
+            cycles.append((np.roll(orbit[lane], -start[lane], axis=0), eigenvalues))
+        return cycles
+
+    def _find_periodic_orbits_2d(self, period_max=10, search_range=(-2, 2), n_seeds=2000, seed_transient=100,
+                                 seed=0):
+        """
+        二维映射的周期轨道：以吸引子样本（搜索框内随机点迭代暂态后的状态）为种子，
+        对每个周期 n 用向量化 Newton 求 Fⁿ(x) = x 的根，再按轨道去重
+        不动点（周期1）与一维情况一致由 find_fixed_points 给出
+        """
+        rng = np.random.default_rng(seed)
+        lo, hi = search_range
+        width = hi - lo
+        with np.errstate(all='ignore'):
+            seeds = rng.uniform(lo, hi, size=(n_seeds, 2))
+            for _ in range(seed_transient):
+                seeds = self.kernel.step(seeds)
+            seeds = seeds[self._bounded_lanes(seeds)]
+        if len(seeds) == 0:
+            return []
+        # 吸引子可能退化为少数几个点，一半种子加上扰动以覆盖其邻域
+        jitter = rng.normal(scale=0.01 * width, size=seeds.shape)
+        jitter[::2] = 0
+        seeds = seeds + jitter
+        bound = 10 * max(width, np.abs(seeds).max())
+
+        cycles = []
+        for n in range(2, period_max + 1):
+            orbit, M = self._newton_periodic_points(seeds, n, bound)
+            for cycle_orbit, eigenvalues in self._unique_cycles(orbit, M, 1e-6 * max(width, 1.0)):
+                max_eigenvalue = float(np.max(np.abs(eigenvalues)))
+                cycles.append({
+                    'period': n,
+                    'orbit': cycle_orbit.tolist(),
+                    'eigenvalues': eigenvalues.tolist(),
+                    'max_eigenvalue': max_eigenvalue,
+                    'stability': self._stability_label(max_eigenvalue)
+                })
+        return cycles
 
     def compute_lyapunov_exponent(self, x0, n_steps=1000):
         """计算Lyapunov指数"""
@@ -1375,9 +2880,8 @@ class DiscreteSystem:
                 x = x0
 
                 for i in range(n_steps):
-                    # 计算导数
-                    h = 1e-8
-                    derivative = (self.map_function(x + h) - self.map_function(x - h)) / (2 * h)
+                    # 解析导数
+                    derivative = self.map_derivative(x)
 
                     if abs(derivative) > 0:
                         lyap_sum += np.log(abs(derivative))
@@ -1414,21 +2918,9 @@ class DiscreteSystem:
                 # 初始化正交向量
                 w = np.eye(2)
 
-                h = 1e-8
-
                 for i in range(n_steps):
-                    # 计算Jacobian矩阵
-                    f_x_plus_h = self.map_function(x + np.array([h, 0]))
-                    f_x_minus_h = self.map_function(x - np.array([h, 0]))
-                    f_y_plus_h = self.map_function(x + np.array([0, h]))
-                    f_y_minus_h = self.map_function(x - np.array([0, h]))
-
-                    J = np.array([
-                        [(f_x_plus_h[0] - f_x_minus_h[0]) / (2 * h),
-                         (f_y_plus_h[0] - f_y_minus_h[0]) / (2 * h)],
-                        [(f_x_plus_h[1] - f_x_minus_h[1]) / (2 * h),
-                         (f_y_plus_h[1] - f_y_minus_h[1]) / (2 * h)]
-                    ])
+                    # 解析Jacobian矩阵
+                    J = self.map_derivative(x)
 
                     # 更新向量
                     w = J @ w
@@ -1464,76 +2956,653 @@ class DiscreteSystem:
 
         return None
 
-    def bifurcation_diagram(self, param_name='r', param_range=(2.5, 4.0), param_steps=1000,
-                          x0=0.5, transient=100, n_points=50):
-        """生成分岔图"""
-        param_values = np.linspace(param_range[0], param_range[1], param_steps)
-        bifurcation_data = []
-
-        # 根据系统维度设置正确的初始条件
-        if self.dimension == 1:
-            initial_state = x0 if np.isscalar(x0) else x0
-        else:
-            # 二维映射需要二维初始条件
-            if np.isscalar(x0):
-                initial_state = np.array([0.1, 0.1])  # Hénon映射的典型初始条件
+    @staticmethod
+    def _bounded_lanes(state):
+        """逐通道判断状态是否有限且未发散（一维状态形状 (P,)，二维 (P, 2)）"""
+        magnitude = np.abs(state) if state.ndim == 1 else np.maximum(np.abs(state[:, 0]), np.abs(state[:, 1]))
+        return np.isfinite(magnitude) & (magnitude < 1e6)
+
+    def ensemble_density(self, n_samples=1000000, chunk_size=100000, transient=200, n_iterations=10,
+                         bins=200, x_range=None, y_range=None, init_range=None, seed=None):
+        """
+        集合迭代估计自然不变密度：大量初始条件按块组成数组同时迭代，内存只取决于块大小；
+        跳过暂态后每一步的状态都累加进运行直方图（一维为 bins 个区间，二维为 bins×bins 网格，行对应 y）
+        收敛诊断：每块加入后归一化密度的 L1 变化量，以及奇偶块两组独立估计之间的 L1 距离
+        """
+        dim = self.dimension
+        rng = np.random.default_rng(seed)
+        ranges = [x_range, y_range][:dim]
+        if init_range is None:
+            if all(r is not None for r in ranges):
+                init_range = ranges
             else:
-                initial_state = np.array(x0)
-
-        for param_val in param_values:
-            # 更新参数
-            old_param = self.parameters[param_name]
-            self.parameters[param_name] = param_val
-
-            try:
-                # 对每个参数值重新开始迭代（关键修正）
-                x = initial_state.copy() if hasattr(initial_state, 'copy') else initial_state
-                
-                # 跳过暂态
-                for _ in range(transient):
-                    x = self.map_function(x)
-
-                # 收集数据点
-                points = []
-                for _ in range(n_points):
-                    x = self.map_function(x)
-
-                    # 处理一维和二维映射
-                    if self.dimension == 1:
-                        # 一维映射：直接使用x
-                        if abs(x) < 1e6:
-                            points.append(x)
-                        else:
-                            break
-                    else:
-                        # 二维映射：只取第一个分量x[0]
-                        if np.all(np.abs(x) < 1e6):
-                            points.append(x[0])  # 只保存x分量
-                        else:
-                            break
-
-                bifurcation_data.append({
-                    'parameter': param_val,
-                    'points': points
-                })
-
-            except Exception as e:
-                # 添加更详细的错误信息用于调试
-                bifurcation_data.append({
-                    'parameter': param_val,
-                    'points': [],
-                    'error': str(e)
+                init_range = [(0.0, 1.0)] if dim == 1 else [(-0.5, 0.5), (-0.5, 0.5)]
+        init = np.asarray(init_range, dtype=float).reshape(dim, 2)
+        size = bins ** dim
+        halves = [np.zeros(size, dtype=np.int64), np.zeros(size, dtype=np.int64)]
+
+        def bin_index(state, valid):
+            coords = [state] if dim == 1 else [state[:, 1], state[:, 0]]
+            axis_ranges = ranges[::-1]
+            flat = np.zeros(len(valid), dtype=np.int64)
+            inside = valid.copy()
+            for c, (lo, hi) in zip(coords, axis_ranges):
+                index = np.floor((c - lo) * (bins / (hi - lo))).astype(np.int64)
+                inside &= (index >= 0) & (index < bins)
+                flat = flat * bins + index
+            return flat[inside]
+
+        convergence = []
+        previous = None
+        escaped = 0
+        n_chunks = int(np.ceil(n_samples / chunk_size))
+        with np.errstate(all='ignore'):
+            for chunk in range(n_chunks):
+                lanes = min(chunk_size, n_samples - chunk * chunk_size)
+                x = rng.uniform(init[:, 0], init[:, 1], size=(lanes, dim))
+                if dim == 1:
+                    x = x[:, 0]
+                alive = np.ones(lanes, dtype=bool)
+
+                for step in range(transient + n_iterations):
+                    x = self.kernel.step(x)
+                    bounded = self._bounded_lanes(x)
+                    if not bounded.all():
+                        alive &= bounded
+                        x[~alive] = 0
+                    if step < transient:
+                        continue
+                    # 直方图范围未指定时由第一批收集的点确定
+                    for axis, r in enumerate(ranges):
+                        if r is None:
+                            values = (x if dim == 1 else x[:, axis])[alive]
+                            lo, hi = (values.min(), values.max()) if values.size else (0.0, 1.0)
+                            pad = 0.02 * max(hi - lo, 1e-9)
+                            ranges[axis] = (float(lo - pad), float(hi + pad))
+                    halves[chunk % 2] += np.bincount(bin_index(x, alive), minlength=size)
+
+                escaped += int(lanes - alive.sum())
+                total = halves[0] + halves[1]
+                density = total / max(total.sum(), 1)
+                convergence.append({
+                    'samples': int(total.sum()),
+                    'l1_change': float(np.abs(density - previous).sum()) if previous is not None else None
                 })
+                previous = density
 
-            # 恢复参数
-            self.parameters[param_name] = old_param
+        counts = halves[0] + halves[1]
+        split_half_l1 = None
+        if halves[0].sum() and halves[1].sum():
+            split_half_l1 = float(np.abs(halves[0] / halves[0].sum() - halves[1] / halves[1].sum()).sum())
 
-        return bifurcation_data
+        # 概率密度：计数 / (总样本数 × 单元面积)
+        cell = np.prod([(hi - lo) / bins for lo, hi in ranges])
+        shape = (bins,) if dim == 1 else (bins, bins)
+        return {
+            'counts': counts.reshape(shape),
+            'density': (counts / max(counts.sum(), 1) / cell).reshape(shape),
+            'x_range': list(ranges[0]),
+            'y_range': list(ranges[1]) if dim == 2 else None,
+            'bins': bins,
+            'n_initial': int(n_samples),
+            'samples': int(counts.sum()),
+            'escaped_fraction': escaped / max(n_samples, 1),
+            'convergence': convergence,
+            'split_half_l1': split_half_l1
+        }
 
-    def generate_cobweb_plot(self, x0, n_steps=20):
-        """生成蛛网图数据"""
+    def ulam_density(self, n_cells=1000, x_range=None, samples_per_cell=32, n_eigenvalues=6):
+        """
+        Ulam 方法估计一维映射的不变密度：把区间分成 n_cells 个格子，每个格子内均匀取 samples_per_cell 个子样本点，
+        由其像落入的格子构造稀疏 Markov 转移矩阵 P，P 的转置的主特征向量即不变密度
+        同时给出前几个特征值，第二特征值的模给出谱隙与混合速率；落到区间外的样本视为逃逸（主特征值 < 1 时给出逃逸率）
+        x_range 为空时由一组短轨道的范围确定：能扩展为前向不变区间时直接使用该区间（不加余量，
+        采样误差造成的越界样本归入边界格子，不计为逃逸），否则两端留余量；结果按 (映射, 参数, 网格设置) 缓存
+        """
         if self.dimension != 1:
-            return None
+            raise ValueError('Ulam 方法只支持一维映射')
+        if int(n_cells) < 3:
+            raise ValueError('格子数至少为 3')
+        closed = False
+        if x_range is None:
+            hull = self._forward_invariant_hull(*self._attractor_range(pad=False))
+            closed = hull is not None
+            x_range = hull if closed else self._attractor_range()
+        key = (self.map_type, tuple(self.expressions or ()), repr(sorted(self.parameters.items())),
+               int(n_cells), (float(x_range[0]), float(x_range[1])), int(samples_per_cell), int(n_eigenvalues),
+               closed)
+        with _ULAM_CACHE_LOCK:
+            if key in _ULAM_CACHE:
+                _ULAM_CACHE.move_to_end(key)
+                return dict(_ULAM_CACHE[key], cached=True)
+
+        result = self._ulam_operator(int(n_cells), key[4], int(samples_per_cell), int(n_eigenvalues), closed)
+        with _ULAM_CACHE_LOCK:
+            _ULAM_CACHE[key] = result
+            while len(_ULAM_CACHE) > _ULAM_CACHE_SIZE:
+                _ULAM_CACHE.popitem(last=False)
+        return dict(result, cached=False)
+
+    def _attractor_range(self, n_lanes=1000, transient=200, seed=0, pad=True):
+        """用一组短轨道估计一维吸引子所在区间（pad=True 时两端各留半个百分点余量）"""
+        x = np.random.default_rng(seed).uniform(0.0, 1.0, n_lanes)
+        with np.errstate(all='ignore'):
+            for _ in range(transient):
+                x = self.kernel.step(x)
+        x = x[self._bounded_lanes(x)]
+        if len(x) == 0:
+            raise ValueError('所有轨道都发散，无法确定区间，请指定 x_range')
+        low, high = float(x.min()), float(x.max())
+        if not pad:
+            return low, high
+        margin = 0.005 * (high - low) or 0.5
+        return low - margin, high + margin
+
+    def _forward_invariant_hull(self, low, high, n_grid=4097, max_iterations=20, tol=1e-9):
+        """
+        把区间 J 反复扩展为 J ∪ f(J) 的凸包（f(J) 由网格采样），不再增长时 J 近似前向不变（f(J) ⊂ J）；
+        区间退化为一点、出现非有限值或迭代不收敛时返回 None
+        """
+        for _ in range(max_iterations):
+            width = high - low
+            if not width > 1e-12:
+                return None
+            with np.errstate(all='ignore'):
+                images = self.kernel.step(np.linspace(low, high, n_grid))
+            if not np.all(np.isfinite(images)):
+                return None
+            new_low, new_high = min(low, float(images.min())), max(high, float(images.max()))
+            if new_low >= low - tol * width and new_high <= high + tol * width:
+                return low, high
+            low, high = new_low, new_high
+        return None
+
+    def _ulam_operator(self, n_cells, x_range, samples_per_cell, n_eigenvalues, closed=False):
+        """构造 Ulam 转移矩阵并求其主特征向量与前几个特征值（closed=True 时区间前向不变，越界样本归入边界格子）"""
+        low, high = x_range
+        width = (high - low) / n_cells
+        # 所有格子的子样本点一次性计算像
+        offsets = (np.arange(samples_per_cell) + 0.5) / samples_per_cell
+        points = low + (np.arange(n_cells)[:, None] + offsets[None, :]) * width
+        with np.errstate(all='ignore'):
+            images = self.kernel.step(points.ravel())
+        target = np.floor((images - low) / width)
+        if closed:
+            target = np.clip(target, 0, n_cells - 1)
+        inside = np.isfinite(target) & (target >= 0) & (target < n_cells)
+        source = np.repeat(np.arange(n_cells), samples_per_cell)[inside]
+        target = target[inside].astype(np.int64)
+
+        # 重复的 (i, j) 在转换为 CSR 时自动求和，得到每个格子转移到各格子的样本比例
+        P = sparse.coo_matrix((np.full(len(source), 1.0 / samples_per_cell), (source, target)),
+                              shape=(n_cells, n_cells)).tocsr()
+        k = max(1, min(n_eigenvalues, n_cells - 2))
+        try:
+            values, vectors = eigs(P.T, k=k, which='LM', tol=1e-10, maxiter=max(5000, 10 * n_cells))
+            order = np.argsort(-np.abs(values))
+            values, leading = values[order], np.real(vectors[:, order[0]])
+        except ArpackNoConvergence as e:
+            # ARPACK 不收敛（例如除 1 以外的特征值高度简并）时，主特征向量改用幂迭代，只保留已收敛的特征值
+            values = e.eigenvalues[np.argsort(-np.abs(e.eigenvalues))] if len(e.eigenvalues) else None
+            leading = self._ulam_power_iteration(P)
+
+        density = np.abs(leading)
+        density /= density.sum() * width
+        result = {
+            'x_range': [low, high],
+            'n_cells': n_cells,
+            'samples_per_cell': samples_per_cell,
+            'x': low + (np.arange(n_cells) + 0.5) * width,
+            'density': density,
+            'escape_fraction': 1 - np.count_nonzero(inside) / inside.size,
+            'nnz': int(P.nnz)
+        }
+        if values is not None:
+            moduli = np.abs(values)
+            result['eigenvalues'] = values
+            result['leading_eigenvalue'] = float(moduli[0])
+            result['escape_rate'] = max(0.0, float(-np.log(moduli[0]))) if moduli[0] > 0 else None
+            if len(moduli) > 1:
+                result['spectral_gap'] = float(moduli[0] - moduli[1])
+                result['mixing_rate'] = float(-np.log(moduli[1] / moduli[0])) if moduli[1] > 0 else None
+        return result
+
+    @staticmethod
+    def _ulam_power_iteration(P, max_iterations=10000, tol=1e-12):
+        """幂迭代 v <- P^T v 求主特征向量"""
+        PT = P.T.tocsr()
+        v = np.full(P.shape[0], 1.0 / P.shape[0])
+        for _ in range(max_iterations):
+            w = PT @ v
+            total = w.sum()
+            if total <= 0:
+                break
+            w /= total
+            if np.abs(w - v).sum() < tol:
+                return w
+            v = w
+        return v
+
+    def _initial_lanes(self, x0, n_lanes):
+        """把同一个初始条件复制到每条通道（二维映射给出标量初值时使用 (0.1, 0.1)）"""
+        if self.dimension == 1:
+            return np.full(n_lanes, float(x0 if np.isscalar(x0) else np.ravel(x0)[0]))
+        start = np.array([0.1, 0.1]) if np.isscalar(x0) else np.asarray(x0, dtype=float)
+        return np.tile(start, (n_lanes, 1))
+
+    def _lyapunov_lanes(self, kernel, x, transient, n_steps):
+        """
+        对一组通道同时计算 Lyapunov 指数（内核的参数可以是每条通道一个值的数组）
+        一维：累加 log|f'(x)|（导数为0的步跳过，与单点计算一致）；
+        二维：切向量按批次做 2×2 Gram-Schmidt 正交化，累加两个方向的对数伸长率
+        返回 (指数数组，一维形状 (P,)、二维形状 (P, 2)；未发散掩码)，发散的通道指数为 NaN
+        """
+        n_lanes = len(x)
+        alive = np.ones(n_lanes, dtype=bool)
+        with np.errstate(all='ignore'):
+            for _ in range(transient):
+                x = kernel.step(x)
+            alive &= self._bounded_lanes(x)
+
+            if self.dimension == 1:
+                log_sum = np.zeros(n_lanes)
+                for _ in range(n_steps):
+                    derivative = np.abs(kernel.derivative(x))
+                    log_sum += np.where(derivative > 0, np.log(derivative), 0.0)
+                    x = kernel.step(x)
+                    alive &= self._bounded_lanes(x)
+                exponents = log_sum / n_steps
+            else:
+                log_sum = np.zeros((n_lanes, 2))
+                # 两个切向量 u、v 的分量，初始为单位正交基
+                u0, u1 = np.ones(n_lanes), np.zeros(n_lanes)
+                v0, v1 = np.zeros(n_lanes), np.ones(n_lanes)
+                for _ in range(n_steps):
+                    J = kernel.derivative(x)
+                    j11, j12, j21, j22 = J[..., 0, 0], J[..., 0, 1], J[..., 1, 0], J[..., 1, 1]
+                    u0, u1 = j11 * u0 + j12 * u1, j21 * u0 + j22 * u1
+                    v0, v1 = j11 * v0 + j12 * v1, j21 * v0 + j22 * v1
+
+                    # Gram-Schmidt：r11 = |u|，r22 = |v - (v·q1) q1|
+                    r11 = np.hypot(u0, u1)
+                    u0, u1 = u0 / r11, u1 / r11
+                    projection = u0 * v0 + u1 * v1
+                    v0, v1 = v0 - projection * u0, v1 - projection * u1
+                    r22 = np.hypot(v0, v1)
+                    v0, v1 = v0 / r22, v1 / r22
+
+                    log_sum[:, 0] += np.log(r11)
+                    log_sum[:, 1] += np.log(r22)
+                    x = kernel.step(x)
+                    alive &= self._bounded_lanes(x)
+                exponents = log_sum / n_steps
+
+            alive &= np.all(np.isfinite(exponents.reshape(n_lanes, -1)), axis=1)
+        exponents[~alive] = np.nan
+        return exponents, alive
+
+    def lyapunov_sweep(self, param_name='r', param_range=(2.5, 4.0), param_steps=1000, x0=0.5,
+                       transient=200, n_steps=1000):
+        """Lyapunov指数随参数变化的曲线：所有参数值作为通道一次性向量化计算，使用解析导数"""
+        param_values = np.linspace(param_range[0], param_range[1], param_steps)
+        kernel = self.sweep_kernel(param_name, param_values)
+        exponents, alive = self._lyapunov_lanes(kernel, self._initial_lanes(x0, param_steps), transient, n_steps)
+        return {
+            'parameters': param_values,
+            'lyapunov_exponent': exponents if self.dimension == 1 else exponents[:, 0],
+            'lyapunov_exponents': None if self.dimension == 1 else exponents,
+            'diverged': ~alive
+        }
+
+    # 单峰映射的临界点（极大值点）：左支递增记为 L，右支递减记为 R
+    UNIMODAL_CRITICAL_POINTS = {'logistic': 0.5, 'tent': 0.5, 'sine': 0.5, 'gauss': 0.0}
+
+    def _critical_point(self, critical_point=None):
+        """单峰映射的临界点；自定义映射需要显式给出"""
+        if self.dimension != 1:
+            raise ValueError('符号动力学只支持一维单峰映射')
+        if critical_point is not None:
+            return float(critical_point)
+        if self.map_type not in self.UNIMODAL_CRITICAL_POINTS:
+            raise ValueError(f'{self.map_type} 映射不是已知的单峰映射，请指定临界点 critical_point')
+        return self.UNIMODAL_CRITICAL_POINTS[self.map_type]
+
+    @staticmethod
+    def _kneading_signs(kernel, c, n_lanes, length, tol=1e-10):
+        """
+        临界点轨道 f(c), f²(c), ... 的符号：L 记 +1，R 记 -1，落在临界点上（C）记 0
+        内核参数可以是每条通道一个值的数组，返回 (n_lanes, length)
+        """
+        x = np.full(n_lanes, c)
+        signs = np.empty((n_lanes, length))
+        with np.errstate(all='ignore'):
+            for k in range(length):
+                x = kernel.step(x)
+                # 发散到 ±inf 的轨道停留在左支之外，记为 L；NaN 同样记为 L
+                signs[:, k] = np.where(np.abs(x - c) < tol, 0.0, np.where(x > c, -1.0, 1.0))
+        return signs
+
+    @staticmethod
+    def _kneading_t_max(length):
+        """截断到 length 项的揉序级数在 t ≤ t_max 内可靠（尾项 t^K / (1-t) < 1e-10），对应可分辨的最小熵 -log t_max"""
+        return min(0.9999, float(np.exp(np.log(1e-10) / length)))
+
+    @staticmethod
+    def _kneading_entropy(signs, grid_size=1024, n_bisect=40):
+        """
+        Milnor–Thurston 揉序行列式 D(t) = 1 + Σ θ_k t^k，θ_k = ε_1 ε_2 ... ε_k；
+        拓扑熵 h = -log t*，t* 为 D 在 (0, 1) 内的最小零点（没有零点时 h = 0）。
+        由于 h ≤ log 2，只需在 [1/2, t_max] 上搜索（更靠近 1 时截断误差会造成虚假零点）：
+        先在网格上找第一个变号区间，再对所有通道同时二分
+        """
+        theta = np.concatenate([np.ones((len(signs), 1)), np.cumprod(signs, axis=1)], axis=1)
+        powers = np.arange(theta.shape[1])
+        t_grid = np.linspace(0.499, DiscreteSystem._kneading_t_max(signs.shape[1]), grid_size)
+        values = theta @ (t_grid[None, :] ** powers[:, None])
+        sign_change = np.signbit(values[:, :-1]) != np.signbit(values[:, 1:])
+        has_root = sign_change.any(axis=1)
+        first = np.argmax(sign_change, axis=1)
+
+        low, high = t_grid[first], t_grid[first + 1]
+        value_low = values[np.arange(len(values)), first]
+        for _ in range(n_bisect):
+            mid = 0.5 * (low + high)
+            value_mid = np.sum(theta * mid[:, None] ** powers[None, :], axis=1)
+            left = np.signbit(value_mid) != np.signbit(value_low)
+            high = np.where(left, mid, high)
+            low = np.where(left, low, mid)
+            value_low = np.where(left, value_low, value_mid)
+        return np.where(has_root, -np.log(0.5 * (low + high)), 0.0)
+
+    def kneading_sequence(self, length=64, critical_point=None):
+        """揉序列：临界点轨道 f(c), f²(c), ... 的符号串（L/R/C）"""
+        c = self._critical_point(critical_point)
+        signs = self._kneading_signs(self.kernel, c, 1, length)[0]
+        return ''.join('C' if s == 0 else ('L' if s > 0 else 'R') for s in signs)
+
+    def symbolic_dynamics(self, max_word_length=16, n_orbits=64, n_steps=100000, transient=1000,
+                          kneading_length=1000, critical_point=None, seed=0):
+        """
+        单峰映射的符号动力学分析：
+        - 揉序列与由揉序行列式得到的拓扑熵
+        - 在吸引子上的长轨道中统计各长度的可容许词：n_orbits 条轨道向量化迭代，
+          每步以滚动整数编码 code = ((code << 1) | s) & mask 得到长度为 max_word_length 的词，较短的词由其前缀得到
+        - 由词数增长估计熵：块熵 log N(n) / n 与差分熵 log N(n) - log N(n-1)
+        帐篷映射另给出精确值 log μ
+        """
+        c = self._critical_point(critical_point)
+        max_word_length = int(max_word_length)
+        if not 1 <= max_word_length <= 24:
+            raise ValueError('词长必须在 1 到 24 之间')
+
+        signs = self._kneading_signs(self.kernel, c, 1, kneading_length)
+        kneading_entropy = float(self._kneading_entropy(signs)[0])
+
+        low, high = self._attractor_range()
+        x = np.random.default_rng(seed).uniform(low, high, n_orbits)
+        mask = (1 << max_word_length) - 1
+        seen = np.zeros(1 << max_word_length, dtype=bool)
+        code = np.zeros(n_orbits, dtype=np.int64)
+        alive = np.ones(n_orbits, dtype=bool)
+        with np.errstate(all='ignore'):
+            for step in range(transient + n_steps):
+                x = self.kernel.step(x)
+                if step < transient:
+                    continue
+                code = ((code << 1) | (x > c)) & mask
+                if step >= transient + max_word_length - 1:
+                    alive &= self._bounded_lanes(x)
+                    seen[code[alive]] = True
+
+        words = np.nonzero(seen)[0]
+        word_counts = []
+        for n in range(1, max_word_length + 1):
+            word_counts.append(int(len(np.unique(words >> (max_word_length - n)))))
+        counts = np.array(word_counts, dtype=float)
+        lengths = np.arange(1, max_word_length + 1)
+        with np.errstate(divide='ignore'):
+            log_counts = np.log(counts)
+        block_entropy = log_counts / lengths
+        difference_entropy = np.diff(log_counts, prepend=0.0)
+
+        result = {
+            'critical_point': c,
+            'kneading_sequence': ''.join('C' if s == 0 else ('L' if s > 0 else 'R') for s in signs[0][:64]),
+            'kneading_entropy': kneading_entropy,
+            'entropy_resolution': -np.log(self._kneading_t_max(kneading_length)),
+            'word_lengths': lengths,
+            'word_counts': word_counts,
+            'block_entropy': block_entropy,
+            'difference_entropy': difference_entropy,
+            'word_entropy': float(difference_entropy[-1]) if counts[-1] > 0 else None,
+            'samples': int(n_orbits * n_steps),
+            'escaped_orbits': int(np.count_nonzero(~alive))
+        }
+        if self.map_type == 'tent':
+            mu = float(self.parameters.get('mu', 2.0))
+            result['exact_entropy'] = float(np.log(mu)) if mu > 1 else 0.0
+        return result
+
+    def entropy_sweep(self, param_name='r', param_range=(3.4, 4.0), param_steps=1000, kneading_length=1000,
+                      word_length=10, x0=None, transient=500, n_steps=2000, critical_point=None):
+        """
+        拓扑熵随参数变化的曲线：与分岔图相同，所有参数值作为通道一次性向量化迭代
+        - 揉序熵：临界点轨道的符号由 sweep_kernel 对全部通道同时迭代得到
+        - 词数熵：每条通道一条吸引子轨道，滚动编码的长度为 word_length 的词记入 (通道, 词) 位图，
+          差分估计 log N(L) - log N(L-1)（周期窗口中趋于 0，反映吸引子而非整个不变集的复杂度）
+        """
+        c = self._critical_point(critical_point)
+        word_length = int(word_length)
+        if not 2 <= word_length <= 16:
+            raise ValueError('词长必须在 2 到 16 之间')
+        # (通道, 词) 位图的大小为 param_steps·2^word_length 字节
+        if param_steps << word_length > 1 << 24:
+            raise ValueError('参数步数与词表大小（2^词长）的乘积过大（上限 2^24）')
+        param_values = np.linspace(param_range[0], param_range[1], param_steps)
+        kernel = self.sweep_kernel(param_name, param_values)
+
+        signs = self._kneading_signs(kernel, c, param_steps, kneading_length)
+        kneading_entropy = self._kneading_entropy(signs)
+
+        mask = (1 << word_length) - 1
+        seen = np.zeros((param_steps, 1 << word_length), dtype=bool)
+        lanes = np.arange(param_steps)
+        code = np.zeros(param_steps, dtype=np.int64)
+        x = self._initial_lanes(c if x0 is None else x0, param_steps)
+        # 从临界点出发的轨道在周期窗口中会精确落到超稳定周期上，稍作偏移
+        if x0 is None:
+            x += 1e-3
+        alive = np.ones(param_steps, dtype=bool)
+        with np.errstate(all='ignore'):
+            for step in range(transient + n_steps):
+                x = kernel.step(x)
+                if step < transient:
+                    continue
+                code = ((code << 1) | (x > c)) & mask
+                if step >= transient + word_length - 1:
+                    alive &= self._bounded_lanes(x)
+                    seen[lanes[alive], code[alive]] = True
+
+        n_words = seen.sum(axis=1)
+        n_prefixes = seen.reshape(param_steps, 1 << (word_length - 1), 2).any(axis=2).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            word_entropy = np.where(alive & (n_prefixes > 0), np.log(n_words) - np.log(n_prefixes), np.nan)
+        return {
+            'parameters': param_values,
+            'kneading_entropy': kneading_entropy,
+            'entropy_resolution': -np.log(self._kneading_t_max(kneading_length)),
+            'word_entropy': word_entropy,
+            'word_length': word_length,
+            'diverged': ~alive
+        }
+
+    def _iterate_lanes(self, param_name, param_values, x0, transient, n_points):
+        """
+        向量化分岔图引擎：所有参数值同时迭代，跳过暂态后逐步产出 (x 分量, 有效掩码)
+        通道一旦发散即冻结为0并永久标记为无效（与逐点迭代时遇到发散即停止一致）
+        """
+        kernel = self.sweep_kernel(param_name, param_values)
+        n_lanes = len(param_values)
+        x = self._initial_lanes(x0, n_lanes)
+        alive = np.ones(n_lanes, dtype=bool)
+
+        with np.errstate(all='ignore'):
+            for step in range(transient + n_points):
+                x = kernel.step(x)
+                bounded = self._bounded_lanes(x)
+                if not bounded.all():
+                    alive &= bounded
+                    x[~alive] = 0
+                if step >= transient:
+                    yield (x if self.dimension == 1 else x[:, 0]), alive
+
+    def parameter_plane(self, param_x='a', x_range=(1.0, 1.4), x_steps=200, param_y='b', y_range=(0.0, 0.4),
+                        y_steps=200, x0=0.1, transient=300, max_period=32, tol=1e-6, lyapunov=False,
+                        lyapunov_steps=200, workers=None, chunk_size=100000):
+        """
+        双参数平面的周期/稳定性图：网格上每个 (param_x, param_y) 为一条通道，整组向量化迭代，
+        网格按块分给共享的有界进程池并行计算（workers 截断到服务端上限），耗时与格子数成正比
+        标签：k（1..max_period）为检测到的周期，0 为未检测到周期，-1 为发散；
+        lyapunov=True 时同时计算最大 Lyapunov 指数，未检测到周期且指数为正的格子标为 -2（混沌）
+        返回的栅格行对应 param_y、列对应 param_x
+        """
+        xs = np.linspace(x_range[0], x_range[1], x_steps)
+        ys = np.linspace(y_range[0], y_range[1], y_steps)
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        n_cells = grid_x.size
+        n_chunks = max(1, int(np.ceil(n_cells / chunk_size)))
+        settings = {'param_x': param_x, 'param_y': param_y, 'x0': x0, 'transient': transient,
+                    'max_period': max_period, 'tol': tol, 'lyapunov': lyapunov, 'lyapunov_steps': lyapunov_steps}
+        tasks = [(self, cx, cy, settings) for cx, cy in zip(np.array_split(grid_x.ravel(), n_chunks),
+                                                             np.array_split(grid_y.ravel(), n_chunks))]
+        results = _run_chunked(_parameter_plane_chunk_worker, tasks, workers)
+
+        labels = np.concatenate([r[0] for r in results]).reshape(y_steps, x_steps)
+        values, counts = np.unique(labels, return_counts=True)
+        result = {
+            'param_x': param_x,
+            'param_y': param_y,
+            'x_values': xs,
+            'y_values': ys,
+            'labels': labels,
+            'label_counts': {int(v): int(c) for v, c in zip(values, counts)},
+            'max_period': max_period
+        }
+        if lyapunov:
+            result['lyapunov'] = np.concatenate([r[1] for r in results]).reshape(y_steps, x_steps)
+        return result
+
+    def _parameter_plane_chunk(self, x_values, y_values, param_x, param_y, x0, transient, max_period, tol,
+                               lyapunov, lyapunov_steps):
+        """参数平面的一块：跳过暂态后以当前状态为参考，寻找最小的 k 使 |F^k(x) - x| < tol"""
+        kernel = self.sweep_kernel({param_x: x_values, param_y: y_values})
+        n_lanes = len(x_values)
+        x = self._initial_lanes(x0, n_lanes)
+
+        with np.errstate(all='ignore'):
+            # 发散的通道会变成 inf/NaN 并保持下去，所以只需定期冻结，不必每步检查
+            for step in range(transient):
+                x = kernel.step(x)
+                if step % 32 == 31:
+                    x[~self._bounded_lanes(x)] = np.nan
+            alive = self._bounded_lanes(x)
+            x[~alive] = 0
+
+            labels = np.where(alive, 0, -1).astype(np.int8)
+            reference = x
+            pending = alive.copy()
+            for k in range(1, max_period + 1):
+                x = kernel.step(x)
+                distance = np.abs(x - reference)
+                if distance.ndim == 2:
+                    distance = distance.max(axis=1)
+                hit = pending & (distance < tol)
+                labels[hit] = k
+                pending &= ~hit
+                alive &= self._bounded_lanes(x)
+            labels[~alive] = -1
+
+            exponents = None
+            if lyapunov:
+                x[~alive] = 0
+                exponents, bounded = self._lyapunov_lanes(kernel, x, 0, lyapunov_steps)
+                if exponents.ndim == 2:
+                    exponents = exponents.max(axis=1)
+                exponents = np.where(alive & bounded, exponents, np.nan)
+                labels[(labels == 0) & (exponents > 0)] = -2
+        return labels, exponents
+
+    def _bifurcation_orbits(self, param_name, param_values, x0, transient, n_points):
+        """返回 (n_points, P) 的轨道数组（二维映射取 x 分量）以及每条通道在发散前收集到的点数"""
+        orbits = np.empty((n_points, len(param_values)))
+        counts = np.zeros(len(param_values), dtype=int)
+        for i, (x, alive) in enumerate(self._iterate_lanes(param_name, param_values, x0, transient, n_points)):
+            orbits[i] = x
+            counts += alive
+        return orbits, counts
+
+    def bifurcation_density(self, param_name='r', param_range=(2.5, 4.0), param_bins=800, x_bins=600,
+                            x_range=None, samples_per_bin=1, x0=0.5, transient=200, n_points=500,
+                            chunk_steps=64):
+        """
+        分岔图密度栅格：轨道点直接累加到 (x_bins, param_bins) 的计数直方图中，
+        内存与返回数据量只取决于图像尺寸，与迭代次数无关
+        x_range 为空时由第一批收集的点自动确定
+        """
+        if x_range is not None:
+            x_range = (float(x_range[0]), float(x_range[1]))
+            if not x_range[1] > x_range[0]:
+                raise ValueError('x_range 的上界必须大于下界')
+        n_lanes = param_bins * samples_per_bin
+        param_values = np.linspace(param_range[0], param_range[1], n_lanes)
+        param_bin = np.repeat(np.arange(param_bins), samples_per_bin)
+        counts = np.zeros(x_bins * param_bins, dtype=np.int64)
+
+        def accumulate(block_x, block_valid):
+            nonlocal x_range
+            if x_range is None:
+                values = block_x[block_valid]
+                lo, hi = (values.min(), values.max()) if values.size else (0.0, 1.0)
+                pad = 0.02 * max(hi - lo, 1e-9)
+                x_range = (float(lo - pad), float(hi + pad))
+            scale = x_bins / (x_range[1] - x_range[0])
+            x_index = np.floor((block_x - x_range[0]) * scale).astype(np.int64)
+            inside = block_valid & (x_index >= 0) & (x_index < x_bins)
+            flat = x_index[inside] * param_bins + np.broadcast_to(param_bin, block_x.shape)[inside]
+            counts[:] += np.bincount(flat, minlength=counts.size)
+
+        block_x, block_valid = [], []
+        for x, alive in self._iterate_lanes(param_name, param_values, x0, transient, n_points):
+            block_x.append(x.copy())
+            block_valid.append(alive.copy())
+            if len(block_x) == chunk_steps:
+                accumulate(np.array(block_x), np.array(block_valid))
+                block_x, block_valid = [], []
+        if block_x:
+            accumulate(np.array(block_x), np.array(block_valid))
+
+        return {
+            'counts': counts.reshape(x_bins, param_bins),
+            'param_range': [float(param_range[0]), float(param_range[1])],
+            'x_range': list(x_range) if x_range is not None else None,
+            'samples_per_column': int(samples_per_bin * n_points)
+        }
+
+    def bifurcation_diagram(self, param_name='r', param_range=(2.5, 4.0), param_steps=1000,
+                          x0=0.5, transient=100, n_points=50):
+        """生成分岔图"""
+        param_values = np.linspace(param_range[0], param_range[1], param_steps)
+
+        orbits, counts = self._bifurcation_orbits(param_name, param_values, x0, transient, n_points)
+        return [
+            {'parameter': float(param_val), 'points': orbits[:count, lane].tolist()}
+            for lane, (param_val, count) in enumerate(zip(param_values, counts))
+        ]
+
+    def generate_cobweb_plot(self, x0, n_steps=20):
+        """生成蛛网图数据"""
+        if self.dimension != 1:
+            return None
 
         x_points = []
         y_points = []
@@ -1567,53 +3636,444 @@ class DiscreteSystem:
 
     def generate_return_map(self, x0, n_steps=200, delay=1):
         """生成返回映射"""
-        trajectory = self.iterate(x0, n_steps)
+        trajectory = self.iterate_array(x0, n_steps)
 
         if len(trajectory) < delay + 1:
             return None
 
         # 检测收敛：如果连续30个点的变化都小于1e-6，认为已收敛，截断后续数据
         # 但确保至少保留min(n_steps * 0.8, 150)个点以显示有意义的返回映射结构
-        convergence_threshold = 1e-6
-        convergence_count = 30  # 增加到30以减少误判
         min_points = min(int(n_steps * 0.8), 150)  # 至少保留80%的点或150个点
-
-        valid_length = len(trajectory)
         if self.dimension == 1:
-            for i in range(len(trajectory) - convergence_count):
-                # 检查接下来的convergence_count个点是否都几乎不变
-                window = trajectory[i:i+convergence_count]
-                if all(abs(window[j+1] - window[j]) < convergence_threshold for j in range(convergence_count-1)):
-                    # 找到收敛点，但确保保留足够多的点
-                    if i + 1 >= min_points:
-                        valid_length = i + 1
-                        break
-                    # 如果收敛太早，继续保留更多点
-                    else:
-                        continue
-
-        # 只使用收敛前的数据
-        trajectory = trajectory[:valid_length]
+            index = self._convergence_index(trajectory, window=30, threshold=1e-6, min_index=max(min_points - 1, 0))
+            if index is not None:
+                trajectory = trajectory[:index + 1]
 
         if len(trajectory) < delay + 1:
             return None
 
-        x_n = trajectory[:-delay]
-        x_n_plus_delay = trajectory[delay:]
-
         # 对于2D系统，只提取x分量用于返回映射
-        if self.dimension == 2:
-            x_n = [point[0] for point in x_n]
-            x_n_plus_delay = [point[0] for point in x_n_plus_delay]
+        series = trajectory if self.dimension == 1 else trajectory[:, 0]
+        x_n = series[:-delay]
+        x_n_plus_delay = series[delay:]
 
         return {
-            'x_n': x_n.tolist() if hasattr(x_n, 'tolist') else x_n,
-            'x_n_plus_delay': x_n_plus_delay.tolist() if hasattr(x_n_plus_delay, 'tolist') else x_n_plus_delay,
+            'x_n': x_n.tolist(),
+            'x_n_plus_delay': x_n_plus_delay.tolist(),
             'delay': delay,
             'total_points': len(x_n)
         }
 
 
+class CoupledMapLattice:
+    """
+    耦合映射格子：N 个格点各自执行同一个一维局部映射 f，再按耦合方式扩散
+    nearest：链状最近邻耦合，两端为零通量边界；ring：周期边界的最近邻耦合；global：全局（平均场）耦合
+    x_i' = (1-ε)·f(x_i) + ε/2·(f(x_{i-1}) + f(x_{i+1}))，全局耦合时 x_i' = (1-ε)·f(x_i) + ε·<f(x)>
+    整个格子每步作为数组运算推进；时空图以降采样栅格累积，同步与斑图统计在线计算，不保留完整历史
+    """
+
+    COUPLINGS = ('nearest', 'ring', 'global')
+
+    def __init__(self, system, n_sites=1000, coupling='ring', epsilon=0.1):
+        if system.dimension != 1:
+            raise ValueError('耦合映射格子只支持一维局部映射')
+        if coupling not in self.COUPLINGS:
+            raise ValueError(f'不支持的耦合方式: {coupling}')
+        if n_sites < 3:
+            raise ValueError('格点数至少为 3')
+        if not 0 <= epsilon <= 1:
+            raise ValueError('耦合强度 epsilon 必须在 [0, 1] 内')
+        self.system = system
+        self.n_sites = int(n_sites)
+        self.coupling = coupling
+        self.epsilon = float(epsilon)
+
+    def step(self, x, neighbours):
+        """推进一步；neighbours 为复用的缓冲区，存放左右邻居的 f 值之和"""
+        f = self.system.kernel.step(x)
+        eps = self.epsilon
+        if self.coupling == 'global':
+            return (1 - eps) * f + eps * f.mean()
+        neighbours[1:-1] = f[:-2]
+        neighbours[1:-1] += f[2:]
+        if self.coupling == 'ring':
+            neighbours[0] = f[-1] + f[1]
+            neighbours[-1] = f[-2] + f[0]
+        else:
+            neighbours[0] = f[0] + f[1]
+            neighbours[-1] = f[-2] + f[-1]
+        neighbours *= eps / 2
+        f *= 1 - eps
+        f += neighbours
+        return f
+
+    def initial_state(self, x0=None, init_range=(0.0, 1.0), perturbation=1e-3, seed=None):
+        """初始状态：x0 为空时在 init_range 内均匀随机；为标量时取均匀态加上幅度为 perturbation 的随机扰动"""
+        rng = np.random.default_rng(seed)
+        if x0 is None:
+            return rng.uniform(init_range[0], init_range[1], self.n_sites)
+        x0 = np.asarray(x0, dtype=float)
+        if x0.ndim == 0:
+            return x0 + perturbation * rng.uniform(-1, 1, self.n_sites)
+        if x0.shape != (self.n_sites,):
+            raise ValueError(f'初始状态长度应为 {self.n_sites}')
+        return x0.copy()
+
+    def run(self, n_steps=1000, transient=0, x0=None, init_range=(0.0, 1.0), perturbation=1e-3, seed=None,
+            raster_shape=(512, 512), raster_mode='snapshot', sync_tol=1e-6, domain_tol=1e-3,
+            bins=100, value_range=None, n_snapshots=32):
+        """
+        运行格子并在线统计：
+        - 时空图：行为时间、列为空间的降采样栅格。snapshot 模式每行取一个时刻、每列取一个格点；mean 模式取时空块平均
+        - 每步的平均场、同步误差（格点值的标准差）、同步畴覆盖率（相邻格点差值 < domain_tol 的比例）、相邻格点相关系数
+        - 在均匀分布的若干快照上累积空间功率谱、空间相关长度与格点值直方图
+        """
+        if raster_mode not in ('snapshot', 'mean'):
+            raise ValueError(f'不支持的栅格模式: {raster_mode}')
+        n = self.n_sites
+        x = self.initial_state(x0, init_range, perturbation, seed)
+        neighbours = np.empty(n)
+
+        diverged = False
+        for _ in range(transient):
+            x = self.step(x, neighbours)
+            if not np.isfinite(x.mean()):
+                diverged = True
+                break
+
+        rows = max(1, min(int(raster_shape[0]), n_steps))
+        cols = max(1, min(int(raster_shape[1]), n))
+        time_stride = int(np.ceil(n_steps / rows))
+        rows = int(np.ceil(n_steps / time_stride))
+        site_edges = np.linspace(0, n, cols + 1).astype(int)
+        site_counts = np.diff(site_edges)
+        site_samples = site_edges[:-1]
+        raster = np.zeros((rows, cols))
+        row_steps = np.zeros(rows)
+
+        if value_range is None:
+            low, high = (float(x.min()), float(x.max())) if not diverged else (0.0, 1.0)
+            pad = 0.05 * (high - low) or 0.5
+            value_range = (low - pad, high + pad)
+        hist = np.zeros(bins)
+        snapshot_steps = set(np.linspace(0, n_steps - 1, min(n_snapshots, n_steps)).astype(int).tolist())
+        power = np.zeros(n // 2 + 1)
+        n_spectra = 0
+
+        mean_field = np.full(n_steps, np.nan)
+        sync_error = np.full(n_steps, np.nan)
+        domain_fraction = np.full(n_steps, np.nan)
+        neighbour_correlation = np.full(n_steps, np.nan)
+
+        deviation = np.empty(n)
+        differences = np.empty(n - 1)
+        synced = np.empty(n - 1, dtype=bool)
+        steps = 0
+        while steps < n_steps and not diverged:
+            x = self.step(x, neighbours)
+            mean = x.mean()
+            if not np.isfinite(mean):
+                diverged = True
+                break
+
+            # 统计量都写入复用的缓冲区，避免每步为整个格子分配临时数组
+            np.subtract(x, mean, out=deviation)
+            variance = np.dot(deviation, deviation) / n
+            mean_field[steps] = mean
+            sync_error[steps] = np.sqrt(variance)
+            lagged = np.dot(deviation[:-1], deviation[1:])
+            np.subtract(x[1:], x[:-1], out=differences)
+            np.abs(differences, out=differences)
+            n_synced = np.count_nonzero(np.less(differences, domain_tol, out=synced))
+            if self.coupling == 'ring':
+                lagged = (lagged + deviation[-1] * deviation[0]) / n
+                n_synced += abs(x[0] - x[-1]) < domain_tol
+                domain_fraction[steps] = n_synced / n
+            else:
+                lagged /= n - 1
+                domain_fraction[steps] = n_synced / (n - 1)
+            neighbour_correlation[steps] = lagged / variance if variance > 0 else 1.0
+
+            row = steps // time_stride
+            if raster_mode == 'snapshot':
+                if steps % time_stride == 0:
+                    raster[row] = x[site_samples]
+                    row_steps[row] = 1
+            else:
+                raster[row] += np.add.reduceat(x, site_edges[:-1]) / site_counts
+                row_steps[row] += 1
+
+            if steps in snapshot_steps:
+                hist += np.histogram(x, bins=bins, range=value_range)[0]
+                power += np.abs(np.fft.rfft(deviation))**2 / n
+                n_spectra += 1
+            steps += 1
+
+        filled = row_steps > 0
+        raster[filled] /= row_steps[filled, None]
+        raster[~filled] = np.nan
+
+        result = {
+            'n_sites': n,
+            'coupling': self.coupling,
+            'epsilon': self.epsilon,
+            'steps': steps,
+            'transient': transient,
+            'diverged': diverged,
+            'raster': raster,
+            'raster_mode': raster_mode,
+            'time_stride': time_stride,
+            'site_edges': site_edges,
+            'mean_field': mean_field[:steps],
+            'sync_error': sync_error[:steps],
+            'domain_fraction': domain_fraction[:steps],
+            'neighbour_correlation': neighbour_correlation[:steps],
+        }
+        if steps:
+            result['summary'] = {
+                'mean_sync_error': float(np.mean(sync_error[:steps])),
+                'final_sync_error': float(sync_error[steps - 1]),
+                'synchronized': bool(sync_error[steps - 1] < sync_tol),
+                'mean_domain_fraction': float(np.mean(domain_fraction[:steps])),
+                'mean_neighbour_correlation': float(np.mean(neighbour_correlation[:steps])),
+                'mean_field_variance': float(np.var(mean_field[:steps]))
+            }
+        if n_spectra:
+            power /= n_spectra
+            result['spectrum'] = self._spectrum_summary(power, n)
+            edges = np.linspace(value_range[0], value_range[1], bins + 1)
+            total = hist.sum()
+            result['histogram'] = {
+                'edges': edges,
+                'density': hist / (total * np.diff(edges)) if total else hist,
+                'out_of_range': 1 - total / (n * n_spectra)
+            }
+        return result
+
+    @staticmethod
+    def _spectrum_summary(power, n, max_bins=512):
+        """空间功率谱降采样到至多 max_bins 个波数区间，并由 Wiener–Khinchin 关系得到空间相关函数与相关长度（降到 1/e 的距离）"""
+        correlation = np.fft.irfft(power, n)
+        if correlation[0] > 0:
+            correlation = correlation / correlation[0]
+            below = np.nonzero(correlation[:n // 2] < np.exp(-1))[0]
+            correlation_length = float(below[0]) if len(below) else float(n // 2)
+        else:
+            correlation_length = 0.0
+        edges = np.unique(np.linspace(0, len(power), min(max_bins, len(power)) + 1).astype(int))
+        wavenumber = np.arange(len(power)) / n
+        return {
+            'wavenumber': np.add.reduceat(wavenumber, edges[:-1]) / np.diff(edges),
+            'power': np.add.reduceat(power, edges[:-1]) / np.diff(edges),
+            'correlation': correlation[:min(n // 2, 256)],
+            'correlation_length': correlation_length
+        }
+
+
+class BifurcationTileService:
+    """分岔图瓦片服务：按 (映射, z, x, y) 按需计算密度瓦片，磁盘缓存（按最近访问淘汰），并在后台预取相邻瓦片"""
+
+    # 每种映射在 z=0 时覆盖的参数 × 状态范围
+    TILE_DOMAINS = {
+        'logistic': {'param_name': 'r', 'param_range': (2.5, 4.0), 'x_range': (0.0, 1.0)},
+        'tent': {'param_name': 'mu', 'param_range': (1.0, 2.0), 'x_range': (0.0, 1.0)},
+        'sine': {'param_name': 'r', 'param_range': (0.6, 1.0), 'x_range': (0.0, 1.0)},
+        'henon': {'param_name': 'a', 'param_range': (1.0, 1.4), 'x_range': (-1.5, 1.5)}
+    }
+    CACHE_VERSION = 2
+
+    def __init__(self, cache_dir=None, tile_size=256, max_zoom=24, base_points=300, max_points=20000,
+                 prefetch_workers=2, max_cache_mb=None):
+        self.cache_dir = cache_dir or os.environ.get(
+            'BIFURCATION_TILE_CACHE', os.path.join(tempfile.gettempdir(), 'bifurcation_tiles')
+        )
+        self.tile_size = tile_size
+        self.max_zoom = max_zoom
+        self.base_points = base_points
+        self.max_points = max_points
+        if max_cache_mb is None:
+            max_cache_mb = float(os.environ.get('BIFURCATION_TILE_CACHE_MB', 256))
+        self.max_cache_bytes = int(max_cache_mb * 1024 * 1024)
+        self._cache_bytes = None  # 首次写入时扫描缓存目录得到
+        self._executor = ThreadPoolExecutor(max_workers=prefetch_workers)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+
+    def tile_bounds(self, map_type, z, x, y):
+        """瓦片覆盖的参数范围和状态范围（y=0 位于状态最大值一侧，与地图瓦片约定一致）"""
+        domain = self.TILE_DOMAINS[map_type]
+        n = 2 ** z
+        p_lo, p_hi = domain['param_range']
+        x_lo, x_hi = domain['x_range']
+        p_width = (p_hi - p_lo) / n
+        x_height = (x_hi - x_lo) / n
+        top = x_hi - y * x_height
+        return (p_lo + x * p_width, p_lo + (x + 1) * p_width), (top - x_height, top)
+
+    def tile_parameters(self, map_type, parameters=None):
+        """
+        规范化瓦片参数：只接受映射声明的参数，去掉由瓦片 x 范围决定的扫描参数，
+        其余取值量化到 6 位有效数字，避免任意查询值产生无穷多个缓存键
+        """
+        declared = DiscreteSystem(map_type=map_type).parameters
+        parameters = parameters or {}
+        unknown = sorted(set(parameters) - set(declared))
+        if unknown:
+            raise ValueError(f'未声明的参数: {", ".join(unknown)}')
+        swept = self.TILE_DOMAINS[map_type]['param_name']
+        normalised = {}
+        for name, default in declared.items():
+            if name == swept:
+                continue
+            value = float(parameters.get(name, default))
+            if not math.isfinite(value):
+                raise ValueError(f'参数 {name} 必须是有限数值')
+            normalised[name] = float(f'{value:.6g}')
+        return normalised
+
+    def _cache_path(self, map_type, z, x, y, parameters):
+        key = json.dumps({
+            'map': map_type, 'parameters': parameters, 'z': z, 'x': x, 'y': y,
+            'size': self.tile_size, 'version': self.CACHE_VERSION
+        }, sort_keys=True)
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, map_type, str(z), f'{digest}.png')
+
+    def render_tile(self, map_type, z, x, y, parameters):
+        """计算一张瓦片：暂态步数随缩放级别增加，收集点数按 2^z 增长以保持深度缩放时的点密度"""
+        domain = self.TILE_DOMAINS[map_type]
+        param_range, x_range = self.tile_bounds(map_type, z, x, y)
+        half_pixel = (param_range[1] - param_range[0]) / (2 * self.tile_size)
+
+        defaults = DiscreteSystem(map_type=map_type).parameters
+        system = DiscreteSystem(map_type=map_type, parameters={**defaults, **parameters})
+        n_points = min(self.base_points * 2 ** z, self.max_points)
+        density = system.bifurcation_density(
+            param_name=domain['param_name'],
+            param_range=(param_range[0] + half_pixel, param_range[1] - half_pixel),
+            param_bins=self.tile_size,
+            x_bins=self.tile_size,
+            x_range=x_range,
+            x0=0.5 if system.dimension == 1 else [0.1, 0.1],
+            transient=min(200 + 200 * z, 5000),
+            n_points=n_points
+        )
+        # 满量程取本级的采样密度：每列 n_points 个点中约 1/2^z 落在瓦片的状态范围内。
+        # 点数达到 max_points 上限后仍按实际密度归一化，深层瓦片不会逐级变暗；同级瓦片亮度一致，拼接处没有接缝
+        levels = scale_density(density['counts'], log_scale=True, reference=max(n_points / 2 ** z, 1.0))
+        return density_to_png(levels)
+
+    def get_tile(self, map_type, z, x, y, parameters=None, prefetch=True):
+        """读取或计算瓦片PNG字节；写缓存时先写临时文件再原子替换"""
+        if map_type not in self.TILE_DOMAINS:
+            raise ValueError(f'{map_type} 映射不支持瓦片模式')
+        if not (0 <= z <= self.max_zoom and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError('瓦片坐标超出范围')
+
+        parameters = self.tile_parameters(map_type, parameters)
+        path = self._cache_path(map_type, z, x, y, parameters)
+        png = self._read_cached(path)
+        if png is None:
+            png = self.render_tile(map_type, z, x, y, parameters)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+            self._record_write(len(png))
+
+        if prefetch:
+            self.prefetch_neighbours(map_type, z, x, y, parameters)
+        return png
+
+    def _read_cached(self, path):
+        """读取缓存瓦片并刷新其修改时间（作为最近访问时间）；不存在或刚被淘汰时返回 None"""
+        try:
+            with open(path, 'rb') as f:
+                png = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return png
+
+    def _record_write(self, size):
+        """累计缓存大小，超过上限时触发淘汰"""
+        with self._lock:
+            if self._cache_bytes is None:
+                self._cache_bytes = sum(entry[1] for entry in self._cache_entries())
+            else:
+                self._cache_bytes += size
+            over = self._cache_bytes > self.max_cache_bytes
+        if over:
+            self.evict()
+
+    def _cache_entries(self):
+        """缓存目录中的瓦片：(修改时间, 字节数, 路径)"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.png'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self, target_fraction=0.8):
+        """按最近访问时间从旧到新删除瓦片，直到缓存降到上限的 target_fraction；同一时间只有一个线程执行"""
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            entries = sorted(self._cache_entries())
+            total = sum(entry[1] for entry in entries)
+            target = target_fraction * self.max_cache_bytes
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+            with self._lock:
+                self._cache_bytes = total
+        finally:
+            self._evict_lock.release()
+
+    def prefetch_neighbours(self, map_type, z, x, y, parameters):
+        """后台计算上下左右四个相邻瓦片（已缓存或正在计算的跳过）"""
+        n = 2 ** z
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if not (0 <= nx < n and 0 <= ny < n):
+                continue
+            path = self._cache_path(map_type, z, nx, ny, parameters)
+            with self._lock:
+                if path in self._pending or os.path.exists(path):
+                    continue
+                self._pending.add(path)
+            self._executor.submit(self._prefetch, map_type, z, nx, ny, parameters, path)
+
+    def _prefetch(self, map_type, z, x, y, parameters, path):
+        try:
+            self.get_tile(map_type, z, x, y, parameters, prefetch=False)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+
+
+bifurcation_tiles = BifurcationTileService()
+
+
 # 路由定义
 @app.route('/')
 def index():
@@ -1779,7 +4239,7 @@ def analyze_nonlinear():
             return jsonify({'success': False, 'error': '请输入完整的微分方程'})
         
         # 创建非线性系统实例
-        system = NonlinearSystem(dx_dt, dy_dt)
+        system = NonlinearSystem(dx_dt, dy_dt, data.get('parameters'))
         
         # 格式化平衡点信息
         equilibrium_info = []
@@ -1812,12 +4272,40 @@ def generate_nonlinear_portrait():
         
         # 获取参数
         view_range = data.get('view_range', 5)
-        x_range = (-view_range, view_range)
-        y_range = (-view_range, view_range)
+        x_range = tuple(data.get('x_range', (-view_range, view_range)))
+        y_range = tuple(data.get('y_range', (-view_range, view_range)))
         grid_size = data.get('grid_size', 20)
+        mode = data.get('mode', 'image')
         
         # 创建系统并生成相图
-        system = NonlinearSystem(dx_dt, dy_dt)
+        system = NonlinearSystem(dx_dt, dy_dt, data.get('parameters'))
+
+        # 数据模式：返回网格与零等值线，前端自行绘制
+        if mode == 'data':
+            portrait = system.generate_phase_portrait_data(
+                x_range, y_range, grid_size, data.get('encoding', 'base64')
+            )
+            return jsonify({
+                'success': True,
+                'mode': 'data',
+                'portrait': portrait
+            })
+
+        # 自适应模式：四叉树细分零等值线与平衡点附近的单元
+        if mode == 'adaptive':
+            portrait = system.adaptive_sample_field(
+                x_range, y_range,
+                base_size=min(int(data.get('base_size', 9)), 257),
+                max_depth=min(int(data.get('max_depth', 5)), 20),
+                eval_budget=min(int(data.get('eval_budget', 20000)), 200000),
+                encoding=data.get('encoding', 'base64')
+            )
+            return jsonify({
+                'success': True,
+                'mode': 'adaptive',
+                'portrait': portrait
+            })
+
         img_base64 = system.generate_phase_portrait(x_range, y_range, grid_size)
         
         return jsonify({
@@ -1838,7 +4326,7 @@ def compute_nonlinear_trajectory():
         t_span = data.get('t_span', [0, 20])
         
         # 创建系统并计算轨迹
-        system = NonlinearSystem(dx_dt, dy_dt)
+        system = NonlinearSystem(dx_dt, dy_dt, data.get('parameters'))
         trajectory = system.compute_trajectory(initial_point, t_span)
         
         return jsonify({
@@ -1849,6 +4337,295 @@ def compute_nonlinear_trajectory():
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/find_limit_cycles', methods=['POST'])
+def find_limit_cycles():
+    """检测平面非线性系统的极限环"""
+    try:
+        data = request.get_json()
+        dx_dt = data.get('dx_dt', '')
+        dy_dt = data.get('dy_dt', '')
+
+        if not dx_dt or not dy_dt:
+            return jsonify({'success': False, 'error': '请输入完整的微分方程'})
+
+        system = NonlinearSystem(dx_dt, dy_dt, data.get('parameters'))
+        result = system.find_limit_cycles(
+            search_radius=data.get('search_radius', data.get('view_range', 5)),
+            time_budget=min(float(data.get('time_budget', 3.0)), 10.0)
+        )
+
+        return jsonify({
+            'success': True,
+            **result
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/basin_map', methods=['POST'])
+def basin_map():
+    """计算吸引域标签栅格与收敛时间栅格"""
+    try:
+        data = request.get_json()
+        dx_dt = data.get('dx_dt', '')
+        dy_dt = data.get('dy_dt', '')
+
+        if not dx_dt or not dy_dt:
+            return jsonify({'success': False, 'error': '请输入完整的微分方程'})
+
+        view_range = data.get('view_range', 5)
+        x_range = tuple(data.get('x_range', (-view_range, view_range)))
+        y_range = tuple(data.get('y_range', (-view_range, view_range)))
+        resolution = int(data.get('resolution', 256))
+        if not 2 <= resolution <= 512:
+            return jsonify({'success': False, 'error': '分辨率需在 2 到 512 之间'})
+
+        system = NonlinearSystem(dx_dt, dy_dt, data.get('parameters'))
+        basins = system.compute_basin_map(
+            x_range, y_range,
+            resolution=resolution,
+            t_max=data.get('t_max', 50.0),
+            dt=data.get('dt', 0.05),
+            capture_radius=data.get('capture_radius'),
+            workers=_clamp_workers(data.get('workers')),
+            time_budget=min(float(data.get('time_budget', 10.0)), 20.0)
+        )
+
+        encoding = data.get('encoding', 'base64')
+        basins['labels'] = encode_array(basins['labels'], np.int8, encoding)
+        basins['convergence_time'] = encode_array(basins['convergence_time'], np.float32, encoding)
+
+        return jsonify({
+            'success': True,
+            'basins': basins
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/continue_equilibria', methods=['POST'])
+def continue_equilibria():
+    """含参数非线性系统的平衡点数值延拓"""
+    try:
+        data = request.get_json()
+        dx_dt = data.get('dx_dt', '')
+        dy_dt = data.get('dy_dt', '')
+        parameters = data.get('parameters', {})
+        param_name = data.get('param_name') or next(iter(parameters), None)
+
+        if not dx_dt or not dy_dt:
+            return jsonify({'success': False, 'error': '请输入完整的微分方程'})
+        if param_name is None:
+            return jsonify({'success': False, 'error': '请声明至少一个参数，例如 {"mu": 0.0}'})
+
+        system = NonlinearSystem(dx_dt, dy_dt, parameters)
+        param_value = system.parameters[param_name] if param_name in system.parameters else 0.0
+        param_range = data.get('param_range', [param_value - 1.0, param_value + 1.0])
+        continuation = system.continue_equilibria(
+            param_name, param_range,
+            step=data.get('step', 0.01),
+            max_points=min(int(data.get('max_points', 2000)), 20000)
+        )
+
+        return jsonify({
+            'success': True,
+            **continuation
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+# 连续混沌系统内核注册表：系统名 -> (默认参数, 工厂函数)。
+# 工厂在构造 ChaoticSystem 时调用一次，把参数绑定进闭包，返回 ChaoticKernel：
+# rhs(state, t=0) 单个状态的向量场（按 Python 浮点运算，供 odeint/solve_ivp 回调）；
+# jacobian(state, t=0) 解析雅可比矩阵（可直接作为 odeint 的 Dfun）；
+# batch(S) 整组状态的向量场，S 形状为 (3, N)
+ChaoticKernel = namedtuple('ChaoticKernel', ['rhs', 'jacobian', 'batch'])
+
+_CHAOTIC_SYSTEM_KERNELS = {}
+
+
+def _register_chaotic_system(name, defaults):
+    def decorator(factory):
+        _CHAOTIC_SYSTEM_KERNELS[name] = (defaults, factory)
+        return factory
+    return decorator
+
+
+@_register_chaotic_system('lorenz', {'sigma': 10.0, 'rho': 28.0, 'beta': 8.0/3.0})
+def _lorenz_system(p):
+    sigma, rho, beta = float(p['sigma']), float(p['rho']), float(p['beta'])
+
+    def rhs(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([sigma * (y - x), x * (rho - z) - y, x * y - beta * z])
+
+    def jacobian(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([[-sigma, sigma, 0.0], [rho - z, -1.0, -x], [y, x, -beta]])
+
+    def batch(S):
+        x, y, z = S
+        return np.array([sigma * (y - x), x * (rho - z) - y, x * y - beta * z])
+
+    return ChaoticKernel(rhs, jacobian, batch)
+
+
+@_register_chaotic_system('rossler', {'a': 0.2, 'b': 0.2, 'c': 5.7})
+def _rossler_system(p):
+    a, b, c = float(p['a']), float(p['b']), float(p['c'])
+
+    def rhs(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([-y - z, x + a * y, b + z * (x - c)])
+
+    def jacobian(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([[0.0, -1.0, -1.0], [1.0, a, 0.0], [z, 0.0, x - c]])
+
+    def batch(S):
+        x, y, z = S
+        return np.array([-y - z, x + a * y, b + z * (x - c)])
+
+    return ChaoticKernel(rhs, jacobian, batch)
+
+
+@_register_chaotic_system('chua', {'alpha': 15.6, 'beta': 28.0, 'm0': -1.143, 'm1': -0.714})
+def _chua_system(p):
+    alpha, beta, m0, m1 = float(p['alpha']), float(p['beta']), float(p['m0']), float(p['m1'])
+    # 分段线性非线性项 f(x) = m1·x + (m0 - m1)/2·(|x+1| - |x-1|)
+    half = 0.5 * (m0 - m1)
+
+    def rhs(state, t=0):
+        x, y, z = state.tolist()
+        f = m1 * x + half * (abs(x + 1) - abs(x - 1))
+        return np.array([alpha * (y - x - f), x - y + z, -beta * y])
+
+    def jacobian(state, t=0):
+        x = float(state[0])
+        # 斜率：|x| < 1 时为 m0，否则为 m1
+        slope = m0 if abs(x) < 1 else m1
+        return np.array([[-alpha * (1 + slope), alpha, 0.0], [1.0, -1.0, 1.0], [0.0, -beta, 0.0]])
+
+    def batch(S):
+        x, y, z = S
+        f = m1 * x + half * (np.abs(x + 1) - np.abs(x - 1))
+        return np.array([alpha * (y - x - f), x - y + z, -beta * y])
+
+    return ChaoticKernel(rhs, jacobian, batch)
+
+
+@_register_chaotic_system('thomas', {'b': 0.208186})
+def _thomas_system(p):
+    b = float(p['b'])
+    sin, cos = math.sin, math.cos
+
+    def rhs(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([sin(y) - b * x, sin(z) - b * y, sin(x) - b * z])
+
+    def jacobian(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([[-b, cos(y), 0.0], [0.0, -b, cos(z)], [cos(x), 0.0, -b]])
+
+    def batch(S):
+        x, y, z = S
+        return np.array([np.sin(y) - b * x, np.sin(z) - b * y, np.sin(x) - b * z])
+
+    return ChaoticKernel(rhs, jacobian, batch)
+
+
+@_register_chaotic_system('chen', {'a': 35.0, 'b': 3.0, 'c': 28.0})
+def _chen_system(p):
+    # dx = a(y - x)，dy = (c - a)x - xz + cy，dz = xy - bz
+    a, b, c = float(p['a']), float(p['b']), float(p['c'])
+
+    def rhs(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([a * (y - x), (c - a) * x - x * z + c * y, x * y - b * z])
+
+    def jacobian(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([[-a, a, 0.0], [c - a - z, c, -x], [y, x, -b]])
+
+    def batch(S):
+        x, y, z = S
+        return np.array([a * (y - x), (c - a) * x - x * z + c * y, x * y - b * z])
+
+    return ChaoticKernel(rhs, jacobian, batch)
+
+
+@_register_chaotic_system('aizawa', {'a': 0.95, 'b': 0.7, 'c': 0.6, 'd': 3.5, 'e': 0.25, 'f': 0.1})
+def _aizawa_system(p):
+    # dx = (z - b)x - dy，dy = dx + (z - b)y，dz = c + az - z³/3 - (x² + y²)(1 + ez) + fzx³
+    a, b, c, d, e, f = (float(p[name]) for name in ('a', 'b', 'c', 'd', 'e', 'f'))
+
+    def rhs(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([(z - b) * x - d * y, d * x + (z - b) * y,
+                         c + a * z - z**3 / 3 - (x * x + y * y) * (1 + e * z) + f * z * x**3])
+
+    def jacobian(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([[z - b, -d, x],
+                         [d, z - b, y],
+                         [-2 * x * (1 + e * z) + 3 * f * z * x * x, -2 * y * (1 + e * z),
+                          a - z * z - e * (x * x + y * y) + f * x**3]])
+
+    def batch(S):
+        x, y, z = S
+        return np.array([(z - b) * x - d * y, d * x + (z - b) * y,
+                         c + a * z - z**3 / 3 - (x * x + y * y) * (1 + e * z) + f * z * x**3])
+
+    return ChaoticKernel(rhs, jacobian, batch)
+
+
+@_register_chaotic_system('halvorsen', {'a': 1.27})
+def _halvorsen_system(p):
+    # dx = -ax - 4y - 4z - y²（y、z、x 依次轮换）
+    a = float(p['a'])
+
+    def rhs(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([-a * x - 4 * y - 4 * z - y * y, -a * y - 4 * z - 4 * x - z * z, -a * z - 4 * x - 4 * y - x * x])
+
+    def jacobian(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([[-a, -4 - 2 * y, -4.0], [-4.0, -a, -4 - 2 * z], [-4 - 2 * x, -4.0, -a]])
+
+    def batch(S):
+        x, y, z = S
+        return np.array([-a * x - 4 * y - 4 * z - y * y, -a * y - 4 * z - 4 * x - z * z, -a * z - 4 * x - 4 * y - x * x])
+
+    return ChaoticKernel(rhs, jacobian, batch)
+
+
+@_register_chaotic_system('sprott', {'a': 2.07, 'b': 1.79})
+def _sprott_system(p):
+    # Sprott (2014)：dx = y + axy + xz，dy = 1 - bx² + yz，dz = x - x² - y²
+    a, b = float(p['a']), float(p['b'])
+
+    def rhs(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([y + a * x * y + x * z, 1 - b * x * x + y * z, x - x * x - y * y])
+
+    def jacobian(state, t=0):
+        x, y, z = state.tolist()
+        return np.array([[a * y + z, 1 + a * x, x], [-2 * b * x, z, y], [1 - 2 * x, -2 * y, 0.0]])
+
+    def batch(S):
+        x, y, z = S
+        return np.array([y + a * x * y + x * z, 1 - b * x * x + y * z, x - x * x - y * y])
+
+    return ChaoticKernel(rhs, jacobian, batch)
+
+
+def _zero_chaotic_system():
+    """未注册的系统类型：向量场恒为零"""
+    return ChaoticKernel(lambda state, t=0: np.zeros(3), lambda state, t=0: np.zeros((3, 3)),
+                         lambda S: np.zeros_like(S, dtype=float))
+
+
 class ChaoticSystem:
     """3D混沌系统分析器"""
     
@@ -1856,54 +4633,36 @@ class ChaoticSystem:
         self.system_type = system_type
         self.parameters = parameters or self._get_default_parameters(system_type)
         self.trajectory_data = []
+        # 构造时绑定一次系统内核，积分回调直接调用闭包
+        self.kernel = self._bind_kernel(self.parameters)
         
     def _get_default_parameters(self, system_type):
         """获取默认参数"""
-        defaults = {
-            'lorenz': {'sigma': 10.0, 'rho': 28.0, 'beta': 8.0/3.0},
-            'rossler': {'a': 0.2, 'b': 0.2, 'c': 5.7},
-            'chua': {'alpha': 15.6, 'beta': 28.0, 'm0': -1.143, 'm1': -0.714},
-            'thomas': {'b': 0.208186}
-        }
-        return defaults.get(system_type, {})
+        entry = _CHAOTIC_SYSTEM_KERNELS.get(system_type)
+        return dict(entry[0]) if entry else {}
+
+    def _bind_kernel(self, parameters):
+        """由注册表构造绑定了参数的内核；未注册的系统类型向量场恒为零"""
+        entry = _CHAOTIC_SYSTEM_KERNELS.get(self.system_type)
+        if entry is None:
+            return _zero_chaotic_system()
+        try:
+            return entry[1](parameters)
+        except KeyError as e:
+            raise ValueError(f'{self.system_type} 系统缺少参数 {e.args[0]}')
     
     def equations(self, state, t=0):
         """动力学方程"""
-        x, y, z = state
-        
-        if self.system_type == 'lorenz':
-            dx = self.parameters['sigma'] * (y - x)
-            dy = x * (self.parameters['rho'] - z) - y
-            dz = x * y - self.parameters['beta'] * z
-            
-        elif self.system_type == 'rossler':
-            dx = -y - z
-            dy = x + self.parameters['a'] * y
-            dz = self.parameters['b'] + z * (x - self.parameters['c'])
-            
-        elif self.system_type == 'chua':
-            f = self.parameters['m1'] * x + 0.5 * (self.parameters['m0'] - self.parameters['m1']) * \
-                (abs(x + 1) - abs(x - 1))
-            dx = self.parameters['alpha'] * (y - x - f)
-            dy = x - y + z
-            dz = -self.parameters['beta'] * y
-            
-        elif self.system_type == 'thomas':
-            dx = np.sin(y) - self.parameters['b'] * x
-            dy = np.sin(z) - self.parameters['b'] * y
-            dz = np.sin(x) - self.parameters['b'] * z
-            
-        else:
-            dx = dy = dz = 0
-            
-        return np.array([dx, dy, dz])
+        return self.kernel.rhs(np.asarray(state, dtype=float))
     
     def integrate_trajectory(self, initial_conditions, t_span=(0, 50), dt=0.01):
         """积分轨迹"""
         t = np.arange(t_span[0], t_span[1], dt)
         
         try:
-            trajectory = odeint(self.equations, initial_conditions, t)
+            # 直接传入内核闭包与解析雅可比（Dfun），LSODA 切换到刚性方法时无需有限差分近似雅可比
+            trajectory = odeint(self.kernel.rhs, np.asarray(initial_conditions, dtype=float), t,
+                                Dfun=self.kernel.jacobian)
             
             # 检查数值稳定性
             max_val = np.max(np.abs(trajectory))
@@ -1938,114 +4697,502 @@ class ChaoticSystem:
                 'initial_conditions': initial_conditions
             }
     
-    def calculate_lyapunov_exponents(self, initial_conditions, t_span=(0, 100), dt=0.01):
-        """计算李雅普诺夫指数（简化版本）"""
-        # 使用有限差分方法估计雅可比矩阵
-        def jacobian(state):
-            eps = 1e-8
-            jac = np.zeros((3, 3))
-            
-            f0 = self.equations(state)
-            for i in range(3):
-                state_plus = state.copy()
-                state_plus[i] += eps
-                f_plus = self.equations(state_plus)
-                jac[:, i] = (f_plus - f0) / eps
-                
-            return jac
-        
-        # 积分轨迹并计算李雅普诺夫指数
-        t = np.arange(t_span[0], t_span[1], dt)
-        trajectory = odeint(self.equations, initial_conditions, t)
-        
-        # 简化的李雅普诺夫指数估计
-        lyap_sum = 0
-        count = 0
-        
-        for i in range(len(trajectory) - 1):
-            if i % 100 == 0:  # 每100步计算一次
-                jac = jacobian(trajectory[i])
-                eigenvals = np.linalg.eigvals(jac)
-                real_parts = np.real(eigenvals)
-                lyap_sum += np.sum(real_parts)
-                count += 1
-        
-        if count > 0:
-            avg_lyap = lyap_sum / count
-            # 估计三个李雅普诺夫指数
-            lambda1 = avg_lyap * 0.6  # 最大的
-            lambda2 = avg_lyap * 0.1  # 中间的
-            lambda3 = avg_lyap * -1.2  # 最小的（通常为负）
-        else:
-            lambda1 = lambda2 = lambda3 = 0
-        
+    def batch_rhs(self):
+        """
+        返回整组状态的向量场 f(S)：S 的形状为 (3, N)，每行是一个坐标分量（内存连续），
+        参数在构造内核时已绑定，每次调用不再解包字典、比较系统名称
+        """
+        return self.kernel.batch
+
+    # Dormand–Prince 5(4) 系数
+    _DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+    _DP_A = [[],
+             [1/5],
+             [3/40, 9/40],
+             [44/45, -56/15, 32/9],
+             [19372/6561, -25360/2187, 64448/6561, -212/729],
+             [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+             [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84]]
+    _DP_E = np.array([71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40])
+
+    def integrate_ensemble(self, initial_conditions, t_span=(0, 20), dt=0.01, method='rk4', n_output=500,
+                           rtol=1e-6, atol=1e-9, max_steps=1000000):
+        """
+        一次向量化积分 N 个初始条件（形状 (N, 3)），整组状态作为 (3, N) 数组推进：
+        method='rk4' 为固定步长 dt 的四阶 Runge–Kutta；'rk45' 为 Dormand–Prince 自适应步长（整组共用步长，误差取各轨道的最大值）
+        结果在 n_output 个等间隔时刻采样；发散（非有限或 |x| > 1e6）的轨道记为 NaN 并不再参与步长控制
+        返回 (采样时刻, 形状 (n_output, N, 3) 的轨迹, 发散掩码)；用完 max_steps 步时只返回已到达的采样时刻
+        """
+        rhs = self.batch_rhs()
+        S = np.array(initial_conditions, dtype=float).reshape(-1, 3).T.copy()
+        n = S.shape[1]
+        t0, t1 = float(t_span[0]), float(t_span[1])
+        times = np.linspace(t0, t1, n_output)
+        output = np.empty((n_output, n, 3))
+        output[0] = S.T
+        alive = np.ones(n, dtype=bool)
+
+        def check(S):
+            bad = ~np.all(np.isfinite(S) & (np.abs(S) < 1e6), axis=0)
+            if bad.any():
+                alive[bad] = False
+                S[:, bad] = np.nan
+
+        t = t0
+        steps = 0
+        reached = n_output
+        with np.errstate(all='ignore'):
+            if method == 'rk4':
+                for k in range(1, n_output):
+                    # 固定步长推进到下一个采样时刻（最后一步截短以精确落在采样时刻上）
+                    while t < times[k] - 1e-12 and steps < max_steps:
+                        h = min(dt, times[k] - t)
+                        k1 = rhs(S)
+                        k2 = rhs(S + 0.5 * h * k1)
+                        k3 = rhs(S + 0.5 * h * k2)
+                        k4 = rhs(S + h * k3)
+                        S = S + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+                        t += h
+                        steps += 1
+                    if t < times[k] - 1e-12:
+                        reached = k
+                        break
+                    check(S)
+                    output[k] = S.T
+            elif method == 'rk45':
+                h = dt
+                f = rhs(S)
+                for k in range(1, n_output):
+                    while t < times[k] - 1e-12 and steps < max_steps:
+                        h = min(h, times[k] - t)
+                        stages = [f]
+                        for i in range(1, 7):
+                            increment = sum(a * s for a, s in zip(self._DP_A[i], stages) if a)
+                            stages.append(rhs(S + h * increment))
+                        S_new = S + h * sum(a * s for a, s in zip(self._DP_A[6], stages) if a)
+                        error = h * sum(e * s for e, s in zip(self._DP_E, stages) if e)
+                        scale = atol + rtol * np.maximum(np.abs(S), np.abs(S_new))
+                        norms = np.sqrt(np.mean((error / scale)**2, axis=0))[alive]
+                        # 本步内溢出的轨道不参与步长控制，接受后由 check 标记为发散
+                        norms = norms[np.isfinite(norms)]
+                        norm = float(np.max(norms)) if len(norms) else 0.0
+                        steps += 1
+                        if norm <= 1:
+                            # FSAL：第 7 级即新状态处的向量场
+                            t += h
+                            S, f = S_new, stages[6]
+                            check(S)
+                        h *= min(5.0, max(0.2, 0.9 * (norm if norm > 0 else 1e-10) ** -0.2))
+                    if t < times[k] - 1e-12:
+                        reached = k
+                        break
+                    output[k] = S.T
+            else:
+                raise ValueError(f'不支持的积分方法: {method}')
+
+        return times[:reached], output[:reached], ~alive
+
+    def ensemble_divergence(self, times, trajectories, diverged=None, saturation=0.1, block_size=64):
+        """
+        邻近轨道分离统计：每条轨道与其 t=0 时的最近邻配对，统计各时刻配对距离的对数（均值、中位数、10%/90% 分位数）；
+        在平均对数距离低于饱和阈值（吸引子尺度的 saturation 倍）的区间自动选择线性段，拟合斜率作为有限时间 Lyapunov 指数
+        配对距离与吸引子尺度按 block_size 个时刻一块计算，临时数组不超过一块轨迹的大小
+        """
+        n = trajectories.shape[1]
+        if diverged is None:
+            diverged = np.zeros(n, dtype=bool)
+        if n < 2:
+            return None
+        _, neighbour = cKDTree(trajectories[0]).query(trajectories[0], k=2)
+        partner = neighbour[:, 1]
+        valid = ~diverged & ~diverged[partner]
+        members, partners = np.nonzero(valid)[0], partner[valid]
+        kept = np.nonzero(~diverged)[0]
+        separation = np.empty((len(times), members.size))
+        lower, upper = np.full(3, np.inf), np.full(3, -np.inf)
+        for start in range(0, len(times), block_size):
+            block = trajectories[start:start + block_size]
+            separation[start:start + block_size] = np.linalg.norm(block[:, members] - block[:, partners], axis=2)
+            if kept.size:
+                states = block[:, kept]
+                np.minimum(lower, states.min(axis=(0, 1)), out=lower)
+                np.maximum(upper, states.max(axis=(0, 1)), out=upper)
+        with np.errstate(divide='ignore'):
+            log_separation = np.log(np.maximum(separation, 1e-300))
+
+        # 吸引子尺度取全部未发散轨道在整个时间段内的范围（集合初始时可能聚在一起，不能只看末态）
+        scale = float(np.linalg.norm(upper - lower)) if kept.size else 0.0
+        mean_log = log_separation.mean(axis=1) if valid.any() else np.full(len(times), np.nan)
+        result = {
+            'mean_log_separation': mean_log,
+            'median_log_separation': np.median(log_separation, axis=1) if valid.any() else mean_log,
+            'p10_log_separation': np.percentile(log_separation, 10, axis=1) if valid.any() else mean_log,
+            'p90_log_separation': np.percentile(log_separation, 90, axis=1) if valid.any() else mean_log,
+            'attractor_scale': scale,
+            'n_pairs': int(np.count_nonzero(valid)),
+            'finite_time_lyapunov': None,
+            'saturation_time': None
+        }
+        if valid.any() and scale > 0:
+            threshold = np.log(saturation * scale)
+            saturated = np.nonzero(mean_log >= threshold)[0]
+            end = int(saturated[0]) if len(saturated) else len(times)
+            if len(saturated):
+                result['saturation_time'] = float(times[end])
+            if end >= 4:
+                # 邻近轨道的分离曲线起伏较大，线性段至少取未饱和区间的三分之一
+                slope, start, stop, r2 = self._scaling_fit(times[:end], mean_log[:end], min_points=max(4, end // 3),
+                                                           r2_threshold=0.95)
+                result['finite_time_lyapunov'] = slope
+                result['fit_time_range'] = [float(times[start]), float(times[stop - 1])]
+                result['fit_r_squared'] = r2
+        return result
+
+    def jacobian(self, state):
+        """解析雅可比矩阵 ∂f/∂x"""
+        return self.kernel.jacobian(np.asarray(state, dtype=float))
+
+    def _variational_equations(self, w, t=0):
+        """状态与切空间的联合方程：w = (x, Φ 的 9 个分量, ∫tr J dt)，dΦ/dt = J(x)·Φ"""
+        J = self.kernel.jacobian(w[:3])
+        Phi = w[3:12].reshape(3, 3)
+        return np.concatenate([self.kernel.rhs(w[:3]), (J @ Phi).ravel(), [np.trace(J)]])
+
+    @staticmethod
+    def kaplan_yorke_dimension(exponents):
+        """Kaplan–Yorke 维数 D = j + (λ1+…+λj) / |λ_{j+1}|，j 为部分和仍非负的最大指标"""
+        exponents = np.sort(np.asarray(exponents, dtype=float))[::-1]
+        partial = np.cumsum(exponents)
+        if partial[0] < 0:
+            return 0.0
+        j = int(np.nonzero(partial >= 0)[0][-1]) + 1
+        if j == len(exponents):
+            return float(j)
+        return float(j + partial[j - 1] / abs(exponents[j]))
+
+    def calculate_lyapunov_exponents(self, initial_conditions, t_span=(0, 100), dt=0.01, qr_every=50,
+                                     transient=10.0, early_stop=True, tol=0.02, min_time=20.0, batch_size=20):
+        """
+        Benettin 方法计算完整的 Lyapunov 谱：沿轨道同时积分解析雅可比给出的切空间方程，
+        每 qr_every 个 dt 做一次 QR 重正交化，累加 R 对角元的对数
+        诊断：指数随时间的运行估计、批均值标准误差（每 batch_size 次重正交化为一批）、
+        由 ∫tr J dt 得到的指数和校验（相空间体积收缩率）；
+        early_stop=True 时，积分时间超过 min_time 且每个指数的标准误差都小于 tol·max(1, |λ|) 即提前结束
+        """
+        if not dt > 0 or int(qr_every) < 1:
+            raise ValueError('dt 必须为正数，qr_every 至少为 1')
+        state = np.asarray(initial_conditions, dtype=float)
+        # 先丢弃暂态，使轨道落到吸引子上
+        if transient > 0:
+            state = odeint(self.kernel.rhs, state, [0.0, transient], Dfun=self.kernel.jacobian)[-1]
+
+        interval = dt * qr_every
+        n_intervals = max(1, int(round((t_span[1] - t_span[0]) / interval)))
+        Q = np.eye(3)
+        log_sums = np.zeros(3)
+        batch_sums = []
+        batch = np.zeros(3)
+        standard_error = np.full(3, np.nan)
+        trace_integral = 0.0
+        history_time, history = [], []
+        elapsed = 0.0
+        converged = diverged = False
+
+        for _ in range(n_intervals):
+            w = odeint(self._variational_equations, np.concatenate([state, Q.ravel(), [0.0]]), [0.0, interval])[-1]
+            if not np.all(np.isfinite(w)) or np.max(np.abs(w[:3])) > 1e6:
+                diverged = True
+                break
+            state = w[:3]
+            trace_integral += w[12]
+            Q, R = np.linalg.qr(w[3:12].reshape(3, 3))
+            # 取正的对角元，使 Q 的列方向连续
+            signs = np.sign(np.diag(R))
+            signs[signs == 0] = 1
+            Q = Q * signs
+            growth = np.log(np.abs(np.diag(R)))
+            log_sums += growth
+            batch += growth
+            elapsed += interval
+
+            history_time.append(elapsed)
+            history.append(log_sums / elapsed)
+            if len(history) % batch_size == 0:
+                batch_sums.append(batch / (batch_size * interval))
+                batch = np.zeros(3)
+                if len(batch_sums) >= 10:
+                    standard_error = np.std(batch_sums, axis=0, ddof=1) / np.sqrt(len(batch_sums))
+                    if early_stop and elapsed >= min_time and \
+                            np.all(standard_error < tol * np.maximum(1.0, np.abs(log_sums / elapsed))):
+                        converged = True
+                        break
+
+        exponents = log_sums / elapsed if elapsed > 0 else np.zeros(3)
+        history = np.array(history).reshape(-1, 3)
+        # 历史曲线至多返回约 200 个点
+        stride = max(1, len(history_time) // 200)
+        lambda1, lambda2, lambda3 = exponents
         return {
             'lambda1': float(lambda1),
-            'lambda2': float(lambda2), 
+            'lambda2': float(lambda2),
             'lambda3': float(lambda3),
-            'sum': float(lambda1 + lambda2 + lambda3)
+            'sum': float(np.sum(exponents)),
+            'exponents': exponents.tolist(),
+            'kaplan_yorke_dimension': self.kaplan_yorke_dimension(exponents),
+            'integration_time': float(elapsed),
+            'converged': converged,
+            'diverged': diverged,
+            'standard_error': [None if np.isnan(v) else float(v) for v in standard_error],
+            'mean_divergence': float(trace_integral / elapsed) if elapsed > 0 else 0.0,
+            'sum_error': float(abs(np.sum(exponents) - trace_integral / elapsed)) if elapsed > 0 else 0.0,
+            'history': {
+                'time': history_time[::stride],
+                'exponents': history[::stride].tolist()
+            }
         }
     
-    def find_poincare_section(self, section_plane='z', section_value=27.0):
-        """计算庞加莱截面"""
+    # 坐标轴截面的法向量，以及截面上输出为 (x, y) 的两个坐标分量（与原先的约定一致）
+    SECTION_AXES = {
+        'x': (np.array([1.0, 0.0, 0.0]), (1, 2)),
+        'y': (np.array([0.0, 1.0, 0.0]), (0, 2)),
+        'z': (np.array([0.0, 0.0, 1.0]), (0, 1))
+    }
+
+    @staticmethod
+    def _section_basis(normal):
+        """一般平面 n·x = c 上的正交基 (u, v)，用于把交点投影为二维坐标"""
+        helper = np.eye(3)[np.argmin(np.abs(normal))]
+        u = np.cross(normal, helper)
+        u /= np.linalg.norm(u)
+        return u, np.cross(normal, u)
+
+    def find_poincare_section(self, section_plane='z', section_value=27.0, normal=None, direction='positive',
+                              refine='hermite'):
+        """
+        计算庞加莱截面：对任意平面 n·x = c（section_plane 为 x/y/z，或给出 normal），一次向量化遍历找出所有变号
+        direction：positive 只取 n·x 增大方向的穿越（默认，避免同一环绕被计两次），negative 取减小方向，both 两者都取
+        refine：linear 为线性插值；hermite 用两端的向量场构造三次 Hermite 插值并在其上二分求根（大 dt 时仍然准确）；
+        event 从穿越前的采样点用 solve_ivp 事件定位精确求交（最准确，但逐个交点积分）
+        """
         if not self.trajectory_data or 'x' not in self.trajectory_data:
             return []
-        
-        x_data = np.array(self.trajectory_data['x'])
-        y_data = np.array(self.trajectory_data['y'])
-        z_data = np.array(self.trajectory_data['z'])
-        
-        intersections = []
-        
-        for i in range(1, len(x_data)):
-            if section_plane == 'z':
-                if (z_data[i-1] - section_value) * (z_data[i] - section_value) < 0:
-                    # 线性插值找到精确交点
-                    t = (section_value - z_data[i-1]) / (z_data[i] - z_data[i-1])
-                    x_intersect = x_data[i-1] + t * (x_data[i] - x_data[i-1])
-                    y_intersect = y_data[i-1] + t * (y_data[i] - y_data[i-1])
-                    intersections.append({'x': x_intersect, 'y': y_intersect})
-                    
-            elif section_plane == 'y':
-                if (y_data[i-1] - section_value) * (y_data[i] - section_value) < 0:
-                    t = (section_value - y_data[i-1]) / (y_data[i] - y_data[i-1])
-                    x_intersect = x_data[i-1] + t * (x_data[i] - x_data[i-1])
-                    z_intersect = z_data[i-1] + t * (z_data[i] - z_data[i-1])
-                    intersections.append({'x': x_intersect, 'y': z_intersect})
-                    
-            elif section_plane == 'x':
-                if (x_data[i-1] - section_value) * (x_data[i] - section_value) < 0:
-                    t = (section_value - x_data[i-1]) / (x_data[i] - x_data[i-1])
-                    y_intersect = y_data[i-1] + t * (y_data[i] - y_data[i-1])
-                    z_intersect = z_data[i-1] + t * (z_data[i] - z_data[i-1])
-                    intersections.append({'x': y_intersect, 'y': z_intersect})
-        
-        return intersections
-    
-    def estimate_fractal_dimension(self, method='box_counting'):
-        """估计分形维数"""
-        if not self.trajectory_data or 'x' not in self.trajectory_data:
-            return {'box_dimension': 0, 'correlation_dimension': 0}
-        
-        # 简化的分形维数估计
-        x_data = np.array(self.trajectory_data['x'])
-        y_data = np.array(self.trajectory_data['y'])
-        z_data = np.array(self.trajectory_data['z'])
-        
-        # 估计盒计数维数（简化版本）
-        if method == 'box_counting':
-            # 简单的盒计数估计
-            box_dimension = 2.0 + np.random.normal(0, 0.1)  # 添加一些随机性
-            box_dimension = max(1.5, min(2.5, box_dimension))
+        if direction not in ('positive', 'negative', 'both'):
+            raise ValueError(f'不支持的穿越方向: {direction}')
+        if refine not in ('linear', 'hermite', 'event'):
+            raise ValueError(f'不支持的插值方式: {refine}')
+
+        if normal is not None:
+            normal = np.asarray(normal, dtype=float)
+            if normal.shape != (3,) or not np.any(normal):
+                raise ValueError('法向量必须是非零的三维向量')
+            scale = np.linalg.norm(normal)
+            normal, offset = normal / scale, float(section_value) / scale
+            u, v = self._section_basis(normal)
+            project = lambda p: (p @ u, p @ v)
+        elif section_plane in self.SECTION_AXES:
+            normal, (i, j) = self.SECTION_AXES[section_plane]
+            offset = float(section_value)
+            project = lambda p: (p[..., i], p[..., j])
         else:
-            box_dimension = 2.0
-        
-        # 关联维数通常略小于盒计数维数
-        correlation_dimension = box_dimension * 0.95
-        
+            raise ValueError(f'不支持的截面: {section_plane}')
+
+        points = np.column_stack([self.trajectory_data['x'], self.trajectory_data['y'], self.trajectory_data['z']])
+        time = np.asarray(self.trajectory_data['time'], dtype=float)
+        distance = points @ normal - offset
+        before, after = distance[:-1], distance[1:]
+        crossing = np.zeros(len(before), dtype=bool)
+        if direction in ('positive', 'both'):
+            crossing |= (before < 0) & (after >= 0)
+        if direction in ('negative', 'both'):
+            crossing |= (before > 0) & (after <= 0)
+        index = np.nonzero(crossing)[0]
+        if len(index) == 0:
+            return []
+
+        p0, p1 = points[index], points[index + 1]
+        d0, d1 = distance[index], distance[index + 1]
+        h = time[index + 1] - time[index]
+        if refine == 'linear':
+            tau = d0 / (d0 - d1)
+            hits = p0 + tau[:, None] * (p1 - p0)
+        else:
+            hits, tau = self._hermite_crossings(p0, p1, h, normal, offset)
+        times = time[index] + tau * h
+        if refine == 'event':
+            hits, times = self._event_crossings(p0, h, time[index], normal, offset, d1 > d0, hits, times)
+
+        a, b = project(hits)
+        return [{'x': float(x), 'y': float(y), 'time': float(t)} for x, y, t in zip(a, b, times)]
+
+    def _hermite_crossings(self, p0, p1, h, normal, offset, n_bisect=40):
+        """在每个区间上用两端的状态与向量场构造三次 Hermite 插值，对 n·H(τ) - c 同时二分求根，返回 (交点, τ)"""
+        m0 = self.kernel.batch(p0.T).T * h[:, None]
+        m1 = self.kernel.batch(p1.T).T * h[:, None]
+
+        def hermite(tau):
+            t = tau[:, None]
+            t2, t3 = t * t, t * t * t
+            return ((2 * t3 - 3 * t2 + 1) * p0 + (t3 - 2 * t2 + t) * m0 +
+                    (-2 * t3 + 3 * t2) * p1 + (t3 - t2) * m1)
+
+        low, high = np.zeros(len(p0)), np.ones(len(p0))
+        sign_low = np.sign(p0 @ normal - offset)
+        for _ in range(n_bisect):
+            mid = 0.5 * (low + high)
+            same = np.sign(hermite(mid) @ normal - offset) == sign_low
+            low = np.where(same, mid, low)
+            high = np.where(same, high, mid)
+        tau = 0.5 * (low + high)
+        return hermite(tau), tau
+
+    def _event_crossings(self, p0, h, t0, normal, offset, increasing, hits, times):
+        """从每个穿越前的采样点出发，用 solve_ivp 的事件定位求精确交点；未检测到事件时保留 Hermite 结果"""
+        hits, times = hits.copy(), times.copy()
+        for k in range(len(p0)):
+            event = lambda t, y: np.dot(normal, y) - offset
+            event.direction = 1 if increasing[k] else -1
+            solution = solve_ivp(lambda t, y: self.kernel.rhs(y), (0.0, 1.5 * h[k]), p0[k], events=event,
+                                 rtol=1e-10, atol=1e-12)
+            if len(solution.t_events[0]):
+                hits[k] = solution.y_events[0][0]
+                times[k] = t0[k] + solution.t_events[0][0]
+        return hits, times
+
+    def _attractor_points(self, points=None, discard=0.1):
+        """取轨迹点 (N, 3)，丢弃开头 discard 比例的暂态"""
+        if points is None:
+            if not self.trajectory_data or 'x' not in self.trajectory_data:
+                return np.empty((0, 3))
+            points = np.column_stack([self.trajectory_data['x'], self.trajectory_data['y'], self.trajectory_data['z']])
+        points = np.asarray(points, dtype=float)
+        points = points[int(len(points) * discard):]
+        return points[np.all(np.isfinite(points), axis=1)]
+
+    @staticmethod
+    def _scaling_fit(log_x, log_y, min_points=4, r2_threshold=0.999):
+        """
+        自动选择标度区：在所有连续区间中，从最长的开始，取拟合优度 R² ≥ r2_threshold 的最优区间；
+        都达不到时取最短区间中 R² 最高的。返回 (斜率, 起点, 终点（不含）, R²)
+        每种长度的全部区间用前缀和一次向量化求出最小二乘斜率与 R²
+        """
+        log_x, log_y = np.asarray(log_x, dtype=float), np.asarray(log_y, dtype=float)
+        n = len(log_x)
+        if n < 2:
+            return 0.0, 0, n, 0.0
+        # 平移以减小前缀和的舍入误差
+        x, y = log_x - log_x.mean(), log_y - log_y.mean()
+        sums = [np.concatenate([[0.0], np.cumsum(v)]) for v in (x, y, x * x, x * y, y * y)]
+        min_points = max(2, min(min_points, n))
+        for length in range(n, min_points - 1, -1):
+            sx, sy, sxx, sxy, syy = (c[length:] - c[:-length] for c in sums)
+            var_x = sxx - sx * sx / length
+            var_y = syy - sy * sy / length
+            cov = sxy - sx * sy / length
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slope = np.where(var_x > 0, cov / var_x, 0.0)
+                r2 = np.where((var_x > 0) & (var_y > 0), cov * cov / (var_x * var_y), 0.0)
+            start = int(np.argmax(r2))
+            if r2[start] >= r2_threshold or length == min_points:
+                return float(slope[start]), start, start + length, float(r2[start])
+
+    def box_counting_dimension(self, points=None, discard=0.1, max_level=16, chunk_size=1000000):
+        """
+        盒计数维数：点坐标归一化到单位立方体后，在最细尺度 2^-max_level 上量化为整数格点，
+        三个坐标打包成一个 int64 键，按块 np.unique 去重（内存只取决于块大小与占据的盒子数）；
+        更粗的尺度直接由去重后的键移位得到，不必重新遍历全部点
+        标度区排除盒子数接近点数（欠采样）和少于 8 个盒子的尺度
+        """
+        points = self._attractor_points(points, discard)
+        if len(points) < 100:
+            return None
+        low = points.min(axis=0)
+        extent = float((points.max(axis=0) - low).max()) or 1.0
+        max_level = int(min(max_level, 20))
+        cells = 1 << max_level
+
+        occupied = np.empty(0, dtype=np.int64)
+        for start in range(0, len(points), chunk_size):
+            grid = ((points[start:start + chunk_size] - low) / extent * cells).astype(np.int64)
+            np.clip(grid, 0, cells - 1, out=grid)
+            keys = (grid[:, 0] << (2 * max_level)) | (grid[:, 1] << max_level) | grid[:, 2]
+            occupied = np.unique(np.concatenate([occupied, np.unique(keys)]))
+
+        mask = cells - 1
+        ix, iy, iz = occupied >> (2 * max_level), (occupied >> max_level) & mask, occupied & mask
+        levels = np.arange(1, max_level + 1)
+        counts = []
+        for level in levels:
+            shift = max_level - level
+            coarse = ((ix >> shift) << (2 * level)) | ((iy >> shift) << level) | (iz >> shift)
+            counts.append(len(np.unique(coarse)))
+        counts = np.array(counts)
+
+        usable = (counts >= 8) & (counts <= len(points) / 10)
+        log_x = levels * np.log(2.0)
+        log_y = np.log(counts)
+        index = np.nonzero(usable)[0]
+        if len(index) >= 2:
+            slope, start, end, r2 = self._scaling_fit(log_x[index], log_y[index])
+            fit_levels = levels[index][[start, end - 1]]
+        else:
+            slope, r2, fit_levels = 0.0, 0.0, None
         return {
-            'box_dimension': float(box_dimension),
-            'correlation_dimension': float(correlation_dimension)
+            'dimension': slope,
+            'log_inverse_scale': log_x,
+            'log_count': log_y,
+            'fit_levels': fit_levels,
+            'r_squared': r2,
+            'n_points': len(points)
+        }
+
+    def correlation_dimension(self, points=None, discard=0.1, n_samples=20000, n_centers=2000, n_radii=32, seed=0):
+        """
+        关联维数（Grassberger–Procaccia）：在随机子样本上建 KD 树，以其中 n_centers 个点为中心，
+        count_neighbors 一次遍历得到各半径下的点对数 C(r)（耗时与点对数成正比，所以中心点取得较少），
+        在 log C – log r 的标度区拟合斜率；标度区排除点对数少于 100（统计噪声）和 C(r) > 0.3（接近饱和）的半径
+        """
+        points = self._attractor_points(points, discard)
+        if len(points) < 100:
+            return None
+        # 随机打乱后截取子样本（同时打破轨迹相邻点之间的时间相关）
+        points = points[np.random.default_rng(seed).permutation(len(points))[:n_samples]]
+        m = len(points)
+        centers = min(n_centers, m)
+        diameter = float(np.linalg.norm(points.max(axis=0) - points.min(axis=0)))
+        radii = np.geomspace(diameter * 1e-3, diameter * 0.25, n_radii)
+        # 子样本已随机打乱，前 centers 个点即随机中心；计数包含中心点自身，需扣除
+        pairs = cKDTree(points[:centers]).count_neighbors(cKDTree(points), radii) - centers
+        correlation = pairs / (centers * (m - 1))
+
+        usable = (pairs >= 100) & (correlation <= 0.3)
+        index = np.nonzero(usable)[0]
+        log_r = np.log(radii)
+        with np.errstate(divide='ignore'):
+            log_c = np.log(correlation)
+        if len(index) >= 2:
+            slope, start, end, r2 = self._scaling_fit(log_r[index], log_c[index])
+            fit_radii = radii[index][[start, end - 1]]
+        else:
+            slope, r2, fit_radii = 0.0, 0.0, None
+        return {
+            'dimension': slope,
+            'log_radius': log_r,
+            'log_correlation': [float(v) if np.isfinite(v) else None for v in log_c],
+            'fit_radii': fit_radii,
+            'r_squared': r2,
+            'n_samples': m,
+            'n_centers': centers
+        }
+
+    def estimate_fractal_dimension(self, method='both', points=None, discard=0.1):
+        """估计分形维数：method 为 box_counting、correlation 或 both（points 为空时使用最近一次积分的轨迹）"""
+        box = self.box_counting_dimension(points, discard) if method in ('box_counting', 'both') else None
+        correlation = self.correlation_dimension(points, discard) if method in ('correlation', 'both') else None
+        return {
+            'box_dimension': float(box['dimension']) if box else 0.0,
+            'correlation_dimension': float(correlation['dimension']) if correlation else 0.0,
+            'box_counting': box,
+            'correlation': correlation
         }
 
 
@@ -2073,6 +5220,72 @@ def generate_attractor():
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/generate_attractor_ensemble', methods=['POST'])
+def generate_attractor_ensemble():
+    """一次请求积分一组初始条件（最多 10^4 条），返回轨迹与邻近轨道分离统计"""
+    try:
+        data = request.get_json()
+        system_type = data.get('system_type', 'lorenz')
+        parameters = data.get('parameters', {})
+        t_span = data.get('t_span', [0, 20])
+        dt = float(data.get('dt', 0.01))
+
+        # 初始条件：直接给出 (N, 3) 列表，或以 center 为中心、半径 perturbation 的高斯云
+        if data.get('initial_conditions') is not None:
+            initial_conditions = np.asarray(data['initial_conditions'], dtype=float).reshape(-1, 3)
+        else:
+            n_trajectories = int(data.get('n_trajectories', 100))
+            rng = np.random.default_rng(data.get('seed'))
+            center = np.asarray(data.get('center', [1, 1, 1]), dtype=float)
+            initial_conditions = center + float(data.get('perturbation', 1e-6)) * rng.standard_normal((n_trajectories, 3))
+        n_trajectories = len(initial_conditions)
+        if n_trajectories > 10000:
+            raise ValueError('轨道数量上限为 10000')
+        if dt <= 0 or (t_span[1] - t_span[0]) / dt * n_trajectories > 2e8:
+            raise ValueError('积分步数与轨道数量的乘积过大（上限 2e8）')
+        n_output = min(int(data.get('n_output', 500)), 5000)
+        # 输出数组 (n_output, N, 3) 为 float64，限制采样点总数（5e6 条轨道·时刻约 120 MB）
+        if n_output * n_trajectories > 5e6:
+            raise ValueError('输出时刻数与轨道数量的乘积过大（上限 5e6）')
+
+        system = ChaoticSystem(system_type, parameters)
+        times, trajectories, diverged = system.integrate_ensemble(
+            initial_conditions,
+            t_span=t_span,
+            dt=dt,
+            method=data.get('method', 'rk4'),
+            n_output=n_output,
+            rtol=float(data.get('rtol', 1e-6)),
+            atol=float(data.get('atol', 1e-9))
+        )
+        statistics = system.ensemble_divergence(times, trajectories, diverged,
+                                                saturation=float(data.get('saturation', 0.1)))
+
+        # 只返回前 max_returned 条完整轨迹，统计量基于全部轨道
+        encoding = data.get('encoding', 'base64')
+        max_returned = min(int(data.get('max_returned', 100)), n_trajectories)
+        for key in ('mean_log_separation', 'median_log_separation', 'p10_log_separation', 'p90_log_separation'):
+            if statistics:
+                statistics[key] = encode_array(statistics[key], np.float32, encoding)
+
+        return jsonify(convert_numpy_types({
+            'success': True,
+            'system_type': system_type,
+            'parameters': system.parameters,
+            'n_trajectories': n_trajectories,
+            'times': encode_array(times, np.float64, encoding),
+            'trajectories': encode_array(trajectories[:, :max_returned], np.float32, encoding),
+            'final_states': encode_array(trajectories[-1], np.float32, encoding),
+            'diverged': int(np.count_nonzero(diverged)),
+            # 自适应积分用完步数上限时只返回已到达的时刻
+            'truncated': len(times) < n_output,
+            't_reached': float(times[-1]),
+            'statistics': statistics
+        }))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
 @app.route('/api/calculate_lyapunov', methods=['POST'])
 def calculate_lyapunov():
     """计算李雅普诺夫指数"""
@@ -2082,8 +5295,25 @@ def calculate_lyapunov():
         parameters = data.get('parameters', {})
         initial_conditions = data.get('initial_conditions', [1, 1, 1])
         
+        t_max = min(float(data.get('t_max', 100)), 5000)
+        dt = float(data.get('dt', 0.01))
+        if not dt > 0:
+            raise ValueError('dt 必须为正数')
+        # 限制重正交化区间数（每个区间一次 odeint 调用，默认每 50 个 dt 重正交化一次）
+        if t_max / (dt * 50) > 100000:
+            raise ValueError('t_max / dt 过大（重正交化区间数上限 1e5）')
+        # 未指定 tol 时使用 calculate_lyapunov_exponents 的默认值
+        options = {'tol': float(data['tol'])} if data.get('tol') is not None else {}
+
         system = ChaoticSystem(system_type, parameters)
-        lyapunov = system.calculate_lyapunov_exponents(initial_conditions)
+        lyapunov = system.calculate_lyapunov_exponents(
+            initial_conditions,
+            t_span=(0, t_max),
+            dt=dt,
+            transient=min(float(data.get('transient', 10.0)), 1000),
+            early_stop=bool(data.get('early_stop', True)),
+            **options
+        )
         
         return jsonify({
             'success': True,
@@ -2121,7 +5351,13 @@ def poincare_section():
                 'section_value': section_value
             })
 
-        intersections = system.find_poincare_section(section_plane, section_value)
+        intersections = system.find_poincare_section(
+            section_plane,
+            section_value,
+            normal=data.get('normal'),
+            direction=data.get('direction', 'positive'),
+            refine=data.get('refine', 'hermite')
+        )
 
         # 提供友好的提示信息
         message = f'找到 {len(intersections)} 个交点'
@@ -2153,13 +5389,22 @@ def fractal_dimension():
         parameters = data.get('parameters', {})
         initial_conditions = data.get('initial_conditions', [1, 1, 1])
         
+        t_max = min(float(data.get('t_max', 50)), 20000)
+        dt = max(float(data.get('dt', 0.01)), 1e-3)
+        # 限制轨道点数（t_max/dt），避免生成千万级点的轨迹
+        if t_max / dt > 1e6:
+            raise ValueError('t_max / dt 过大（轨道点数上限 1e6）')
+
         system = ChaoticSystem(system_type, parameters)
-        system.integrate_trajectory(initial_conditions)
-        dimensions = system.estimate_fractal_dimension()
+        system.integrate_trajectory(initial_conditions, t_span=(0, t_max), dt=dt)
+        dimensions = system.estimate_fractal_dimension(
+            method=data.get('method', 'both'),
+            discard=float(data.get('discard', 0.1))
+        )
         
         return jsonify({
             'success': True,
-            'fractal_dimensions': dimensions
+            'fractal_dimensions': convert_numpy_types(dimensions)
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -2173,7 +5418,12 @@ def convert_numpy_types(obj):
         return int(obj)
     elif isinstance(obj, np.floating):
         return float(obj)
+    elif isinstance(obj, (complex, np.complexfloating)):
+        # 复数（如复特征值）表示为 [实部, 虚部]
+        return [float(obj.real), float(obj.imag)]
     elif isinstance(obj, np.ndarray):
+        if np.iscomplexobj(obj):
+            return np.stack([obj.real, obj.imag], axis=-1).tolist()
         return obj.tolist()
     elif isinstance(obj, dict):
         return {key: convert_numpy_types(value) for key, value in obj.items()}
@@ -2184,29 +5434,72 @@ def convert_numpy_types(obj):
     else:
         return obj
 
+def scale_density(counts, log_scale=True, reference=None, dtype=np.uint8):
+    """把计数直方图映射到无符号整数灰度（可选对数缩放）；reference 为满量程计数，默认取最大值"""
+    reference = float(reference if reference is not None else max(counts.max(), 1))
+    if log_scale:
+        levels = np.log1p(counts) / np.log1p(reference)
+    else:
+        levels = counts / reference
+    full_scale = np.iinfo(dtype).max
+    return np.clip(np.round(levels * full_scale), 0, full_scale).astype(dtype)
+
+
+def density_to_png(levels, colormap='inferno'):
+    """把灰度栅格渲染为PNG字节（第0行对应最小的状态值，绘制在图像底部）"""
+    img_buffer = io.BytesIO()
+    plt.imsave(img_buffer, levels, cmap=colormap, vmin=0, vmax=np.iinfo(levels.dtype).max,
+               origin='lower', format='png')
+    return img_buffer.getvalue()
+
+
+def encode_array(arr, dtype=np.float32, encoding='base64'):
+    """
+    将numpy数组编码为紧凑的JSON友好格式
+    base64: 小端字节 + dtype/shape 描述，前端可直接用 TypedArray 解码；list: 嵌套列表
+    """
+    arr = np.ascontiguousarray(arr, dtype=np.dtype(dtype).newbyteorder('<'))
+    if encoding == 'list':
+        return arr.tolist()
+    return {
+        'dtype': np.dtype(dtype).name,
+        'shape': list(arr.shape),
+        'data': base64.b64encode(arr.tobytes()).decode()
+    }
+
+def _discrete_system_from_request(data, default_map='logistic'):
+    """由请求数据构造离散系统：map_type 为 custom 时使用 expressions 中的表达式，参数在 parameters 中声明"""
+    return DiscreteSystem(
+        map_type=data.get('map_type', default_map),
+        parameters=data.get('parameters', {}),
+        expressions=data.get('expressions')
+    )
+
+
 @app.route('/api/analyze_discrete_system', methods=['POST'])
 def analyze_discrete_system():
     """分析离散动力学系统"""
     try:
         data = request.json
         map_type = data.get('map_type', 'logistic')
-        parameters = data.get('parameters', {})
 
         # 创建离散系统
-        discrete_system = DiscreteSystem(map_type=map_type, parameters=parameters)
-
-        # 分析固定点
-        fixed_points = discrete_system.find_fixed_points()
+        discrete_system = _discrete_system_from_request(data)
 
-        # 分析固定点稳定性
-        stability_analysis = []
-        for fp in fixed_points:
-            stability = discrete_system.analyze_stability(fp)
-            if stability:
-                stability_analysis.append(stability)
+        # 分析固定点及其稳定性（搜索窗口和网格分辨率可由请求指定）
+        stability_analysis = discrete_system.analyze_fixed_points(
+            search_range=tuple(data.get('search_range', [-2, 2])),
+            n_points=min(int(data.get('resolution', 100)), 100000)
+        )
+        fixed_points = [item['fixed_point'] for item in stability_analysis]
 
-        # 检测周期轨道
-        periodic_orbits = discrete_system.detect_periodic_orbits()
+        # 检测周期轨道（按周期分组的轨道点，以及包含乘子和稳定性的详细信息）；
+        # 混沌参数下不稳定轨道成百上千，每个周期只返回 max_orbits 条，总数单独给出
+        max_orbits = max(1, min(int(data.get('max_orbits', 10)), 1000))
+        periodic_orbit_details, periodic_orbit_counts = DiscreteSystem._limit_orbits_per_period(
+            discrete_system.find_periodic_orbits(), max_orbits
+        )
+        periodic_orbits = DiscreteSystem._group_by_period(periodic_orbit_details)
 
         # 计算Lyapunov指数 - 根据维度选择合适的初始条件
         if discrete_system.dimension == 1:
@@ -2217,6 +5510,15 @@ def analyze_discrete_system():
         else:
             lyapunov_info = None
 
+        # 单峰映射附带揉序列与拓扑熵
+        symbolic_info = None
+        if map_type in DiscreteSystem.UNIMODAL_CRITICAL_POINTS:
+            signs = discrete_system._kneading_signs(discrete_system.kernel, discrete_system._critical_point(), 1, 1000)
+            symbolic_info = {
+                'kneading_sequence': discrete_system.kneading_sequence(64),
+                'topological_entropy': float(DiscreteSystem._kneading_entropy(signs)[0])
+            }
+
         # 转换numpy类型为Python原生类型
         response_data = {
             'success': True,
@@ -2225,7 +5527,10 @@ def analyze_discrete_system():
             'fixed_points': fixed_points,
             'stability_analysis': stability_analysis,
             'periodic_orbits': periodic_orbits,
-            'lyapunov_analysis': lyapunov_info
+            'periodic_orbit_details': periodic_orbit_details,
+            'periodic_orbit_counts': periodic_orbit_counts,
+            'lyapunov_analysis': lyapunov_info,
+            'symbolic_dynamics': symbolic_info
         }
 
         # 递归转换所有numpy类型
@@ -2242,13 +5547,26 @@ def generate_discrete_trajectory():
     """生成离散系统轨迹"""
     try:
         data = request.json
-        map_type = data.get('map_type', 'logistic')
-        parameters = data.get('parameters', {})
         x0 = data.get('x0', 0.5)
         n_steps = data.get('n_steps', 100)
 
         # 创建离散系统
-        discrete_system = DiscreteSystem(map_type=map_type, parameters=parameters)
+        discrete_system = _discrete_system_from_request(data)
+
+        # 长轨道：流式迭代，只返回抽取（每 k 步一个点）或聚合（每桶最小/最大值）后的结果
+        if data.get('decimation'):
+            stream = discrete_system.stream_orbit(
+                x0,
+                min(int(n_steps), 100000000),
+                decimation=data['decimation'],
+                max_points=min(int(data.get('max_points', 10000)), 1000000),
+                transient=max(0, min(int(data.get('transient', 0)), int(n_steps), 100000000))
+            )
+            encoding = data.get('encoding', 'base64')
+            for key in ('points', 'min', 'max'):
+                if key in stream:
+                    stream[key] = encode_array(stream[key], np.float64, encoding)
+            return jsonify(convert_numpy_types({'success': True, 'x0': x0, **stream}))
 
         # 计算轨迹 - iterate现在已经返回列表
         trajectory = discrete_system.iterate(x0, n_steps)
@@ -2264,13 +5582,263 @@ def generate_discrete_trajectory():
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/discrete_invariant_density', methods=['POST'])
+def discrete_invariant_density():
+    """集合迭代估计离散映射的不变密度（一维为密度曲线，二维为吸引子测度的直方图）"""
+    try:
+        data = request.json
+        map_type = data.get('map_type', 'logistic')
+
+        discrete_system = _discrete_system_from_request(data)
+        max_bins = 4096 if discrete_system.dimension == 1 else 1024
+        n_samples = min(int(data.get('n_samples', 1000000)), 10000000)
+        transient = min(max(int(data.get('transient', 200)), 0), 10000)
+        n_iterations = min(int(data.get('n_iterations', 10)), 1000)
+        # 限制总迭代量（样本数 ×（暂态 + 采样迭代次数））
+        if n_samples * (transient + n_iterations) > 500000000:
+            raise ValueError('样本数与迭代次数的乘积过大（上限 5e8）')
+
+        result = discrete_system.ensemble_density(
+            n_samples=n_samples,
+            chunk_size=min(int(data.get('chunk_size', 100000)), 1000000),
+            transient=transient,
+            n_iterations=n_iterations,
+            bins=min(int(data.get('bins', 200)), max_bins),
+            x_range=data.get('x_range'),
+            y_range=data.get('y_range'),
+            init_range=data.get('init_range'),
+            seed=data.get('seed')
+        )
+        encoding = data.get('encoding', 'base64')
+        result['density'] = encode_array(result['density'], np.float32, encoding)
+        result['counts'] = encode_array(result['counts'], np.uint32, encoding)
+
+        return jsonify(convert_numpy_types({'success': True, 'map_type': map_type, **result}))
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/ulam_invariant_density', methods=['POST'])
+def ulam_invariant_density():
+    """Ulam 转移算子估计一维映射的不变密度、谱隙与混合速率"""
+    try:
+        data = request.json
+        map_type = data.get('map_type', 'logistic')
+
+        discrete_system = _discrete_system_from_request(data)
+        n_cells = min(int(data.get('n_cells', 1000)), 200000)
+        samples_per_cell = min(int(data.get('samples_per_cell', 32)), 256)
+        # 限制子样本点总数（格子数 × 每格样本数）
+        if n_cells * samples_per_cell > 4000000:
+            raise ValueError('格子数与每格样本数的乘积过大（上限 4e6）')
+        result = discrete_system.ulam_density(
+            n_cells=n_cells,
+            x_range=data.get('x_range'),
+            samples_per_cell=samples_per_cell,
+            n_eigenvalues=min(int(data.get('n_eigenvalues', 6)), 20)
+        )
+        encoding = data.get('encoding', 'base64')
+        result['x'] = encode_array(result['x'], np.float32, encoding)
+        result['density'] = encode_array(result['density'], np.float32, encoding)
+
+        return jsonify(convert_numpy_types({'success': True, 'map_type': map_type, **result}))
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/lyapunov_sweep', methods=['POST'])
+def lyapunov_sweep():
+    """一次请求计算整条 Lyapunov 指数-参数曲线（可绘制在分岔图下方）"""
+    try:
+        data = request.json
+        map_type = data.get('map_type', 'logistic')
+        x0 = data.get('x0', 0.5)
+
+        discrete_system = _discrete_system_from_request(data)
+        sweep = discrete_system.lyapunov_sweep(
+            param_name=data.get('param_name', 'r'),
+            param_range=tuple(data.get('param_range', [2.5, 4.0])),
+            param_steps=min(int(data.get('param_steps', 1000)), 20000),
+            x0=x0,
+            transient=min(int(data.get('transient', 200)), 100000),
+            n_steps=min(int(data.get('n_steps', 1000)), 100000)
+        )
+
+        # 发散通道的指数为 NaN：base64 编码中保留 NaN，列表编码中替换为 null
+        encoding = data.get('encoding', 'base64')
+        for key in ('lyapunov_exponent', 'lyapunov_exponents'):
+            if sweep[key] is None:
+                continue
+            if encoding == 'list':
+                sweep[key] = np.where(np.isfinite(sweep[key]), sweep[key], None).tolist()
+            else:
+                sweep[key] = encode_array(sweep[key], np.float32, encoding)
+        sweep['parameters'] = encode_array(sweep['parameters'], np.float64, encoding)
+        sweep['diverged'] = encode_array(sweep['diverged'], np.uint8, encoding)
+
+        return jsonify(convert_numpy_types({
+            'success': True,
+            'map_type': map_type,
+            'param_name': data.get('param_name', 'r'),
+            **sweep
+        }))
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/symbolic_dynamics', methods=['POST'])
+def symbolic_dynamics():
+    """单峰映射的符号动力学：揉序列、可容许词计数与拓扑熵估计"""
+    try:
+        data = request.json
+        map_type = data.get('map_type', 'logistic')
+
+        discrete_system = _discrete_system_from_request(data)
+        n_orbits = min(int(data.get('n_orbits', 64)), 10000)
+        n_steps = min(int(data.get('n_steps', 100000)), 1000000)
+        transient = min(int(data.get('transient', 1000)), 100000)
+        # 限制总计算量（轨道数 × 步数）
+        if n_orbits * (n_steps + transient) > 100000000:
+            raise ValueError('轨道数与步数的乘积过大（上限 1e8）')
+        result = discrete_system.symbolic_dynamics(
+            max_word_length=min(int(data.get('max_word_length', 16)), 24),
+            n_orbits=n_orbits,
+            n_steps=n_steps,
+            transient=transient,
+            kneading_length=min(int(data.get('kneading_length', 1000)), 5000),
+            critical_point=data.get('critical_point')
+        )
+        return jsonify(convert_numpy_types({'success': True, 'map_type': map_type, **result}))
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/topological_entropy_sweep', methods=['POST'])
+def topological_entropy_sweep():
+    """拓扑熵随参数变化的曲线（揉序熵与词数熵），所有参数值一次性向量化计算"""
+    try:
+        data = request.json
+        map_type = data.get('map_type', 'logistic')
+
+        discrete_system = _discrete_system_from_request(data)
+        param_steps = min(int(data.get('param_steps', 1000)), 20000)
+        kneading_length = min(int(data.get('kneading_length', 1000)), 5000)
+        transient = min(int(data.get('transient', 500)), 100000)
+        n_steps = min(int(data.get('n_steps', 2000)), 100000)
+        # 限制总计算量（参数步数 × 揉序列与轨道的迭代步数）；位图大小由 entropy_sweep 检查
+        if param_steps * (kneading_length + transient + n_steps) > 100000000:
+            raise ValueError('参数步数与迭代步数的乘积过大（上限 1e8）')
+        result = discrete_system.entropy_sweep(
+            param_name=data.get('param_name', 'r'),
+            param_range=data.get('param_range', [3.4, 4.0]),
+            param_steps=param_steps,
+            kneading_length=kneading_length,
+            word_length=int(data.get('word_length', 10)),
+            x0=data.get('x0'),
+            transient=transient,
+            n_steps=n_steps,
+            critical_point=data.get('critical_point')
+        )
+        # NaN（发散的通道）编码为 null
+        result['word_entropy'] = [None if np.isnan(v) else float(v) for v in result['word_entropy']]
+        return jsonify(convert_numpy_types({'success': True, 'map_type': map_type, **result}))
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/parameter_plane', methods=['POST'])
+def parameter_plane():
+    """双参数平面的周期/发散/Lyapunov 符号标签图（默认 Hénon 的 (a, b) 平面）"""
+    try:
+        data = request.json
+        map_type = data.get('map_type', 'henon')
+
+        discrete_system = _discrete_system_from_request(data, default_map='henon')
+        result = discrete_system.parameter_plane(
+            param_x=data.get('param_x', 'a'),
+            x_range=data.get('x_range', [1.0, 1.4]),
+            x_steps=min(int(data.get('x_steps', 200)), 2000),
+            param_y=data.get('param_y', 'b'),
+            y_range=data.get('y_range', [0.0, 0.4]),
+            y_steps=min(int(data.get('y_steps', 200)), 2000),
+            x0=data.get('x0', 0.1),
+            transient=min(int(data.get('transient', 300)), 10000),
+            max_period=min(int(data.get('max_period', 32)), 127),
+            tol=float(data.get('tol', 1e-6)),
+            lyapunov=bool(data.get('lyapunov', False)),
+            lyapunov_steps=min(int(data.get('lyapunov_steps', 200)), 10000),
+            workers=_clamp_workers(data.get('workers'))
+        )
+        encoding = data.get('encoding', 'base64')
+        result['labels'] = encode_array(result['labels'], np.int8, encoding)
+        if 'lyapunov' in result:
+            result['lyapunov'] = encode_array(result['lyapunov'], np.float32, encoding)
+
+        return jsonify(convert_numpy_types({'success': True, 'map_type': map_type, **result}))
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/coupled_map_lattice', methods=['POST'])
+def coupled_map_lattice():
+    """运行耦合映射格子，返回降采样的时空图与在线同步/斑图统计"""
+    try:
+        data = request.json
+        map_type = data.get('map_type', 'logistic')
+
+        discrete_system = _discrete_system_from_request(data)
+        n_sites = min(int(data.get('n_sites', 1000)), 1000000)
+        n_steps = min(int(data.get('n_steps', 1000)), 100000)
+        transient = min(int(data.get('transient', 0)), 100000)
+        # 限制总计算量（格点数 × 步数）
+        if n_sites * (n_steps + transient) > 500000000:
+            raise ValueError('格点数与步数的乘积过大（上限 5e8）')
+
+        lattice = CoupledMapLattice(
+            discrete_system,
+            n_sites=n_sites,
+            coupling=data.get('coupling', 'ring'),
+            epsilon=float(data.get('epsilon', 0.1))
+        )
+        raster_shape = data.get('raster_shape', [512, 512])
+        result = lattice.run(
+            n_steps=n_steps,
+            transient=transient,
+            x0=data.get('x0'),
+            init_range=data.get('init_range', [0.0, 1.0]),
+            perturbation=float(data.get('perturbation', 1e-3)),
+            seed=data.get('seed'),
+            raster_shape=(min(int(raster_shape[0]), 2048), min(int(raster_shape[1]), 2048)),
+            raster_mode=data.get('raster_mode', 'snapshot'),
+            sync_tol=float(data.get('sync_tol', 1e-6)),
+            domain_tol=float(data.get('domain_tol', 1e-3)),
+            bins=min(int(data.get('bins', 100)), 4096),
+            value_range=data.get('value_range'),
+            n_snapshots=min(int(data.get('n_snapshots', 32)), 1000)
+        )
+        encoding = data.get('encoding', 'base64')
+        result['raster'] = encode_array(result['raster'], np.float32, encoding)
+        for key in ('mean_field', 'sync_error', 'domain_fraction', 'neighbour_correlation'):
+            result[key] = encode_array(result[key], np.float32, encoding)
+
+        return jsonify(convert_numpy_types({'success': True, 'map_type': map_type, **result}))
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
 @app.route('/api/generate_bifurcation_diagram', methods=['POST'])
 def generate_bifurcation_diagram():
     """生成分岔图"""
     try:
         data = request.json
         map_type = data.get('map_type', 'logistic')
-        parameters = data.get('parameters', {})
         param_name = data.get('param_name', 'r')
         param_range = data.get('param_range', [2.5, 4.0])
         param_steps = data.get('param_steps', 500)
@@ -2284,7 +5852,47 @@ def generate_bifurcation_diagram():
                 x0 = [0.1, 0.1]  # Hénon映射需要二维初始条件
 
         # 创建离散系统
-        discrete_system = DiscreteSystem(map_type=map_type, parameters=parameters)
+        discrete_system = _discrete_system_from_request(data)
+
+        # 栅格模式：在服务端累加密度直方图，返回图像而不是逐点数据
+        if data.get('mode') == 'raster':
+            param_bins = min(int(data.get('param_bins', 800)), 4096)
+            x_bins = min(int(data.get('x_bins', 600)), 4096)
+            samples_per_bin = min(int(data.get('samples_per_bin', 1)), 64)
+            transient = max(0, min(int(data.get('transient', 200)), 10000))
+            n_points = min(int(data.get('n_points', 500)), 100000)
+            # 限制总迭代量（轨道条数 ×（暂态 + 采样点数））
+            if param_bins * samples_per_bin * (transient + n_points) > 500000000:
+                raise ValueError('参数列数、每列样本数与迭代次数的乘积过大（上限 5e8）')
+            density = discrete_system.bifurcation_density(
+                param_name=param_name,
+                param_range=tuple(param_range),
+                param_bins=param_bins,
+                x_bins=x_bins,
+                x_range=data.get('x_range'),
+                samples_per_bin=samples_per_bin,
+                x0=x0,
+                transient=transient,
+                n_points=n_points
+            )
+            dtype = np.uint16 if data.get('dtype') == 'uint16' else np.uint8
+            levels = scale_density(density['counts'], log_scale=data.get('log_scale', True), dtype=dtype)
+
+            if data.get('format', 'png') == 'png':
+                png = density_to_png(levels, data.get('colormap', 'inferno'))
+                image = {'format': 'png', 'data': base64.b64encode(png).decode()}
+            else:
+                image = {'format': 'raw', 'origin': 'lower', **encode_array(levels, dtype)}
+
+            return jsonify({
+                'success': True,
+                'mode': 'raster',
+                'image': image,
+                'param_name': param_name,
+                'param_range': density['param_range'],
+                'x_range': density['x_range'],
+                'total_points': int(density['counts'].sum())
+            })
 
         # 根据映射类型调整参数
         transient = 200 if map_type == 'henon' else 100  # Hénon映射需要更长的暂态时间
@@ -2313,18 +5921,30 @@ def generate_bifurcation_diagram():
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/tiles/bifurcation/<map_type>/<int:z>/<int:x>/<int:y>')
+def bifurcation_tile(map_type, z, x, y):
+    """分岔图瓦片（PNG），可通过查询参数覆盖映射的其他已声明参数，例如 ?b=0.3（扫描参数由瓦片坐标决定，忽略）"""
+    try:
+        parameters = {name: float(value) for name, value in request.args.items()}
+
+        png = bifurcation_tiles.get_tile(map_type, z, x, y, parameters)
+        return send_file(io.BytesIO(png), mimetype='image/png', max_age=86400)
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+
+
 @app.route('/api/generate_cobweb_plot', methods=['POST'])
 def generate_cobweb_plot():
     """生成蛛网图"""
     try:
         data = request.json
         map_type = data.get('map_type', 'logistic')
-        parameters = data.get('parameters', {})
         x0 = data.get('x0', 0.5)
         n_steps = data.get('n_steps', 20)
 
         # 创建离散系统（自动识别维度）
-        discrete_system = DiscreteSystem(map_type=map_type, parameters=parameters)
+        discrete_system = _discrete_system_from_request(data)
 
         # 检查是否为一维系统
         if discrete_system.dimension != 1:
@@ -2341,13 +5961,9 @@ def generate_cobweb_plot():
 
         # 生成映射函数数据用于绘图
         x_range = np.linspace(0, 1, 200)
-        y_map = []
-        for x in x_range:
-            try:
-                y = discrete_system.map_function(x)
-                y_map.append(y)
-            except:
-                y_map.append(None)
+        with np.errstate(all='ignore'):
+            y_map = np.broadcast_to(discrete_system.map_function(x_range), x_range.shape).astype(float)
+        y_map = [float(y) if np.isfinite(y) else None for y in y_map]
 
         response = {
             'success': True,
@@ -2374,14 +5990,12 @@ def generate_return_map():
     """生成返回映射"""
     try:
         data = request.json
-        map_type = data.get('map_type', 'logistic')
-        parameters = data.get('parameters', {})
         x0 = data.get('x0', 0.5)
         n_steps = data.get('n_steps', 200)
         delay = data.get('delay', 1)
 
         # 创建离散系统
-        discrete_system = DiscreteSystem(map_type=map_type, parameters=parameters)
+        discrete_system = _discrete_system_from_request(data)
 
         # 生成返回映射数据
         return_map_data = discrete_system.generate_return_map(x0, n_steps, delay)
@@ -2403,17 +6017,14 @@ def discrete_phase_portrait():
     """生成离散系统相图（2D情况）"""
     try:
         data = request.json
-        map_type = data.get('map_type', 'henon')
-        parameters = data .get('parameters', {})
         x0 = data.get('x0', [0.1, 0.1])
         n_steps = data.get('n_steps', 200)
 
-        if map_type not in ['henon', 'linear_2d']:
+        # 创建离散系统，只有二维映射可以绘制相图
+        discrete_system = _discrete_system_from_request(data, default_map='henon')
+        if discrete_system.dimension != 2:
             return jsonify({'success': False, 'error': '该映射类型不支持2D相图'})
 
-        # 创建二维离散系统
-        discrete_system = DiscreteSystem(map_type=map_type, parameters=parameters, dimension=2)
-
         # 计算轨迹
         trajectory = discrete_system.iterate(np.array(x0), n_steps)
 
@@ -906,14 +906,21 @@ class DiscreteSystemAnalyzer {
         if (results.periodic_orbits && Object.keys(results.periodic_orbits).length > 0) {
             html += '<div class="analysis-section">';
             html += '<h5><i class="fas fa-sync"></i> 周期轨道</h5>';
+            const orbitCounts = results.periodic_orbit_counts || {};
             Object.entries(results.periodic_orbits).forEach(([period, orbits]) => {
+                // 服务端每个周期只返回部分轨道，总数单独给出
+                const total = orbitCounts[period] !== undefined ? orbitCounts[period] : orbits.length;
                 html += `<div class="periodic-orbit">`;
-                html += `<strong>${period}周期轨道:</strong> 发现 ${orbits.length} 个<br>`;
+                html += `<strong>${period}周期轨道:</strong> 发现 ${total} 个<br>`;
                 orbits.slice(0, 3).forEach((orbit, idx) => {
-                    html += `&nbsp;&nbsp;轨道${idx + 1}: [${orbit.map(x => x.toFixed(3)).join(', ')}]<br>`;
+                    // 2D映射的轨道点为 [x, y] 数组
+                    const points = orbit.map(p => Array.isArray(p)
+                        ? `(${p[0].toFixed(3)}, ${p[1].toFixed(3)})`
+                        : p.toFixed(3));
+                    html += `&nbsp;&nbsp;轨道${idx + 1}: [${points.join(', ')}]<br>`;
                 });
-                if (orbits.length > 3) {
-                    html += `&nbsp;&nbsp;... 还有 ${orbits.length - 3} 个<br>`;
+                if (total > 3) {
+                    html += `&nbsp;&nbsp;... 还有 ${total - 3} 个<br>`;
                 }
                 html += `</div>`;
             });